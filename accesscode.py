@@ -0,0 +1,102 @@
+import datetime
+import email
+import os
+import time
+from email.utils import parsedate_to_datetime
+from imaplib import IMAP4_SSL
+
+from utils import IST
+
+SENDER = "accesscode@kotaksecurities.com"
+
+
+class AccessCodeMailbox:
+    """Polls one IMAP connection for the Kotak 2FA access code email.
+
+    The connection is opened once and every poll is a ``UID SEARCH``
+    for the sender since the login date, limited to UIDs newer than the
+    last one looked at, so earlier emails are never downloaded again.
+    Only the Date and Subject headers of new messages are fetched.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        host: str = "imap.gmail.com",
+        port: int = 993,
+        imap_class=IMAP4_SSL,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.imap_class = imap_class
+        self.searches = 0
+        self._mail = None
+        self._last_uid = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("GMAIL_USERNAME"), os.getenv("GMAIL_PASSWORD"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        if self._mail is None:
+            self._mail = self.imap_class(self.host, self.port)
+            self._mail.login(self.username, self.password)
+            self._mail.select("inbox")
+        return self._mail
+
+    def fetch(self, since: datetime.datetime):
+        """Access code from an email sent at or after ``since``, or None."""
+        mail = self._connect()
+        self.searches += 1
+        _, data = mail.uid(
+            "search",
+            None,
+            f"UID {self._last_uid + 1}:*",
+            f'FROM "{SENDER}"',
+            f"SINCE {since.astimezone(IST):%d-%b-%Y}",
+        )
+        uids = [int(uid) for uid in data[0].split()]
+        # "n:*" always matches the newest message, even when n is larger
+        uids = [uid for uid in uids if uid > self._last_uid]
+        for uid in sorted(uids, reverse=True):
+            _, response = mail.uid(
+                "fetch", str(uid), "(BODY.PEEK[HEADER.FIELDS (DATE SUBJECT)])"
+            )
+            message = email.message_from_bytes(response[0][1])
+            if parsedate_to_datetime(message["Date"]) >= since:
+                self._last_uid = max(uids)
+                return str(message["Subject"].split(" ")[-1])
+        if uids:
+            self._last_uid = max(uids)
+        return None
+
+    def wait(
+        self,
+        since: datetime.datetime,
+        timeout: float = 120.0,
+        interval: float = 1.0,
+    ):
+        """Poll until the access code arrives; None after ``timeout``."""
+        deadline = time.monotonic() + timeout
+        while True:
+            access_code = self.fetch(since)
+            if access_code is not None or time.monotonic() >= deadline:
+                return access_code
+            time.sleep(interval)
+
+    def close(self):
+        if self._mail is not None:
+            try:
+                self._mail.logout()
+            except Exception:
+                pass
+            self._mail = None
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from dispatcher import COALESCE, Dispatcher
+from utils import PositionType, logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+# Section name -> OrderClient method that fetches it
+SECTIONS = {
+    "funds": "get_funds",
+    "orders": "get_order_report",
+    "trades": "get_trade_report",
+    "positions": "get_position",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    value: object
+    fetched_at: float
+    generation: int
+
+
+def _is_error(response) -> bool:
+    return isinstance(response, dict) and response.get("status") == "error"
+
+
+class AccountState:
+    """Funds, positions, order book and trade book held in memory.
+
+    Each section is fetched from the broker on first use and kept as a
+    snapshot of the client's typed response. Snapshots are refreshed
+    every ``interval`` seconds once ``start`` is called, and after each
+    order ack (``invalidate``) by a coalescing background refresh, so a
+    burst of acks costs one round trip per section. A read never
+    returns a snapshot older than two intervals or one taken before the
+    last ack; it fetches instead. Failed fetches keep the previous
+    snapshot and return the error.
+    """
+
+    def __init__(self, client=None, interval: float = 30.0, clock=None):
+        self._client = client
+        self.interval = interval
+        self.clock = clock or time.monotonic
+        self._snapshots = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._fetching = threading.Lock()
+        self._stop = threading.Event()
+        self._timer = None
+        self._refresher = Dispatcher(
+            workers=1, max_pending=1, policy=COALESCE, name="account"
+        )
+        self.reads = 0
+        self.hits = 0
+        self.broker_calls = dict.fromkeys(SECTIONS, 0)
+        self.failed = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from orderclient import OrderClient
+
+            self._client = OrderClient()
+        return self._client
+
+    def funds(self):
+        return self.get("funds")
+
+    def orders(self):
+        return self.get("orders")
+
+    def trades(self):
+        return self.get("trades")
+
+    def positions(self, position_type: PositionType = PositionType.today):
+        return self.get("positions", position_type)
+
+    def _fresh(self, key):
+        snapshot = self._snapshots.get(key)
+        if (
+            snapshot is not None
+            and snapshot.generation == self._generation
+            and self.clock() - snapshot.fetched_at < 2 * self.interval
+        ):
+            return snapshot
+        return None
+
+    def get(self, section: str, *args):
+        key = (section, *args)
+        with self._lock:
+            self.reads += 1
+            snapshot = self._fresh(key)
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot.value
+        with self._fetching:
+            # Another reader may have fetched it while this one waited
+            with self._lock:
+                snapshot = self._fresh(key)
+            if snapshot is not None:
+                return snapshot.value
+            return self._fetch(key)
+
+    def _fetch(self, key):
+        generation = self._generation
+        self.broker_calls[key[0]] += 1
+        response = getattr(self.client, SECTIONS[key[0]])(*key[1:])
+        if _is_error(response):
+            self.failed += 1
+            logging.warning(f"Account {key[0]} refresh failed: {response}")
+            return response
+        with self._lock:
+            self._snapshots[key] = Snapshot(response, self.clock(), generation)
+        return response
+
+    def refresh(self):
+        """Fetch every section that has been read so far."""
+        with self._fetching:
+            for key in list(self._snapshots):
+                self._fetch(key)
+
+    def invalidate(self):
+        """An order was acked: current snapshots are out of date."""
+        with self._lock:
+            self._generation += 1
+        self._refresher.submit("refresh", self.refresh)
+
+    def start(self):
+        if self._timer is None:
+            self._stop.clear()
+            self._timer = threading.Thread(
+                target=self._run, name="account-timer", daemon=True
+            )
+            self._timer.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.exception(f"Account refresh failed: {e}")
+
+    def close(self, timeout: float = None):
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.join(timeout)
+            self._timer = None
+        self._refresher.close(timeout)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "sections": len(self._snapshots),
+                "reads": self.reads,
+                "hits": self.hits,
+                "broker_calls": dict(self.broker_calls),
+                "failed": self.failed,
+            }
+
+
+account_state = AccountState()
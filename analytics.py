@@ -0,0 +1,216 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from demoOrder import OrderClient
+from utils import TransactionType
+
+FILL_DTYPE = np.dtype(
+    [
+        ("datetime", "i8"),
+        ("token", "i8"),
+        ("strategy", "i4"),
+        ("side", "i1"),
+        ("quantity", "i8"),
+        ("price", "f8"),
+        ("charges", "f8"),
+    ]
+)
+CHARGES = ("transaction", "sebi", "gst", "stamp", "stt")
+
+
+def charge_rates(transactionType: TransactionType) -> tuple:
+    """OrderClient's charges per rupee traded, one per CHARGES name.
+    They add up to ``OrderClient.charge_rate(transactionType)``."""
+    transaction = OrderClient.transaction_charges
+    sebi = OrderClient.sebi_charges
+    buy = transactionType == TransactionType.buy
+    return (
+        transaction,
+        sebi,
+        (transaction + sebi) * OrderClient.gst,
+        OrderClient.buy_stamp_charges if buy else 0.0,
+        0.0 if buy else OrderClient.stt_charges,
+    )
+
+
+def charge_breakdown(amount: float, transactionType: TransactionType):
+    """Charges on ``amount``, one value per CHARGES name."""
+    return tuple(amount * rate for rate in charge_rates(transactionType))
+
+
+class FillStore:
+    """Append-only columnar store of fills, grown by doubling."""
+
+    def __init__(self, capacity: int = 1 << 12) -> None:
+        self._data = np.zeros(capacity, dtype=FILL_DTYPE)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, *fill):
+        if self._count == self._data.shape[0]:
+            grown = np.zeros(self._count * 2, dtype=FILL_DTYPE)
+            grown[: self._count] = self._data
+            self._data = grown
+        self._data[self._count] = fill
+        self._count += 1
+
+    def view(self, start: int = 0) -> np.ndarray:
+        """Fills from ``start`` on, as a view that later appends may
+        leave behind when the store grows."""
+        return self._data[start : self._count]
+
+
+@dataclass(slots=True)
+class Position:
+    """Running totals of one (token, strategy), average cost method."""
+
+    quantity: int = 0
+    average: float = 0.0
+    realized: float = 0.0
+    turnover: float = 0.0
+    fills: int = 0
+    last: float = 0.0
+    transaction: float = 0.0
+    sebi: float = 0.0
+    gst: float = 0.0
+    stamp: float = 0.0
+    stt: float = 0.0
+
+    def fill(self, side: int, quantity: int, price: float, charges: tuple):
+        signed = side * quantity
+        if self.quantity == 0 or (self.quantity > 0) == (signed > 0):
+            total = self.quantity + signed
+            self.average = (
+                self.average * self.quantity + price * signed
+            ) / total
+            self.quantity = total
+        else:
+            closed = min(abs(signed), abs(self.quantity))
+            direction = 1 if self.quantity > 0 else -1
+            self.realized += closed * (price - self.average) * direction
+            self.quantity += signed
+            if self.quantity == 0:
+                self.average = 0.0
+            elif (self.quantity > 0) != (direction > 0):
+                # Crossed through flat: the rest opens at this price
+                self.average = price
+        self.turnover += quantity * price
+        self.fills += 1
+        self.last = price
+        self.transaction += charges[0]
+        self.sebi += charges[1]
+        self.gst += charges[2]
+        self.stamp += charges[3]
+        self.stt += charges[4]
+
+
+class PnLLedger:
+    """Realized and unrealized P&L of paper (or live) fills.
+
+    Fills are kept in a FillStore, and every fill also updates the
+    running totals of its (token, strategy) in O(1), so reports cost
+    O(tokens x strategies) however many fills have accumulated. P&L
+    uses the average cost method; charges are split like
+    OrderClient.charge_rate.
+    """
+
+    def __init__(self) -> None:
+        self.fills = FillStore()
+        self.strategies = []
+        self._strategy_ids = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        token,
+        transactionType: TransactionType,
+        quantity: int,
+        price: float,
+        strategy: str = "",
+        timestamp: int = None,
+    ):
+        """Add one fill; ``timestamp`` is epoch ns, now if None."""
+        token, price = int(token), float(price)
+        side = 1 if transactionType == TransactionType.buy else -1
+        charges = charge_breakdown(quantity * price, transactionType)
+        with self._lock:
+            strategy_id = self._strategy_ids.get(strategy)
+            if strategy_id is None:
+                strategy_id = self._strategy_ids[strategy] = len(
+                    self.strategies
+                )
+                self.strategies.append(strategy)
+            self.fills.append(
+                time.time_ns() if timestamp is None else timestamp,
+                token,
+                strategy_id,
+                side,
+                quantity,
+                price,
+                sum(charges),
+            )
+            position = self._positions.get((token, strategy_id))
+            if position is None:
+                position = self._positions[(token, strategy_id)] = Position()
+            position.fill(side, quantity, price, charges)
+
+    def positions(self, prices: dict = None) -> pd.DataFrame:
+        """One row per (token, strategy) with realized, unrealized and
+        net P&L. Open quantity is marked at ``prices[token]``, else at
+        the last fill price."""
+        prices = prices or {}
+        with self._lock:
+            rows = [
+                {
+                    "token": token,
+                    "strategy": self.strategies[strategy_id],
+                    **asdict(position),
+                }
+                for (token, strategy_id), position in self._positions.items()
+            ]
+        frame = pd.DataFrame(
+            rows,
+            columns=["token", "strategy"]
+            + list(Position.__dataclass_fields__),
+        )
+        mark = frame["token"].map(prices).astype(float)
+        mark = mark.fillna(frame["last"])
+        frame["unrealized"] = frame["quantity"] * (mark - frame["average"])
+        frame["charges"] = frame[list(CHARGES)].sum(axis=1)
+        frame["net"] = (
+            frame["realized"] + frame["unrealized"] - frame["charges"]
+        )
+        return frame
+
+    def summary(self, prices: dict = None) -> dict:
+        """Totals, charges by kind, and P&L by symbol and by strategy."""
+        frame = self.positions(prices)
+        columns = ["realized", "unrealized", "charges", "net", "turnover"]
+        totals = frame[columns + ["fills"]].sum()
+        return {
+            "fills": int(totals["fills"]),
+            **{column: float(totals[column]) for column in columns},
+            "charges_breakdown": {
+                name: float(frame[name].sum()) for name in CHARGES
+            },
+            "symbols": _attribution(frame, "token", columns + ["quantity"]),
+            "strategies": _attribution(frame, "strategy", columns),
+        }
+
+
+def _attribution(frame: pd.DataFrame, by: str, columns: list) -> list:
+    grouped = frame.groupby(by, sort=True)[columns].sum()
+    return [
+        {by: key, **row}
+        for key, row in zip(grouped.index.tolist(), grouped.to_dict("records"))
+    ]
+
+
+ledger = PnLLedger()
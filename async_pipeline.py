@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from bar_builder import BarBuilder, now_ns
+from tracing import tracer
+from utils import logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+
+class AsyncPipeline:
+    """Tick -> bar -> signal pipeline running on one asyncio event loop.
+
+    The broker callback thread only hands parsed ticks to the loop with
+    ``call_soon_threadsafe``. Bar aggregation and indicator evaluation
+    run as coroutines on the loop, and anything that blocks (Firestore
+    writes, observers placing orders over REST) runs on ``executor``,
+    still in order per token.
+
+    ``indicator`` is an Indicator: its ``timeframe``, ``evaluate``,
+    ``evaluate_batch`` and ``store_ohlcv`` are used, and its dispatcher is
+    set to this pipeline so signals go through ``submit``.
+    """
+
+    def __init__(
+        self,
+        indicator,
+        builder: BarBuilder = None,
+        batch: bool = False,
+        executor: ThreadPoolExecutor = None,
+        flush_interval: float = 1.0,
+        max_queue: int = 100_000,
+        clock=now_ns,
+    ) -> None:
+        self.indicator = indicator
+        self.builder = builder or BarBuilder(indicator.timeframe)
+        self.batch = batch
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="pipeline"
+        )
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.clock = clock
+        self.loop = None
+        self.queue = None
+        self.dropped = 0
+        self._locks = defaultdict(asyncio.Lock)
+        self._tasks = []
+        self._pending = set()
+        indicator.dispatcher = self
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.max_queue)
+        self._tasks = [
+            self.loop.create_task(self._aggregate()),
+            self.loop.create_task(self._close_on_time()),
+        ]
+        return self
+
+    def on_tick(self, token, timestamp, ltp, volume, oi):
+        """Thread-safe entry point for the broker callback."""
+        self.loop.call_soon_threadsafe(
+            self._put, (token, timestamp, ltp, volume, oi)
+        )
+
+    def _put(self, tick):
+        try:
+            self.queue.put_nowait(tick)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _aggregate(self):
+        while True:
+            tick = await self.queue.get()
+            self.builder.update(*tick)
+            # Drain whatever else already arrived before evaluating
+            while not self.queue.empty():
+                self.builder.update(*self.queue.get_nowait())
+            if self.builder.has_closed:
+                try:
+                    await self._evaluate(self.builder.drain())
+                except Exception as e:
+                    logging.exception(f"pipeline: evaluation failed: {e}")
+
+    async def _close_on_time(self):
+        # Quiet tokens get no next-bucket tick, so close bars by the clock
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.builder.close_until(self.clock())
+            if self.builder.has_closed:
+                try:
+                    await self._evaluate(self.builder.drain())
+                except Exception as e:
+                    logging.exception(f"pipeline: evaluation failed: {e}")
+
+    async def _evaluate(self, bars: dict):
+        completed = {}
+        for token, frames in bars.items():
+            tracer.stamp(token, "bar_close")
+            if 1 in frames:
+                self.submit(
+                    ("ohlcv", token),
+                    self.indicator.store_ohlcv,
+                    token,
+                    frames[1],
+                )
+            timeframe = self.indicator.timeframe[token]
+            if timeframe in frames:
+                completed[token] = frames[timeframe]
+
+        if self.batch:
+            self.indicator.evaluate_batch(completed)
+            return
+        for token, df in completed.items():
+            self.indicator.evaluate(token, df)
+            await asyncio.sleep(0)
+
+    def submit(self, key, fn, *args):
+        """Run blocking ``fn(*args)`` on the executor, ordered per key.
+
+        Same interface as Dispatcher.submit; call it from the loop.
+        """
+        task = self.loop.create_task(self._run(key, fn, args))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return True
+
+    async def _run(self, key, fn, args):
+        async with self._locks[key]:
+            try:
+                await self.loop.run_in_executor(self.executor, fn, *args)
+            except Exception as e:
+                logging.exception(f"pipeline: {key} failed: {e}")
+
+    def metrics(self) -> dict:
+        return {
+            "name": "pipeline",
+            "queued_ticks": self.queue.qsize() if self.queue else 0,
+            "dropped_ticks": self.dropped,
+            "pending": len(self._pending),
+        }
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+    def close(self, timeout: float = 30):
+        """Stop the pipeline from a thread other than its loop's."""
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result(
+            timeout
+        )
@@ -0,0 +1,179 @@
+import dataclasses
+
+import numpy as np
+import pandas as pd
+
+from bar_builder import NS_PER_MINUTE
+from barstore import BarStore
+from demoOrder import OrderClient
+from indicator_engine import _PARAMS, BatchIndicatorEngine
+from utils import Strategy, TransactionType
+
+SUMMARY_COLUMNS = ["bars", "trades", "gross", "charges", "net"]
+
+
+def strategy_params(strategy) -> dict:
+    """A utils.Strategy or a Firestore strategy dict as plain ints."""
+    if isinstance(strategy, Strategy):
+        strategy = dataclasses.asdict(strategy)
+    params = {key: int(strategy[key]) for key in _PARAMS}
+    params["timeframe"] = int(strategy.get("timeframe", 1))
+    return params
+
+
+def resample(columns, timeframe: int) -> dict:
+    """``timeframe``-minute bars from 1-minute BAR_DTYPE columns.
+
+    Buckets start on multiples of the timeframe like ``df.resample``,
+    which Indicator uses live; empty buckets are left out.
+    """
+    times = np.asarray(columns["datetime"])
+    if timeframe == 1 or times.shape[0] == 0:
+        return {
+            "datetime": times,
+            "high": columns["high"],
+            "low": columns["low"],
+            "close": columns["close"],
+        }
+    interval = timeframe * NS_PER_MINUTE
+    bucket = times // interval
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    ends = np.append(starts[1:], bucket.shape[0]) - 1
+    return {
+        "datetime": bucket[starts] * interval,
+        "high": np.maximum.reduceat(np.asarray(columns["high"]), starts),
+        "low": np.minimum.reduceat(np.asarray(columns["low"]), starts),
+        "close": np.asarray(columns["close"])[ends],
+    }
+
+
+class Backtest:
+    """The Indicator strategy replayed over history in one pass.
+
+    Signals come from the same kernel as BatchIndicatorEngine, run over
+    every token's bars at once, so they are the codes the live path
+    dispatches bar by bar. Positions are taken in the underlying at the
+    close of the signal bar (long on a call signal, short on a put
+    signal, flat on exit) and are closed at the last bar. Every entry
+    and exit pays OrderClient's buy and sell charge rates.
+    """
+
+    def __init__(self, strategies: dict, quantity=1) -> None:
+        self.strategies = {
+            token: strategy_params(strategy)
+            for token, strategy in strategies.items()
+        }
+        self.quantity = quantity
+        self.buy_rate = OrderClient.charge_rate(TransactionType.buy)
+        self.sell_rate = OrderClient.charge_rate(TransactionType.sell)
+        self.signals = {}
+
+    def _quantity(self, token) -> int:
+        if isinstance(self.quantity, dict):
+            return self.quantity.get(token, 1)
+        return self.quantity
+
+    def signal_codes(self, bars: dict) -> dict:
+        """Signal code per bar as ``{token: (datetime, close, codes)}``."""
+        tokens = [token for token in self.strategies if token in bars]
+        frames = {
+            token: resample(bars[token], self.strategies[token]["timeframe"])
+            for token in tokens
+        }
+        n_bars = np.array(
+            [frames[token]["close"].shape[0] for token in tokens],
+            dtype=np.int64,
+        )
+        width = max(int(n_bars.max()) if tokens else 0, 1)
+        high = np.full((len(tokens), width), np.nan)
+        low = np.full((len(tokens), width), np.nan)
+        close = np.full((len(tokens), width), np.nan)
+        for row, token in enumerate(tokens):
+            n = n_bars[row]
+            high[row, :n] = frames[token]["high"]
+            low[row, :n] = frames[token]["low"]
+            close[row, :n] = frames[token]["close"]
+
+        # The live window is sized without the timeframe
+        engine = BatchIndicatorEngine(
+            {
+                token: {key: self.strategies[token][key] for key in _PARAMS}
+                for token in tokens
+            }
+        )
+        codes = engine.signal_history(high, low, close, n_bars)
+        return {
+            token: (
+                frames[token]["datetime"],
+                close[row, : n_bars[row]],
+                codes[row, : n_bars[row]],
+            )
+            for row, token in enumerate(tokens)
+        }
+
+    def run(self, bars: dict) -> pd.DataFrame:
+        """Backtest ``{token: 1-minute bars}`` (BarStore columns or
+        DataFrames); returns one summary row per token."""
+        bars = {
+            token: (
+                _columns(frame) if isinstance(frame, pd.DataFrame) else frame
+            )
+            for token, frame in bars.items()
+        }
+        rows = {}
+        self.signals = {}
+        for token, (times, close, codes) in self.signal_codes(bars).items():
+            self.signals[token] = pd.Series(
+                codes,
+                index=pd.DatetimeIndex(
+                    np.asarray(times).view("datetime64[ns]"), name="datetime"
+                ),
+                name=token,
+            )
+            rows[token] = self._pnl(close, codes, self._quantity(token))
+        return pd.DataFrame.from_dict(
+            rows, orient="index", columns=SUMMARY_COLUMNS
+        )
+
+    def run_store(self, store: BarStore, start=None, end=None):
+        """Backtest the strategies' tokens on BarStore history."""
+        return self.run(
+            {token: store.read(token, start, end) for token in self.strategies}
+        )
+
+    def _pnl(self, close: np.ndarray, codes: np.ndarray, quantity: int):
+        return pnl(close, codes, quantity, self.buy_rate, self.sell_rate)
+
+
+def pnl(close, codes, quantity: int, buy_rate: float, sell_rate: float):
+    """SUMMARY_COLUMNS for positions following ``codes`` at ``close``."""
+    if close.shape[0] == 0:
+        return [0, 0, 0.0, 0.0, 0.0]
+    position = codes.astype(np.float64)
+    position[-1] = 0
+    previous = np.concatenate(([0.0], position[:-1]))
+    changed = position != previous
+    entries = changed & (position != 0)
+    exits = changed & (previous != 0)
+
+    gross = quantity * float(np.dot(position[:-1], np.diff(close)))
+    charges = quantity * (
+        buy_rate * float(close[entries].sum())
+        + sell_rate * float(close[exits].sum())
+    )
+    return [
+        close.shape[0],
+        int(entries.sum()),
+        gross,
+        charges,
+        gross - charges,
+    ]
+
+
+def _columns(df: pd.DataFrame) -> dict:
+    return {
+        "datetime": df.index.values.astype("datetime64[ns]").view("i8"),
+        "high": df["high"].to_numpy(dtype=np.float64),
+        "low": df["low"].to_numpy(dtype=np.float64),
+        "close": df["close"].to_numpy(dtype=np.float64),
+    }
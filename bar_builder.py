@@ -0,0 +1,119 @@
+import datetime
+from collections import defaultdict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from utils import IST
+
+NS_PER_SECOND = 1_000_000_000
+NS_PER_MINUTE = 60 * NS_PER_SECOND
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "OI"]
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_date_ns_cache = {}
+_START, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _OI = range(7)
+
+
+class BarBuilder:
+    """Incremental OHLCV bars for several timeframes per token.
+
+    Every tick updates the open bar of each configured timeframe in
+    place. A bar is closed when a tick for a later bucket arrives or
+    when ``close_until`` is called with a time past its end, and closed
+    bars are kept until ``drain`` hands them out.
+    """
+
+    def __init__(self, timeframes: dict = None) -> None:
+        self._timeframes = defaultdict(lambda: (1,))
+        self._bars = {}
+        self._closed = defaultdict(list)
+        self._lock = Lock()
+        for token, timeframe in (timeframes or {}).items():
+            self.set_timeframe(token, timeframe)
+
+    def set_timeframe(self, token: int, timeframe: int):
+        self._timeframes[token] = tuple(sorted({1, int(timeframe)}))
+
+    def timeframes(self, token: int) -> tuple:
+        return self._timeframes[token]
+
+    def update(
+        self, token: int, timestamp: int, ltp: float, volume: int, oi: int
+    ):
+        with self._lock:
+            for timeframe in self._timeframes[token]:
+                interval = timeframe * NS_PER_MINUTE
+                start = timestamp - timestamp % interval
+                bar = self._bars.get((token, timeframe))
+                if bar is None or start > bar[_START]:
+                    if bar is not None:
+                        self._closed[(token, timeframe)].append(bar)
+                    bar = [start, ltp, ltp, ltp, ltp, volume, oi]
+                    self._bars[(token, timeframe)] = bar
+                    continue
+                if ltp > bar[_HIGH]:
+                    bar[_HIGH] = ltp
+                elif ltp < bar[_LOW]:
+                    bar[_LOW] = ltp
+                bar[_CLOSE] = ltp
+                bar[_VOLUME] = volume
+                bar[_OI] = oi
+
+    def close_until(self, timestamp: int):
+        """Close every open bar that ends at or before ``timestamp``."""
+        with self._lock:
+            for key, bar in list(self._bars.items()):
+                if bar[_START] + key[1] * NS_PER_MINUTE <= timestamp:
+                    self._closed[key].append(self._bars.pop(key))
+
+    @property
+    def has_closed(self) -> bool:
+        """Whether ``drain`` would return any bars."""
+        return bool(self._closed)
+
+    def drain(self) -> dict:
+        """Closed bars as ``{token: {timeframe: DataFrame}}``."""
+        with self._lock:
+            closed, self._closed = self._closed, defaultdict(list)
+
+        bars = defaultdict(dict)
+        for (token, timeframe), rows in closed.items():
+            bars[token][timeframe] = to_frame(rows)
+        return bars
+
+    def current(self, token: int, timeframe: int = 1):
+        """The still-open bar for ``token`` or None."""
+        bar = self._bars.get((token, timeframe))
+        if bar is None:
+            return None
+        return to_frame([bar]).iloc[0]
+
+
+def to_frame(rows: list) -> pd.DataFrame:
+    start = np.fromiter((row[_START] for row in rows), np.int64, len(rows))
+    data = np.array([row[_OPEN:] for row in rows], dtype=np.float64)
+    index = pd.DatetimeIndex(start.astype("datetime64[ns]"), name="datetime")
+    return pd.DataFrame(
+        data.reshape(-1, len(BAR_COLUMNS)), index=index, columns=BAR_COLUMNS
+    )
+
+
+def now_ns() -> int:
+    """Current IST wall time as naive epoch nanoseconds, like tick times."""
+    now = datetime.datetime.now(IST).replace(tzinfo=None)
+    return (now - _EPOCH) // datetime.timedelta(microseconds=1) * 1000
+
+
+def parse_tick_time(value: str) -> int:
+    """Parse a feed timestamp ("%d/%m/%Y %H:%M:%S") to naive epoch ns."""
+    date_ns = _date_ns_cache.get(value[:10])
+    if date_ns is None:
+        date = datetime.datetime.strptime(value[:10], "%d/%m/%Y")
+        date_ns = int((date - _EPOCH).total_seconds()) * NS_PER_SECOND
+        _date_ns_cache[value[:10]] = date_ns
+    seconds = (
+        int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+    )
+    return date_ns + seconds * NS_PER_SECOND
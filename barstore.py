@@ -0,0 +1,199 @@
+import os
+from threading import RLock
+
+import numpy as np
+import pandas as pd
+
+BARSTORE = "kotak_data/bars"
+BAR_DTYPE = np.dtype(
+    [
+        ("datetime", "i8"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("volume", "f8"),
+        ("OI", "f8"),
+    ]
+)
+BAR_COLUMNS = list(BAR_DTYPE.names[1:])
+
+
+class BarStore:
+    """Local 1-minute bar history, columnar, one partition per token-year.
+
+    ``kotak_data/bars/<token>/<YYYY>/`` holds one append-only file per
+    BAR_DTYPE field with the raw values in time order, read back through
+    np.memmap. Reads inside one partition are views of the files; a read
+    spanning years joins the partitions.
+    """
+
+    def __init__(self, root: str = BARSTORE) -> None:
+        self.root = root
+        self._lock = RLock()
+        self._last = {}
+
+    def _dir(self, token) -> str:
+        return os.path.join(self.root, str(token))
+
+    def partitions(self, token) -> list:
+        path = self._dir(token)
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.isdigit()
+        )
+
+    @staticmethod
+    def _open(partition: str) -> dict:
+        """Column views of a partition, cut to its shortest column."""
+        columns = {}
+        for name in BAR_DTYPE.names:
+            path = os.path.join(partition, f"{name}.bin")
+            if not os.path.exists(path) or os.path.getsize(path) < 8:
+                return _empty()
+            columns[name] = np.memmap(path, dtype=BAR_DTYPE[name], mode="r")
+        rows = min(column.shape[0] for column in columns.values())
+        return {name: column[:rows] for name, column in columns.items()}
+
+    def last_timestamp(self, token):
+        last = self._last.get(token)
+        if last is None:
+            for partition in reversed(self.partitions(token)):
+                times = self._open(partition)["datetime"]
+                if times.shape[0]:
+                    last = int(times[-1])
+                    break
+            self._last[token] = last
+        return None if last is None else pd.Timestamp(last)
+
+    def append(self, token, df: pd.DataFrame) -> int:
+        """Append bars newer than the last stored one; returns rows written."""
+        if df.shape[0] == 0:
+            return 0
+        records = to_records(df)
+        with self._lock:
+            last = self.last_timestamp(token)
+            if last is not None:
+                records = records[records["datetime"] > last.value]
+            if records.shape[0] == 0:
+                return 0
+            self._write(token, records)
+        return records.shape[0]
+
+    def _write(self, token, records: np.ndarray):
+        years = (
+            records["datetime"]
+            .astype("datetime64[ns]")
+            .astype("datetime64[Y]")
+            .astype(int)
+            + 1970
+        )
+        for year in np.unique(years):
+            partition = os.path.join(self._dir(token), str(year))
+            os.makedirs(partition, exist_ok=True)
+            rows = records[years == year]
+            _align(partition)
+            for name in BAR_DTYPE.names:
+                path = os.path.join(partition, f"{name}.bin")
+                with open(path, "ab") as f:
+                    f.write(np.ascontiguousarray(rows[name]).tobytes())
+        self._last[token] = int(records["datetime"][-1])
+
+    def read(self, token, start=None, end=None, size: int = None) -> dict:
+        """Columns of bars with ``start <= datetime < end``, by name.
+
+        ``start`` and ``end`` are anything pd.Timestamp accepts; ``size``
+        keeps only the last rows. Arrays are read-only memmap views when
+        the range falls in one partition.
+        """
+        start = None if start is None else pd.Timestamp(start).value
+        end = None if end is None else pd.Timestamp(end).value
+        parts = []
+        remaining = size
+        for partition in reversed(self.partitions(token)):
+            year = int(os.path.basename(partition))
+            if start is not None and _year_end(year) <= start:
+                break
+            if end is not None and _year_start(year) >= end:
+                continue
+            columns = self._open(partition)
+            times = columns["datetime"]
+            lo = 0 if start is None else int(np.searchsorted(times, start))
+            hi = (
+                len(times) if end is None else int(np.searchsorted(times, end))
+            )
+            if remaining is not None:
+                lo = max(lo, hi - remaining)
+                remaining -= hi - lo
+            parts.append({name: c[lo:hi] for name, c in columns.items()})
+            if remaining is not None and remaining <= 0:
+                break
+        if not parts:
+            return _empty()
+        if len(parts) == 1:
+            return parts[0]
+        return {
+            name: np.concatenate([part[name] for part in parts[::-1]])
+            for name in BAR_DTYPE.names
+        }
+
+    def frame(self, token, start=None, end=None, size: int = None):
+        """``read`` as a DataFrame over the same arrays."""
+        return to_frame(self.read(token, start, end, size))
+
+    def tail(self, token, size: int) -> dict:
+        """The last ``size`` bars."""
+        return self.read(token, size=size)
+
+
+def _empty() -> dict:
+    return {
+        name: np.empty(0, dtype=BAR_DTYPE[name]) for name in BAR_DTYPE.names
+    }
+
+
+def _align(partition: str):
+    """Cut every column of ``partition`` back to its shortest one, so an
+    append interrupted between columns does not shift later rows."""
+    lengths = {}
+    for name in BAR_DTYPE.names:
+        path = os.path.join(partition, f"{name}.bin")
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        lengths[name] = size // BAR_DTYPE[name].itemsize
+    rows = min(lengths.values())
+    for name, length in lengths.items():
+        if length > rows:
+            path = os.path.join(partition, f"{name}.bin")
+            os.truncate(path, rows * BAR_DTYPE[name].itemsize)
+
+
+def _year_start(year: int) -> int:
+    return pd.Timestamp(year=year, month=1, day=1).value
+
+
+def _year_end(year: int) -> int:
+    return _year_start(year + 1)
+
+
+def to_records(df: pd.DataFrame) -> np.ndarray:
+    df = df.sort_index()
+    records = np.empty(df.shape[0], dtype=BAR_DTYPE)
+    records["datetime"] = df.index.values.astype("datetime64[ns]").view("i8")
+    for column in BAR_COLUMNS:
+        records[column] = df[column].values
+    return records
+
+
+def to_frame(columns) -> pd.DataFrame:
+    """DataFrame over BAR_DTYPE columns (a record array or a dict of
+    arrays) without copying them."""
+    times = columns["datetime"].view("datetime64[ns]")
+    index = pd.DatetimeIndex(times, name="datetime", copy=False)
+    return pd.DataFrame(
+        {column: columns[column] for column in BAR_COLUMNS},
+        index=index,
+        copy=False,
+    )
@@ -0,0 +1,59 @@
+"""Cost of recording fills and reporting P&L as the ledger grows.
+
+Random fills over 200 tokens and 4 strategies are recorded in blocks
+up to a million (a few months of active paper trading). After each
+block the report is timed (best of five); it should stay flat because it reads the
+running totals, not the fills.
+
+Run from the repository root:
+    python -m benchmarks.bench_analytics
+"""
+
+import time
+
+import numpy as np
+
+from analytics import PnLLedger
+from utils import TransactionType
+
+BLOCKS = (10_000, 90_000, 900_000)
+
+
+def run():
+    rng = np.random.default_rng(0)
+    ledger = PnLLedger()
+    sides = (TransactionType.sell, TransactionType.buy)
+    strategies = ["trend", "mean", "breakout", "manual"]
+    for block in BLOCKS:
+        tokens = rng.integers(10_000, 10_200, block).tolist()
+        buys = rng.integers(0, 2, block).tolist()
+        quantities = rng.integers(1, 100, block).tolist()
+        prices = rng.uniform(50, 500, block).tolist()
+        names = rng.integers(0, len(strategies), block).tolist()
+
+        start = time.perf_counter()
+        for i in range(block):
+            ledger.record(
+                tokens[i],
+                sides[buys[i]],
+                quantities[i],
+                prices[i],
+                strategies[names[i]],
+            )
+        recorded = time.perf_counter() - start
+
+        report = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            summary = ledger.summary()
+            report = min(report, time.perf_counter() - start)
+        print(
+            f"{len(ledger.fills):8} fills  "
+            f"record {recorded / block * 1e6:5.2f} us/fill  "
+            f"summary {report * 1e3:6.2f} ms  "
+            f"net {summary['net']:14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
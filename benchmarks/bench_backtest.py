@@ -0,0 +1,65 @@
+"""Backtest of a year of 1-minute bars for 100 symbols.
+
+Bars are a random walk over 250 sessions of 375 minutes, held as the
+column arrays BarStore.read returns, and every symbol runs the default
+strategy on its own timeframe. The first run includes Numba compiling
+(or loading) the kernel, so the second one is reported too.
+
+Run from the repository root:
+    python -m benchmarks.bench_backtest
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import Backtest
+
+SYMBOLS = 100
+SESSIONS = 250
+STRATEGY = {
+    "rsi": 14,
+    "sma": 20,
+    "fast_period": 7,
+    "fast_multiplier": 3,
+    "slow_period": 10,
+    "slow_multiplier": 2,
+}
+
+
+def year_of_bars(seed: int) -> dict:
+    days = pd.bdate_range("2023-01-02", periods=SESSIONS, unit="ns")
+    minutes = pd.timedelta_range("09:15:00", periods=375, freq="min")
+    times = (days.values[:, None] + minutes.values[None, :]).ravel()
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, times.shape[0]))
+    spread = rng.uniform(0, 0.2, times.shape[0])
+    return {
+        "datetime": times.view("i8"),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+    }
+
+
+def run(symbols: int = SYMBOLS):
+    bars = {token: year_of_bars(token) for token in range(symbols)}
+    strategies = {
+        token: {**STRATEGY, "timeframe": (1, 3, 5, 15)[token % 4]}
+        for token in bars
+    }
+    rows = sum(columns["close"].shape[0] for columns in bars.values())
+    print(f"{symbols} symbols, {rows} 1-minute bars")
+    for label in ("first run", "second run"):
+        start = time.perf_counter()
+        summary = Backtest(strategies).run(bars)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{label:10} {elapsed:6.2f} s  "
+            f"{summary['trades'].sum()} trades  net {summary['net'].sum():.0f}"
+        )
+
+
+if __name__ == "__main__":
+    run()
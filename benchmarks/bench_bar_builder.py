@@ -0,0 +1,106 @@
+"""Ticks/second of BarBuilder against the resample-per-flush pandas path.
+
+Run from the repository root:
+    python -m benchmarks.bench_bar_builder
+"""
+
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+
+from bar_builder import NS_PER_MINUTE, BarBuilder
+
+AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "last",
+    "OI": "last",
+}
+COLUMNS = ["datetime", "open", "high", "low", "close", "volume", "OI"]
+
+
+def synthetic_ticks(tokens: int, minutes: int, ticks_per_minute: int):
+    rng = np.random.default_rng(7)
+    start = datetime.datetime(2023, 10, 16, 9, 15)
+    n = minutes * ticks_per_minute
+    offsets = np.sort(rng.integers(0, minutes * 60, n))
+    ticks = []
+    for token in range(tokens):
+        ltp = 100 + np.cumsum(rng.normal(0, 0.05, n))
+        for i in range(n):
+            ts = start + datetime.timedelta(seconds=int(offsets[i]))
+            ticks.append(
+                (
+                    token,
+                    ts.strftime("%d/%m/%Y %H:%M:%S"),
+                    int((ts - datetime.datetime(1970, 1, 1)).total_seconds())
+                    * 1_000_000_000,
+                    float(ltp[i]),
+                    i,
+                    1000,
+                )
+            )
+    ticks.sort(key=lambda tick: tick[2])
+    return ticks
+
+
+def pandas_path(ticks, timeframe: int, flush_every: int):
+    data_list = {}
+    incomplete_1 = {}
+    incomplete_tf = {}
+    for n, (token, text, _, ltp, volume, oi) in enumerate(ticks, 1):
+        data_list.setdefault(token, []).append(
+            (text, ltp, ltp, ltp, ltp, volume, oi)
+        )
+        if n % flush_every:
+            continue
+        for token, data in data_list.items():
+            df = pd.DataFrame(data, columns=COLUMNS)
+            df["datetime"] = pd.to_datetime(
+                df["datetime"], format="%d/%m/%Y %H:%M:%S"
+            )
+            df = df.resample("1min", on="datetime").agg(AGG)
+            df = pd.concat([incomplete_1.get(token), df])
+            df = df.groupby(df.index).agg(AGG)
+            last = df.index[-1]
+            incomplete_1[token] = df[df.index >= last]
+            df = df[df.index < last]
+            if df.shape[0] == 0:
+                continue
+            df = df.resample(f"{timeframe}min").agg(AGG)
+            df = pd.concat([incomplete_tf.get(token), df])
+            df = df.groupby(df.index).agg(AGG)
+            incomplete_tf[token] = df[df.index >= df.index[-1]]
+        data_list.clear()
+
+
+def builder_path(ticks, timeframe: int, flush_every: int):
+    builder = BarBuilder()
+    for token in {tick[0] for tick in ticks}:
+        builder.set_timeframe(token, timeframe)
+    for n, (token, _, timestamp, ltp, volume, oi) in enumerate(ticks, 1):
+        builder.update(token, timestamp, ltp, volume, oi)
+        if n % flush_every == 0:
+            builder.close_until(timestamp - timestamp % NS_PER_MINUTE)
+            builder.drain()
+
+
+def run(tokens: int = 20, minutes: int = 30, ticks_per_minute: int = 120):
+    ticks = synthetic_ticks(tokens, minutes, ticks_per_minute)
+    flush_every = tokens * ticks_per_minute // 2
+    for name, path in (("pandas", pandas_path), ("builder", builder_path)):
+        start = time.perf_counter()
+        path(ticks, timeframe=5, flush_every=flush_every)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:>8}: {len(ticks)} ticks in {elapsed:.3f}s "
+            f"-> {len(ticks) / elapsed:,.0f} ticks/s"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+"""Reading a year of 1-minute bars for one token from BarStore.
+
+A year of market-hours bars (250 sessions of 375 minutes) is written
+once, then read back whole, as one month and as the last 500 bars, as
+column arrays and as a DataFrame, with a fresh store each time so the
+files are opened on every read.
+
+Run from the repository root:
+    python -m benchmarks.bench_barstore
+"""
+
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from barstore import BAR_COLUMNS, BarStore
+
+SESSIONS = 250
+REPEAT = 50
+
+
+def year_of_bars() -> pd.DataFrame:
+    days = pd.bdate_range("2023-01-02", periods=SESSIONS, unit="ns")
+    minutes = pd.timedelta_range("09:15:00", periods=375, freq="min")
+    index = pd.DatetimeIndex(
+        (days.values[:, None] + minutes.values[None, :]).ravel(),
+        name="datetime",
+    )
+    close = 100 + np.cumsum(
+        np.random.default_rng(0).normal(0, 0.1, len(index))
+    )
+    return pd.DataFrame({column: close for column in BAR_COLUMNS}, index=index)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1e3
+
+
+def run():
+    df = year_of_bars()
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        BarStore(root).append(101, df)
+        write = time.perf_counter() - start
+        print(f"{df.shape[0]} bars written in {write * 1e3:.1f} ms")
+
+        queries = {
+            "year": {},
+            "month": {"start": "2023-06-01", "end": "2023-07-01"},
+            "last 500": {"size": 500},
+        }
+        for label, query in queries.items():
+            arrays = timed(lambda: BarStore(root).read(101, **query))
+            frame = timed(lambda: BarStore(root).frame(101, **query))
+            total = timed(
+                lambda: BarStore(root).read(101, **query)["close"].sum()
+            )
+            print(
+                f"{label:9} arrays {arrays:6.2f} ms  DataFrame {frame:6.2f} ms"
+                f"  arrays + sum(close) {total:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    run()
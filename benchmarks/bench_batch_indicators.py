@@ -0,0 +1,71 @@
+"""Minute-close cost for a whole watchlist: per-token engines vs batch.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_indicators
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from indicator_engine import BatchIndicatorEngine, IndicatorEngine, signal_code
+
+
+def watchlist(tokens: int, history: int, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    strategies, bars = {}, {}
+    for token in range(tokens):
+        strategies[token] = {
+            "rsi": int(rng.integers(7, 21)),
+            "sma": int(rng.integers(10, 50)),
+            "fast_period": int(rng.integers(5, 12)),
+            "fast_multiplier": int(rng.integers(1, 4)),
+            "slow_period": int(rng.integers(10, 21)),
+            "slow_multiplier": int(rng.integers(1, 4)),
+        }
+        close = 100 + np.cumsum(rng.normal(0, 1, history))
+        bars[token] = pd.DataFrame(
+            {
+                "open": close,
+                "high": close + rng.uniform(0, 1, history),
+                "low": close - rng.uniform(0, 1, history),
+                "close": close,
+                "volume": 0.0,
+                "OI": 0.0,
+            }
+        )
+    return strategies, bars
+
+
+def run(tokens: int = 200, history: int = 100, closes: int = 50):
+    strategies, bars = watchlist(tokens, history + closes)
+    warm = {token: df.iloc[:history] for token, df in bars.items()}
+    steps = [
+        {token: df.iloc[i : i + 1] for token, df in bars.items()}
+        for i in range(history, history + closes)
+    ]
+
+    engines = {token: IndicatorEngine(s) for token, s in strategies.items()}
+    for token, df in warm.items():
+        engines[token].update_frame(df)
+    start = time.perf_counter()
+    for step in steps:
+        for token, df in step.items():
+            signal_code(engines[token].update_frame(df))
+    per_token = (time.perf_counter() - start) / closes
+
+    batch = BatchIndicatorEngine(strategies)
+    batch.update(warm)
+    start = time.perf_counter()
+    for step in steps:
+        batch.update(step)
+    batched = (time.perf_counter() - start) / closes
+
+    print(f"{tokens} tokens, per minute-close:")
+    print(f"  per-token engines: {per_token * 1e3:8.3f} ms")
+    print(f"  batch kernel:      {batched * 1e3:8.3f} ms")
+
+
+if __name__ == "__main__":
+    run()
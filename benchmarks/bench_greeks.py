@@ -0,0 +1,77 @@
+"""Full-chain IV and Greeks: per-contract py_vollib vs black_scholes.
+
+Run from the repository root:
+    python -m benchmarks.bench_greeks
+"""
+
+import time
+
+import numpy as np
+from py_vollib.black_scholes import black_scholes
+from py_vollib.black_scholes.greeks import analytical
+from py_vollib.black_scholes.implied_volatility import (
+    implied_volatility as vollib_iv,
+)
+
+from black_scholes import greeks, implied_volatility
+
+RATE = 0.1
+
+
+def make_chain(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    S = np.full(n, 19500.0)
+    K = 19500.0 + 50.0 * rng.integers(-40, 41, n)
+    t = rng.uniform(1, 30, n) / 365
+    sigma = rng.uniform(0.08, 0.6, n)
+    flag = np.where(rng.random(n) < 0.5, "c", "p")
+    price = np.array(
+        [
+            black_scholes(f, s, k, tt, RATE, v)
+            for f, s, k, tt, v in zip(flag, S, K, t, sigma)
+        ]
+    )
+    return flag, S, K, t, price
+
+
+def vollib(flag, S, K, t, price):
+    for f, s, k, tt, p in zip(flag, S, K, t, price):
+        try:
+            iv = vollib_iv(p, s, k, tt, RATE, f)
+        except Exception:
+            continue
+        for name in ("delta", "gamma", "theta", "vega", "rho"):
+            getattr(analytical, name)(f, s, k, tt, RATE, iv)
+
+
+def vectorized(flag, S, K, t, price):
+    iv = implied_volatility(price, S, K, t, RATE, flag)
+    return greeks(flag, S, K, t, RATE, iv)
+
+
+def run(contracts: int = 20000, sample: int = 1000, repeat: int = 5):
+    chain = make_chain(contracts)
+    vectorized(*(column[:10] for column in chain))  # JIT compile
+
+    start = time.perf_counter()
+    vollib(*(column[:sample] for column in chain))
+    per_contract = (time.perf_counter() - start) / sample
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        vectorized(*chain)
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        f"py_vollib loop: {1e-3 / per_contract:.1f} contracts/ms "
+        f"(~{per_contract * contracts:.2f} s for {contracts})"
+    )
+    print(
+        f"black_scholes: {contracts / best / 1e3:.0f} contracts/ms "
+        f"({best * 1e3:.1f} ms for {contracts})"
+    )
+
+
+if __name__ == "__main__":
+    run()
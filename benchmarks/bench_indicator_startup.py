@@ -0,0 +1,118 @@
+"""Indicator() construction time, cold (empty BarStore) vs warm.
+
+Firestore is replaced by an in-memory fake that sleeps for a fixed
+round-trip latency per query, so the numbers show how many network
+round trips startup still depends on.
+
+Run from the repository root:
+    python -m benchmarks.bench_indicator_startup
+"""
+
+import datetime
+import tempfile
+import time
+
+import numpy as np
+
+import indicators
+from barstore import BarStore
+
+LATENCY = 0.05
+STRATEGY = {
+    "rsi": 14,
+    "sma": 20,
+    "fast_period": 7,
+    "fast_multiplier": 3,
+    "slow_period": 10,
+    "slow_multiplier": 2,
+    "timeframe": 5,
+}
+
+
+class FakeDoc:
+    def __init__(self, id: str, data: dict) -> None:
+        self.id = id
+        self._data = data
+
+    def get(self, key):
+        return self._data[key]
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeFirestore:
+    def __init__(self, tokens: int, days: int) -> None:
+        rng = np.random.default_rng(11)
+        self.watchlist = [
+            FakeDoc(f"NSE_STOCK{token}", {"instrumentToken": token})
+            for token in range(tokens)
+        ]
+        self.ohlcv = {}
+        times = [
+            datetime.datetime(2023, 10, 2, 9, 15)
+            + datetime.timedelta(days=day, minutes=minute)
+            for day in range(days)
+            for minute in range(375)
+        ]
+        for doc in self.watchlist:
+            close = 100 + np.cumsum(rng.normal(0, 0.1, len(times)))
+            self.ohlcv[doc.id] = [
+                FakeDoc(
+                    ts.strftime("%Y-%m-%d %H:%M:%S"),
+                    {
+                        "open": c,
+                        "high": c + 0.1,
+                        "low": c - 0.1,
+                        "close": c,
+                        "volume": 0,
+                        "OI": 0,
+                    },
+                )
+                for ts, c in zip(times, close)
+            ]
+        self.calls = 0
+
+    def _round_trip(self):
+        self.calls += 1
+        time.sleep(LATENCY)
+
+    def get_watchlist(self):
+        self._round_trip()
+        return iter(self.watchlist)
+
+    def get_strategy(self, documentName):
+        self._round_trip()
+        return FakeDoc("strategy", STRATEGY)
+
+    def get_ohlcv(self, documentName, size):
+        self._round_trip()
+        return iter(self.ohlcv[documentName][::-1][:size])
+
+    def get_ohlcv_since(self, documentName, since, size):
+        self._round_trip()
+        newer = [doc for doc in self.ohlcv[documentName] if doc.id > since]
+        return iter(newer[::-1][:size])
+
+
+def run(tokens: int = 100, days: int = 2):
+    fake = FakeFirestore(tokens, days)
+    for name in ("get_watchlist", "get_strategy", "get_ohlcv"):
+        setattr(indicators.Firestore, name, getattr(fake, name))
+    indicators.Firestore.get_ohlcv_since = fake.get_ohlcv_since
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root)
+        for label in ("cold", "warm"):
+            fake.calls = 0
+            start = time.perf_counter()
+            indicators.Indicator(bar_store=store)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label}: Indicator() for {tokens} tokens in {elapsed:.3f}s "
+                f"({fake.calls} Firestore round trips of {LATENCY * 1e3:.0f} ms)"
+            )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,100 @@
+"""Instrument lookups: InstrumentMaster vs filtering the token frame.
+
+Uses a synthetic F&O table of about 100k contracts. The frame filter is
+a lower bound for the old ``pd.read_hdf(..., where=...)`` path, which
+also opens and decompresses the HDF5 file on every call.
+
+Run from the repository root:
+    python -m benchmarks.bench_instruments
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from instruments import InstrumentMaster
+
+
+def make_tokens(underlyings: int = 200):
+    names = [f"STOCK{i}" for i in range(underlyings)]
+    cash = pd.DataFrame(
+        {"instrumentName": names, "exchange": "NSE"},
+        index=pd.Index(np.arange(underlyings), name="instrumentToken"),
+    )
+    name, expiry, option_type, strike = [], [], [], []
+    for i in names:
+        for e in ("05OCT23", "12OCT23", "19OCT23", "26OCT23"):
+            for t in ("CE", "PE"):
+                strikes = np.arange(18000, 21000, 50)
+                name += [i] * len(strikes)
+                expiry += [e] * len(strikes)
+                option_type += [t] * len(strikes)
+                strike.append(strikes)
+    fno = pd.DataFrame(
+        {
+            "instrumentName": name,
+            "expiry": expiry,
+            "optionType": option_type,
+            "strike": np.concatenate(strike),
+        }
+    )
+    fno.index = pd.Index(
+        np.arange(100000, 100000 + len(fno)), name="instrumentToken"
+    )
+    return cash, fno
+
+
+def timeit(fn, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run():
+    cash, fno = make_tokens()
+    start = time.perf_counter()
+    master = InstrumentMaster(cash, fno)
+    build = time.perf_counter() - start
+
+    def frame_query():
+        return fno[
+            (fno["instrumentName"] == "STOCK150")
+            & (fno["optionType"] == "CE")
+            & (fno["strike"] >= 19500)
+            & (fno["strike"] <= 20085)
+        ]
+
+    def index_query():
+        return master.fno.strike_range(
+            "STOCK150", "CE", 19500, 20085, "12OCT23"
+        )
+
+    lookups = {
+        "frame filter": (frame_query, 200),
+        "strike_range": (index_query, 10000),
+        "nearest_strike": (
+            lambda: master.fno.nearest_strike(
+                "STOCK150", "PE", 19512.3, "12OCT23"
+            ),
+            10000,
+        ),
+        "cash_token": (lambda: master.cash_token(150), 10000),
+        "find_fno": (
+            lambda: master.find_fno(
+                strikeRange=(19500, 20085),
+                instrumentName="STOCK150",
+                optionType="CE",
+            ),
+            200,
+        ),
+    }
+    assert len(frame_query()) == 4 * len(index_query())
+    print(f"{len(fno)} F&O contracts, index built in {build * 1e3:.0f} ms")
+    for name, (fn, repeat) in lookups.items():
+        print(f"{name:15} {timeit(fn, repeat) * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+"""Tick journal write cost, sequential read rate and time lookups.
+
+A trading day of ticks (TICKS records) is appended one call at a time,
+as the feed callback does, then scanned in chunks and queried by time.
+
+Run from the repository root:
+    python -m benchmarks.bench_journal
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from bar_builder import NS_PER_SECOND
+from journal import JournalReader, TickJournal
+
+TICKS = 2_000_000
+START = 1_697_447_700 * NS_PER_SECOND  # 2023-10-16 09:15 IST
+
+
+def run(ticks: int = TICKS):
+    rng = np.random.default_rng(0)
+    times = START + np.sort(rng.integers(0, 375 * 60, ticks)) * NS_PER_SECOND
+    tokens = rng.integers(1000, 1100, ticks)
+    ltp = 100 + rng.normal(0, 1, ticks)
+    rows = list(zip(tokens.tolist(), times.tolist(), ltp.tolist()))
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = TickJournal(directory)
+        start = time.perf_counter()
+        for token, timestamp, price in rows:
+            journal.append(token, timestamp, price, 10, 100)
+        journal.flush()
+        write = time.perf_counter() - start
+        path = journal.path
+        journal.close()
+
+        reader = JournalReader(path)
+        start = time.perf_counter()
+        total = 0.0
+        for chunk in reader.chunks():
+            total += chunk["ltp"].sum()
+        scan = time.perf_counter() - start
+
+        queries = rng.integers(times[0], times[-1], 1000)
+        start = time.perf_counter()
+        for query in queries.tolist():
+            reader.between(query, query + 60 * NS_PER_SECOND)
+        lookup = (time.perf_counter() - start) / queries.shape[0]
+
+        mb = reader.records.nbytes / 2**20
+        print(f"{ticks} ticks, {mb:.0f} MiB")
+        print(f"append:     {write / ticks * 1e9:6.0f} ns/tick")
+        print(f"scan:       {ticks / scan / 1e6:6.1f} M ticks/s")
+        print(f"1 min slice {lookup * 1e6:6.1f} us")
+
+
+if __name__ == "__main__":
+    run()
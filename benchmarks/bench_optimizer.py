@@ -0,0 +1,67 @@
+"""Parameter sweep throughput and scaling with process pool size.
+
+The default grid (2187 combinations over three timeframes) is swept
+over a year of 1-minute bars for one token, first inline to show how
+often the indicator cache is hit, then on pools of increasing size.
+Pool timings include starting the workers.
+
+Run from the repository root:
+    python -m benchmarks.bench_optimizer
+"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import optimizer
+from optimizer import Optimizer, grid
+
+SESSIONS = 250
+
+
+def year_of_bars() -> dict:
+    days = pd.bdate_range("2023-01-02", periods=SESSIONS, unit="ns")
+    minutes = pd.timedelta_range("09:15:00", periods=375, freq="min")
+    times = (days.values[:, None] + minutes.values[None, :]).ravel()
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, times.shape[0]))
+    spread = rng.uniform(0, 0.2, times.shape[0])
+    return {
+        "datetime": times.view("i8"),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+    }
+
+
+def run():
+    bars = year_of_bars()
+    combinations = grid()
+    print(f"{len(combinations)} combinations, {bars['close'].shape[0]} bars")
+
+    Optimizer(workers=1).run(bars, combinations[:8])  # compile
+    start = time.perf_counter()
+    Optimizer(workers=1).run(bars, combinations)
+    inline = time.perf_counter() - start
+    cache = optimizer._component.cache_info()
+    print(
+        f"inline     {inline:6.2f} s  {len(combinations) / inline:6.0f}/s  "
+        f"indicator cache {cache.hits} hits, {cache.misses} computed"
+    )
+
+    cores = os.cpu_count()
+    for workers in sorted({2, 4, cores} - {1}):
+        start = time.perf_counter()
+        Optimizer(workers=workers).run(bars, combinations)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{workers:2} workers {elapsed:6.2f} s  "
+            f"{len(combinations) / elapsed:6.0f}/s  "
+            f"speedup {inline / elapsed:4.1f}x ({cores} cores)"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,75 @@
+"""Latency of quoting an option chain: serial get_quote vs get_ltps.
+
+The broker is replaced by a local stub whose quote endpoint sleeps for a
+fixed round-trip latency, with and without multi-token support. The
+quote cache is cleared before each cold measurement; the last one
+repeats get_ltps within the cache TTL.
+
+Run from the repository root:
+    python -m benchmarks.bench_option_quotes
+"""
+
+import time
+
+from kotakclient import KotakClient
+from orderclient import get_ltps, get_quote
+from quotecache import quote_cache
+from utils import QuoteType
+
+LATENCY = 0.08
+
+
+class StubQuoteClient:
+    def __init__(self, bulk: bool) -> None:
+        self.bulk = bulk
+        self.calls = 0
+
+    def quote(self, instrument_token, quote_type=None):
+        self.calls += 1
+        time.sleep(LATENCY)
+        tokens = str(instrument_token).split(",")
+        if len(tokens) > 1 and not self.bulk:
+            raise ValueError("Invalid instrument token")
+        return {
+            "success": [
+                {"instrumentToken": token, "lastPrice": "101.5"}
+                for token in tokens
+            ]
+        }
+
+
+def run(strikes: int = 30):
+    chain = list(range(50000, 50000 + strikes))
+    for bulk in (True, False):
+        stub = StubQuoteClient(bulk)
+        KotakClient._KotakClient__client = stub
+
+        quote_cache.clear()
+        start = time.perf_counter()
+        for token in chain:
+            get_quote(token, QuoteType.ltp)
+        serial = time.perf_counter() - start
+
+        stub.calls = 0
+        quote_cache.clear()
+        start = time.perf_counter()
+        prices = get_ltps(chain)
+        batched = time.perf_counter() - start
+        assert len(prices) == strikes
+        calls = stub.calls
+
+        start = time.perf_counter()
+        get_ltps(chain)
+        cached = time.perf_counter() - start
+
+        label = "bulk endpoint" if bulk else "single-token endpoint"
+        print(
+            f"{label}: {strikes} strikes, serial {serial * 1e3:.0f} ms, "
+            f"get_ltps {batched * 1e3:.0f} ms ({calls} calls), "
+            f"cached {cached * 1e3:.2f} ms ({stub.calls - calls} calls)"
+        )
+    print(quote_cache.metrics())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,156 @@
+"""Tick-to-signal latency: thread flush model vs AsyncPipeline.
+
+Ticks for every token are replayed from a feeder thread, as the broker
+callback would deliver them, on a compressed clock where one market
+minute lasts MINUTE seconds. Latency is measured from the moment a bar
+could close (the clock passing its end) to the indicator evaluating it.
+
+The thread model mirrors LiveFeed with a BarBuilder: the callback
+updates the builder and a flush every FLUSH_INTERVAL seconds (the feed's
+disconnect/reconnect cadence) hands bars to the Dispatcher, where
+Indicator.update_bars stores and then evaluates them. Storing is a
+sleep of STORE_LATENCY seconds standing in for Firestore.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from async_pipeline import AsyncPipeline
+from bar_builder import NS_PER_MINUTE, BarBuilder
+from dispatcher import COALESCE, Dispatcher
+from indicator_engine import IndicatorEngine
+
+MINUTE = 0.5
+FLUSH_INTERVAL = 1.0
+STORE_LATENCY = 0.002
+TICKS_PER_MINUTE = 50
+STRATEGY = {
+    "rsi": 14,
+    "sma": 20,
+    "fast_period": 7,
+    "fast_multiplier": 3,
+    "slow_period": 10,
+    "slow_multiplier": 2,
+}
+
+
+class SimClock:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __call__(self) -> int:
+        elapsed = time.perf_counter() - self.start
+        return int(elapsed / MINUTE * NS_PER_MINUTE)
+
+    def wall(self, ns: int) -> float:
+        return self.start + ns / NS_PER_MINUTE * MINUTE
+
+
+class ReplayIndicator:
+    """The parts of Indicator the flush paths call, with timing."""
+
+    def __init__(self, tokens, clock: SimClock) -> None:
+        self.clock = clock
+        self.timeframe = defaultdict(lambda: 1)
+        self.engine = {token: IndicatorEngine(STRATEGY) for token in tokens}
+        self.latency = []
+        self.dispatcher = None
+
+    def store_ohlcv(self, token, df):
+        time.sleep(STORE_LATENCY)
+
+    def evaluate(self, token, df):
+        self.engine[token].update_frame(df)
+        now = time.perf_counter()
+        for start in df.index.asi8:
+            end = self.clock.wall(int(start) + NS_PER_MINUTE)
+            self.latency.append(now - end)
+
+    def update_bars(self, token, bars):
+        self.store_ohlcv(token, bars[1])
+        self.evaluate(token, bars[1])
+
+
+def replay(tokens, minutes: int, clock: SimClock, on_tick):
+    rng = np.random.default_rng(1)
+    interval = MINUTE / TICKS_PER_MINUTE
+    ltp = {token: 100.0 for token in tokens}
+    for i in range(minutes * TICKS_PER_MINUTE):
+        due = clock.start + i * interval
+        time.sleep(max(0.0, due - time.perf_counter()))
+        timestamp = clock()
+        for token in tokens:
+            ltp[token] += rng.normal(0, 0.05)
+            on_tick(token, timestamp, ltp[token], i, 1000)
+
+
+def run_threads(tokens, minutes: int):
+    clock = SimClock()
+    indicator = ReplayIndicator(tokens, clock)
+    builder = BarBuilder()
+    dispatcher = Dispatcher(workers=8, policy=COALESCE, name="replay")
+    done = threading.Event()
+
+    def flush():
+        builder.close_until(clock())
+        for token, bars in builder.drain().items():
+            dispatcher.submit(token, indicator.update_bars, token, bars)
+
+    def flush_loop():
+        while not done.wait(FLUSH_INTERVAL):
+            flush()
+
+    flusher = threading.Thread(target=flush_loop)
+    flusher.start()
+    replay(tokens, minutes, clock, builder.update)
+    time.sleep(MINUTE)
+    done.set()
+    flusher.join()
+    flush()
+    dispatcher.close()
+    return indicator.latency
+
+
+async def run_asyncio(tokens, minutes: int):
+    clock = SimClock()
+    indicator = ReplayIndicator(tokens, clock)
+    pipeline = AsyncPipeline(
+        indicator, BarBuilder(), flush_interval=MINUTE / 10, clock=clock
+    )
+    await pipeline.start()
+    feeder = asyncio.get_running_loop().run_in_executor(
+        None, replay, tokens, minutes, clock, pipeline.on_tick
+    )
+    await feeder
+    await asyncio.sleep(MINUTE)
+    await pipeline.stop()
+    return indicator.latency
+
+
+def summary(label: str, latency: list):
+    ms = np.array(latency) * 1e3
+    print(
+        f"{label:8} bars {ms.shape[0]:5}  p50 {np.percentile(ms, 50):7.1f} ms"
+        f"  p99 {np.percentile(ms, 99):7.1f} ms  max {ms.max():7.1f} ms"
+    )
+
+
+def run(tokens: int = 50, minutes: int = 12):
+    tokens = list(range(1000, 1000 + tokens))
+    print(
+        f"{len(tokens)} tokens, {minutes} minutes of {MINUTE} s, "
+        f"flush every {FLUSH_INTERVAL} s in the thread model"
+    )
+    summary("thread", run_threads(tokens, minutes))
+    summary("asyncio", asyncio.run(run_asyncio(tokens, minutes)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,110 @@
+"""Decode time and memory of a 10k-row trade book.
+
+The synthetic book has every _TradeParams field plus a few the records
+drop, as ks_api returns it after JSON parsing. Each layout is timed and
+its retained memory measured with tracemalloc: the raw dicts, slotted
+_TradeParams records, and the columnar Book. Lookups by orderId are
+compared against scanning the raw rows.
+
+Run from the repository root:
+    python -m benchmarks.bench_records
+"""
+
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from records import decode_records, trade_book
+from utils import _TradeParams
+
+ROWS = 10_000
+
+
+def synthetic_trades(rows: int = ROWS, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    tokens = rng.integers(10_000, 10_200, rows).tolist()
+    prices = np.round(rng.uniform(50, 500, rows), 2).tolist()
+    return [
+        {
+            "exchange": "NSE",
+            "exchangeTradeId": f"{9_000_000 + i}",
+            "expiryDate": "26OCT23",
+            "instrumentName": f"NIFTY{tokens[i]}",
+            "instrumentToken": tokens[i],
+            "instrumentType": "OPTIDX",
+            "isFNO": "Y",
+            "marketExchange": "NSE",
+            "marketLot": 50,
+            "multiplier": 1,
+            "optionType": "CE" if i % 2 else "PE",
+            "orderId": 2_310_160_000 + i // 2,
+            "orderTimestamp": "Oct 16 2023 09:15:01:000AM",
+            "price": f"{prices[i]}",
+            "product": "MIS",
+            "quantity": 50,
+            "statusInfo": "",
+            "statusMessage": "Traded",
+            "strikePrice": 19_500,
+            "tradeId": i,
+            "tradeTimestamp": "Oct 16 2023 09:15:01:000AM",
+            "transactionType": "BUY" if i % 3 else "SELL",
+            "brokerage": 0,
+            "remarks": "",
+        }
+        for i in range(rows)
+    ]
+
+
+def measure(build):
+    """Best time of three builds and the memory the result retains."""
+    elapsed = min(_timed(build) for _ in range(3))
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def _timed(build) -> float:
+    start = time.perf_counter()
+    build()
+    return time.perf_counter() - start
+
+
+def run(rows: int = ROWS):
+    raw = synthetic_trades(rows)
+    print(f"{rows} trades")
+    layouts = {
+        "raw dicts": lambda: [dict(row) for row in raw],
+        "records": lambda: decode_records(_TradeParams, raw),
+        "book": lambda: trade_book(raw),
+    }
+    results = {}
+    for label, build in layouts.items():
+        results[label], elapsed, retained = measure(build)
+        print(
+            f"{label:10} build {elapsed * 1e3:7.2f} ms  "
+            f"{retained / 2**20:6.2f} MiB  {retained / rows:5.0f} B/row"
+        )
+
+    order_ids = [row["orderId"] for row in raw[:: max(rows // 100, 1)]]
+    start = time.perf_counter()
+    for order_id in order_ids:
+        [row for row in raw if row["orderId"] == order_id]
+    scan = (time.perf_counter() - start) / len(order_ids)
+    book = results["book"]
+    start = time.perf_counter()
+    for order_id in order_ids:
+        book.by_order(order_id)
+    indexed = (time.perf_counter() - start) / len(order_ids)
+    print(
+        f"orderId lookup: scan {scan * 1e6:.0f} us, "
+        f"indexed {indexed * 1e6:.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,130 @@
+"""Offline load test of LiveFeed driven by the tick replay engine.
+
+Synthetic feed messages for 10, 100 and 1000 tokens go through the real
+LiveFeed.callback_method with a BarBuilder, a StubBroker standing in for
+the Kotak websocket, and an observer that evaluates an IndicatorEngine
+per token on every closed bar. Bars close on replayed market time, so a
+session that took MINUTES minutes in the market runs as fast as the
+pipeline allows.
+
+Reported per run: ticks/second through the callback, bar-close latency
+(last tick of a token to its bar being handed out) and indicator latency
+(bar close to evaluation on the dispatcher), both from the tracer, the
+compute time of one evaluation, and the growth of peak resident memory.
+
+Run from the repository root:
+    python -m benchmarks.bench_replay
+"""
+
+import resource
+import time
+from collections import defaultdict
+
+from bar_builder import BarBuilder
+from dispatcher import COALESCE, Dispatcher
+from indicator_engine import IndicatorEngine
+from livefeed import LiveFeed, TickBuffer
+from replay import StubBroker, TickReplay, synthetic_messages
+from tracing import tracer
+
+MINUTES = 5
+TICKS_PER_MINUTE = 60
+STRATEGY = {
+    "rsi": 14,
+    "sma": 20,
+    "fast_period": 7,
+    "fast_multiplier": 3,
+    "slow_period": 10,
+    "slow_multiplier": 2,
+}
+
+
+class EvaluatingObserver:
+    """Indicator.update_bars without the Firestore writes."""
+
+    def __init__(self) -> None:
+        self.engine = defaultdict(lambda: IndicatorEngine(STRATEGY))
+        # Per token: the dispatcher runs one call per token at a time
+        self.compute = defaultdict(int)
+
+    def update_bars(self, token, bars):
+        start = time.perf_counter_ns()
+        self.engine[token].update_frame(bars[1])
+        self.compute[token] += time.perf_counter_ns() - start
+        tracer.stamp(token, "evaluate")
+
+    @property
+    def bars(self) -> int:
+        return sum(engine.count for engine in self.engine.values())
+
+
+def offline_feed(observer, replay: TickReplay) -> LiveFeed:
+    """The LiveFeed singleton without its Firestore watchlist."""
+    feed = LiveFeed.__new__(LiveFeed)
+    feed._observers = {observer}
+    LiveFeed.tickBuffer = defaultdict(TickBuffer)
+    LiveFeed.dispatcher = Dispatcher(workers=8, policy=COALESCE)
+    LiveFeed.clock = replay.clock
+    feed.use_bar_builder(BarBuilder())
+    return feed
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_once(tokens: int, minutes: int = MINUTES, speed: float = None):
+    messages = synthetic_messages(
+        range(1000, 1000 + tokens), minutes, TICKS_PER_MINUTE
+    )
+    broker = StubBroker().install()
+    replay = TickReplay(messages, broker, speed=speed)
+    observer = EvaluatingObserver()
+    offline_feed(observer, replay)
+    tracer.reset()
+
+    rss = max_rss_mb()
+    broker.subscribe(
+        ",".join(str(token) for token in range(1000, 1000 + tokens)),
+        LiveFeed.callback_method,
+        disconnect_event=LiveFeed.disconnect_event,
+        connect_event=LiveFeed.connect_event,
+    )
+    result = replay.run()
+    LiveFeed.dispatcher.join()
+    LiveFeed.dispatcher.close()
+
+    latency = tracer.snapshot()
+    buffers = sum(
+        buffer._data.nbytes for buffer in LiveFeed.tickBuffer.values()
+    )
+    compute = sum(observer.compute.values())
+    print(
+        f"{tokens:5} tokens  {result['ticks']:7} ticks  "
+        f"{result['ticks_per_second']:9.0f} ticks/s  "
+        f"{observer.bars:6} bars  "
+        f"evaluate {compute / max(observer.bars, 1) / 1e3:5.1f} us/bar"
+    )
+    for stage in ("bar_close", "evaluate"):
+        summary = latency[stage]
+        print(
+            f"      {stage:9}  p50 {summary['p50_us']:9.1f} us  "
+            f"p99 {summary['p99_us']:9.1f} us  max {summary['max_us']:9.1f} us"
+        )
+    print(
+        f"      memory     +{max_rss_mb() - rss:.1f} MiB peak RSS, "
+        f"{buffers / 2**20:.1f} MiB tick buffers"
+    )
+
+
+def run(sizes=(10, 100, 1000), minutes: int = MINUTES, speed: float = None):
+    print(
+        f"{minutes} market minutes, {TICKS_PER_MINUTE} ticks/minute/token, "
+        f"speed {'max' if speed is None else f'{speed}x'}"
+    )
+    for tokens in sizes:
+        run_once(tokens, minutes, speed)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,127 @@
+"""Scrip-master ingest: default read_csv + HDF5 vs read_scrip + snapshot.
+
+Writes a synthetic pipe-delimited F&O scrip file and reports wall time
+and peak traced memory for parsing, writing and reloading each way. The
+HDF5 columns are skipped when PyTables is not installed.
+
+Run from the repository root:
+    python -m benchmarks.bench_scrip_ingest
+"""
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from scripmaster import load_snapshot, read_scrip, save_snapshot
+
+HEADER = (
+    "instrumentToken|instrumentName|name|lastPrice|expiry|strike|tickSize|"
+    "lotSize|instrumentType|segment|exchange|isin|multiplier|"
+    "exchangeToken|optionType"
+)
+
+
+def write_scrip(path: str, rows: int = 400_000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"STOCK{i}" for i in range(500)])
+    expiries = np.array(["26OCT23", "30NOV23", "28DEC23", "05OCT23"])
+    exchanges = np.array(["NSE"] * 8 + ["BSE", "MCX"])
+    name = names[rng.integers(0, len(names), rows)]
+    df = pd.DataFrame(
+        {
+            "instrumentToken": np.arange(rows) + 35000,
+            "instrumentName": name,
+            "name": name,
+            "lastPrice": rng.uniform(0, 500, rows).round(2),
+            "expiry": expiries[rng.integers(0, len(expiries), rows)],
+            "strike": rng.integers(100, 4000, rows) * 5.0,
+            "tickSize": 0.05,
+            "lotSize": rng.integers(1, 20, rows) * 25,
+            "instrumentType": "OS",
+            "segment": "FO",
+            "exchange": exchanges[rng.integers(0, len(exchanges), rows)],
+            "isin": "",
+            "multiplier": 1,
+            "exchangeToken": np.arange(rows) + 35000,
+            "optionType": np.where(rng.random(rows) < 0.5, "CE", "PE"),
+        }
+    )
+    df.to_csv(path, sep="|", index=False)
+
+
+def measure(fn):
+    # Timed and traced separately: tracemalloc slows Python-level code
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def report(label: str, elapsed: float, peak: int):
+    print(f"{label:28} {elapsed * 1e3:8.0f} ms {peak / 2**20:8.1f} MiB peak")
+
+
+def run(rows: int = 400_000):
+    try:
+        import tables  # noqa: F401
+
+        has_hdf = True
+    except ImportError:
+        has_hdf = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "fno.txt")
+        write_scrip(source, rows)
+        print(f"{rows} rows, {os.path.getsize(source) / 2**20:.1f} MiB")
+
+        def old_read():
+            df = pd.read_csv(source, sep="|", index_col="instrumentToken")
+            return df.drop(["isin"], axis=1)
+
+        old, elapsed, peak = measure(old_read)
+        report("read_csv (default dtypes)", elapsed, peak)
+        print(f"{'':28} {old.memory_usage(deep=True).sum() / 2**20:8.1f} MiB")
+
+        new, elapsed, peak = measure(lambda: read_scrip(source, "fno"))
+        report("read_scrip", elapsed, peak)
+        print(f"{'':28} {new.memory_usage(deep=True).sum() / 2**20:8.1f} MiB")
+
+        if has_hdf:
+            hdf = os.path.join(tmp, "tokens.hdf5")
+            _, elapsed, peak = measure(
+                lambda: old.to_hdf(
+                    hdf,
+                    "/fnoTokens",
+                    mode="w",
+                    complevel=9,
+                    format="table",
+                    complib="blosc:lz4",
+                    data_columns=True,
+                )
+            )
+            report("to_hdf (complevel=9)", elapsed, peak)
+            _, elapsed, peak = measure(
+                lambda: pd.read_hdf(hdf, "fnoTokens", mode="r")
+            )
+            report("read_hdf", elapsed, peak)
+
+        snapshot = os.path.join(tmp, "tokens.npz")
+        _, elapsed, peak = measure(
+            lambda: save_snapshot(snapshot, fnoTokens=new)
+        )
+        report("save_snapshot", elapsed, peak)
+        _, elapsed, peak = measure(lambda: load_snapshot(snapshot))
+        report("load_snapshot", elapsed, peak)
+        print(f"snapshot size {os.path.getsize(snapshot) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    run()
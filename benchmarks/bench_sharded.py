@@ -0,0 +1,133 @@
+"""Replay throughput of the sharded live feed by worker count.
+
+The same synthetic session as bench_replay goes through the real
+LiveFeed.callback_method, first with bars and indicators on this
+process's dispatcher threads, then routed to a ShardedFeed of 1, 2 and
+4 worker processes, each evaluating an IndicatorEngine per token on
+every closed bar. The rings block instead of dropping ticks, and a run
+ends once every worker has drained its ring, so ticks/s is end-to-end.
+Signals come back to a counting observer in this process.
+
+Scaling needs a core per worker plus one for the routing process;
+the core count is printed first.
+
+Run from the repository root:
+    python -m benchmarks.bench_sharded
+"""
+
+import os
+import time
+from collections import defaultdict
+
+from benchmarks.bench_replay import STRATEGY, EvaluatingObserver, offline_feed
+from indicator_engine import SIGNALS, IndicatorEngine, signal_code
+from livefeed import LiveFeed
+from replay import StubBroker, TickReplay, synthetic_messages
+from shardedfeed import ShardedFeed, partition
+
+TOKENS = 100
+MINUTES = 30
+TICKS_PER_MINUTE = 60
+
+
+class EngineShard:
+    """Indicator.update_bars without Firestore, for one shard."""
+
+    def __init__(self, tokens) -> None:
+        self.timeframe = defaultdict(lambda: 1)
+        self.engine = {token: IndicatorEngine(STRATEGY) for token in tokens}
+        self.code = {}
+        self._observers = set()
+
+    def attachObserver(self, observer):
+        self._observers.add(observer)
+
+    def update_bars(self, token, bars):
+        engine = self.engine[token]
+        engine.update_frame(bars[1])
+        if not engine.ready:
+            return
+        code = signal_code(engine.values)
+        if self.code.get(token) == code:
+            return
+        self.code[token] = code
+        for observer in self._observers:
+            observer.update(token, *SIGNALS[code])
+
+
+class CountingObserver:
+    def __init__(self) -> None:
+        self.signals = 0
+
+    def update(self, token, transactionType, optionType=None):
+        self.signals += 1
+
+
+def replay(messages, tokens) -> TickReplay:
+    broker = StubBroker().install()
+    broker.subscribe(
+        ",".join(str(token) for token in tokens),
+        LiveFeed.callback_method,
+        disconnect_event=LiveFeed.disconnect_event,
+        connect_event=LiveFeed.connect_event,
+    )
+    return TickReplay(messages, broker)
+
+
+def run_threads(messages, tokens) -> float:
+    session = replay(messages, tokens)
+    offline_feed(EvaluatingObserver(), session)
+    start = time.perf_counter()
+    session.run()
+    LiveFeed.dispatcher.join()
+    elapsed = time.perf_counter() - start
+    LiveFeed.dispatcher.close()
+    LiveFeed.barBuilder = None
+    return elapsed
+
+
+def run_shards(messages, tokens, workers: int):
+    session = replay(messages, tokens)
+    observer = CountingObserver()
+    # Replayed market time only: wall time would close every bar early
+    feed = ShardedFeed(factory=EngineShard, block=True, clock=None)
+    feed.attachObserver(observer)
+    feed.start(partition(tokens, workers))
+    assert feed.wait_ready(timeout=120)
+    LiveFeed.shards = feed
+
+    start = time.perf_counter()
+    routing = session.run()["seconds"]
+    feed.close()
+    elapsed = time.perf_counter() - start
+    LiveFeed.shards = None
+    metrics = feed.metrics()
+    bars = sum(shard["bars"] for shard in metrics["shards"])
+    return elapsed, routing, bars, observer.signals
+
+
+def run(workers=(1, 2, 4), tokens: int = TOKENS, minutes: int = MINUTES):
+    tokens = list(range(1000, 1000 + tokens))
+    messages = synthetic_messages(tokens, minutes, TICKS_PER_MINUTE)
+    print(
+        f"{os.cpu_count()} cores, {len(tokens)} tokens, "
+        f"{len(messages)} ticks over {minutes} market minutes"
+    )
+
+    elapsed = run_threads(messages, tokens)
+    print(f"in-process  {len(messages) / elapsed:9.0f} ticks/s")
+
+    baseline = None
+    for count in workers:
+        elapsed, routing, bars, signals = run_shards(messages, tokens, count)
+        rate = len(messages) / elapsed
+        baseline = baseline or rate
+        print(
+            f"{count} workers   {rate:9.0f} ticks/s  x{rate / baseline:4.2f}  "
+            f"(routing alone {len(messages) / routing:9.0f} ticks/s)  "
+            f"{bars} bars  {signals} signals"
+        )
+
+
+if __name__ == "__main__":
+    run()
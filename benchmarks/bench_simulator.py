@@ -0,0 +1,83 @@
+"""Orders per second through the paper-trading MatchingEngine.
+
+100 instruments are quoted by synthetic ticks, one tick per instrument
+every 100 orders. Three mixes are timed: market orders that fill at
+once, limit orders around the LTP (about half rest and fill on later
+ticks), and market orders through SimOrderClient.placeOrder, which
+adds building the OrderClient-style response. Time spent placing
+orders and time spent on ticks (requoting, resting and trigger
+matches) are reported separately; the best of three runs is shown.
+
+Run from the repository root:
+    python -m benchmarks.bench_simulator
+"""
+
+import time
+
+import numpy as np
+
+from simulator import BUY, SELL, MatchingEngine, SimOrderClient
+from utils import OrderType, TransactionType
+
+ORDERS = 200_000
+TOKENS = 100
+T0 = 1_697_447_700_000_000_000
+
+
+def scenario(orders: int, limit: bool, client: bool):
+    rng = np.random.default_rng(0)
+    engine = MatchingEngine(funds=1e12, depth_quantity=10_000)
+    tokens = rng.integers(0, TOKENS, orders).tolist()
+    sides = rng.choice([BUY, SELL], orders).tolist()
+    quantities = rng.integers(1, 50, orders).tolist()
+    offsets = np.round(rng.normal(0, 0.1, orders), 2).tolist()
+    walk = 100 + np.cumsum(rng.normal(0, 0.05, (orders // 100 + 1, TOKENS)), 0)
+    for token in range(TOKENS):
+        engine.on_tick(token, T0, 100.0)
+    sim = SimOrderClient(engine)
+    types = {BUY: TransactionType.buy, SELL: TransactionType.sell}
+
+    placing = ticking = 0.0
+    for i in range(orders):
+        if i % 100 == 0:
+            start = time.perf_counter()
+            row = walk[i // 100]
+            timestamp = T0 + i * 1_000_000
+            for token in range(TOKENS):
+                engine.on_tick(token, timestamp, row[token])
+            ticking += time.perf_counter() - start
+            start = time.perf_counter()
+        token = tokens[i]
+        if client:
+            sim.placeOrder(
+                OrderType.mis_order, token, types[sides[i]], quantities[i]
+            )
+        elif limit:
+            price = engine._books[token].ltp + offsets[i]
+            engine.submit(token, sides[i], quantities[i], price)
+        else:
+            engine.submit(token, sides[i], quantities[i])
+        if i % 100 == 99:
+            placing += time.perf_counter() - start
+    return placing, ticking, engine
+
+
+def run(orders: int = ORDERS):
+    for label, limit, client in (
+        ("market", False, False),
+        ("limit", True, False),
+        ("placeOrder", False, True),
+    ):
+        runs = [scenario(orders, limit, client) for _ in range(3)]
+        placing, ticking, engine = min(runs, key=lambda run: run[0] + run[1])
+        ticks = orders // 100 * TOKENS
+        print(
+            f"{label:10} {orders / placing:9.0f} orders/s  "
+            f"{ticks / ticking:9.0f} ticks/s  "
+            f"{orders / (placing + ticking):9.0f} orders/s with ticks  "
+            f"({engine.fills} fills)"
+        )
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,37 @@
+"""Per-call cost of the latency tracer on the hot path.
+
+Run from the repository root:
+    python -m benchmarks.bench_tracing
+"""
+
+import time
+
+from tracing import STAGES, Tracer
+
+
+def per_call(fn, n: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - start) / n
+
+
+def run(n: int = 1_000_000):
+    tracer = Tracer()
+    baseline = per_call(lambda: None, n)
+    feed = per_call(lambda: tracer.feed(101), n) - baseline
+
+    def chain():
+        tracer.feed(101)
+        for stage in STAGES[1:]:
+            tracer.stamp(101, stage)
+
+    stages = len(STAGES)
+    chained = (per_call(chain, n // 10) - baseline) / stages
+    print(f"feed (every tick):   {feed:6.0f} ns")
+    print(f"stamp (per stage):   {chained:6.0f} ns")
+    print(tracer.snapshot()["total"])
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+from numba import njit, prange
+
+_SQRT_2 = math.sqrt(2.0)
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+@njit(cache=True)
+def _cdf(x):
+    return 0.5 * (1.0 + math.erf(x / _SQRT_2))
+
+
+@njit(cache=True)
+def _pdf(x):
+    return math.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+@njit(cache=True)
+def _price(is_call, S, K, t, r, sigma):
+    sqrt_t = math.sqrt(t)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * t) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+    discount = K * math.exp(-r * t)
+    if is_call:
+        return S * _cdf(d1) - discount * _cdf(d2)
+    return discount * _cdf(-d2) - S * _cdf(-d1)
+
+
+@njit(cache=True)
+def _implied_volatility(price, is_call, S, K, t, r, tol, max_iter):
+    discount = K * math.exp(-r * t)
+    if is_call:
+        lower_bound = max(S - discount, 0.0)
+        upper_bound = S
+    else:
+        lower_bound = max(discount - S, 0.0)
+        upper_bound = discount
+    if not (lower_bound < price < upper_bound) or t <= 0:
+        return np.nan
+
+    low = 1e-6
+    high = 10.0
+    if _price(is_call, S, K, t, r, high) < price:
+        return np.nan
+    sigma = min(max(math.sqrt(2.0 * math.pi / t) * price / S, 0.05), 3.0)
+
+    for _ in range(max_iter):
+        diff = _price(is_call, S, K, t, r, sigma) - price
+        if abs(diff) < tol:
+            return sigma
+        if diff > 0:
+            high = sigma
+        else:
+            low = sigma
+        sqrt_t = math.sqrt(t)
+        d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * t) / (
+            sigma * sqrt_t
+        )
+        vega = S * _pdf(d1) * sqrt_t
+        step = sigma - diff / vega if vega > 1e-12 else low
+        # Newton step while it stays inside the bracket, bisection otherwise
+        if step <= low or step >= high:
+            step = 0.5 * (low + high)
+        sigma = step
+    return sigma
+
+
+@njit(parallel=True, cache=True)
+def _implied_volatility_nb(price, is_call, S, K, t, r, tol, max_iter):
+    out = np.empty(price.shape[0])
+    for i in prange(price.shape[0]):
+        out[i] = _implied_volatility(
+            price[i], is_call[i], S[i], K[i], t[i], r[i], tol, max_iter
+        )
+    return out
+
+
+@njit(parallel=True, cache=True)
+def _greeks_nb(is_call, S, K, t, r, sigma):
+    n = S.shape[0]
+    delta = np.empty(n)
+    gamma = np.empty(n)
+    theta = np.empty(n)
+    vega = np.empty(n)
+    rho = np.empty(n)
+    for i in prange(n):
+        sqrt_t = math.sqrt(t[i])
+        d1 = (
+            math.log(S[i] / K[i]) + (r[i] + 0.5 * sigma[i] * sigma[i]) * t[i]
+        ) / (sigma[i] * sqrt_t)
+        d2 = d1 - sigma[i] * sqrt_t
+        discount = K[i] * math.exp(-r[i] * t[i])
+        pdf_d1 = _pdf(d1)
+        decay = -S[i] * pdf_d1 * sigma[i] / (2.0 * sqrt_t)
+
+        gamma[i] = pdf_d1 / (S[i] * sigma[i] * sqrt_t)
+        vega[i] = S[i] * pdf_d1 * sqrt_t * 0.01
+        if is_call[i]:
+            delta[i] = _cdf(d1)
+            theta[i] = (decay - r[i] * discount * _cdf(d2)) / 365.0
+            rho[i] = t[i] * discount * _cdf(d2) * 0.01
+        else:
+            delta[i] = _cdf(d1) - 1.0
+            theta[i] = (decay + r[i] * discount * _cdf(-d2)) / 365.0
+            rho[i] = -t[i] * discount * _cdf(-d2) * 0.01
+    return delta, gamma, theta, vega, rho
+
+
+def _arrays(n, *values):
+    return [
+        np.ascontiguousarray(np.broadcast_to(value, n), dtype=np.float64)
+        for value in values
+    ]
+
+
+def _flags(flag, n) -> np.ndarray:
+    flag = np.broadcast_to(np.asarray(flag), n)
+    if flag.dtype == np.bool_:
+        return np.ascontiguousarray(flag)
+    flag = flag.astype("U1")
+    return (flag == "c") | (flag == "C")
+
+
+def implied_volatility(price, S, K, t, r, flag, tol=1e-10, max_iter=100):
+    """Implied volatility for whole arrays of options.
+
+    Arguments follow py_vollib's order and broadcast against each other;
+    ``flag`` is "c"/"p" (or a boolean is-call array). Prices outside the
+    no-arbitrage bounds give NaN instead of raising.
+    """
+    n = np.broadcast(price, S, K, t, r).shape
+    price, S, K, t, r = _arrays(n, price, S, K, t, r)
+    return _implied_volatility_nb(
+        price.ravel(),
+        _flags(flag, n).ravel(),
+        S.ravel(),
+        K.ravel(),
+        t.ravel(),
+        r.ravel(),
+        tol,
+        max_iter,
+    ).reshape(n)
+
+
+def greeks(flag, S, K, t, r, sigma) -> dict:
+    """Delta, gamma, theta, vega and rho in py_vollib's units.
+
+    Theta is per calendar day, vega and rho per 1% change.
+    """
+    n = np.broadcast(S, K, t, r, sigma).shape
+    S, K, t, r, sigma = _arrays(n, S, K, t, r, sigma)
+    values = _greeks_nb(
+        _flags(flag, n).ravel(),
+        S.ravel(),
+        K.ravel(),
+        t.ravel(),
+        r.ravel(),
+        sigma.ravel(),
+    )
+    return {
+        name: value.reshape(n)
+        for name, value in zip(
+            ("delta", "gamma", "theta", "vega", "rho"), values
+        )
+    }
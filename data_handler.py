@@ -2,11 +2,13 @@ from collections import defaultdict
 
 import pandas as pd
 
+from dispatcher import Dispatcher
 from observer_pattern import IEventListener, IEventManager
 
 
 class Handler(IEventManager, IEventListener):
-    def __init__(self) -> None:
+    def __init__(self, dispatcher: Dispatcher = None) -> None:
+        self.dispatcher = dispatcher
         self._listOfObservers = defaultdict(set)
         self._listOfTags = set()
 
@@ -27,7 +29,10 @@ class Handler(IEventManager, IEventListener):
     def notifyObserver(self, token: str, df: pd.DataFrame):
         for tag in self._listOfObservers:
             for observer in self._listOfObservers[tag]:
-                observer.update(token, df)
+                if self.dispatcher is not None:
+                    self.dispatcher.submit(token, observer.update, token, df)
+                else:
+                    observer.update(token, df)
         return
 
     def update(self, token: str, df: pd.DataFrame):
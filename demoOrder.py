@@ -12,7 +12,17 @@ class OrderClient:
     sebi_charges = 0.000001
     buy_stamp_charges = 0.00003
 
-    def __init__(self):
+    @classmethod
+    def charge_rate(cls, transactionType: TransactionType) -> float:
+        """Charges per rupee traded: SEBI and transaction fees with GST,
+        plus stamp duty on buys or STT on sells."""
+        fees = (cls.sebi_charges + cls.transaction_charges) * (1 + cls.gst)
+        if transactionType == TransactionType.buy:
+            return fees + cls.buy_stamp_charges
+        return fees + cls.stt_charges
+
+    def __init__(self, ledger=None):
+        self.ledger = ledger
         self.orderbook = []
         self.open_positions = []
         self.funds = 100000
@@ -54,14 +64,8 @@ class OrderClient:
             "tag": tag,
         }
 
+        total_charges = amount * self.charge_rate(transactionType)
         if transactionType == TransactionType.buy:
-            gst_amount = (amount * self.sebi_charges) + (
-                amount * self.transaction_charges
-            )
-            gst_charges = gst_amount * self.gst
-            total_charges = (
-                gst_amount + gst_charges + (amount * self.buy_stamp_charges)
-            )
             if amount > self.funds:
                 return {"status": "error", "message": "Insufficient Funds"}
             else:
@@ -72,18 +76,15 @@ class OrderClient:
         else:
             if len(self.open_positions) == 0:
                 return {"status": "error", "message": "No Open Positions"}
-            gst_amount = (amount * self.sebi_charges) + (
-                amount * self.transaction_charges
-            )
-            gst_charges = gst_amount * self.gst
-            total_charges = (
-                gst_amount + gst_charges + (amount * self.stt_charges)
-            )
             orderinfo["total_charges"] = total_charges
             self.funds += amount - total_charges
             self.open_positions.pop()
 
         self.orderbook.append(orderinfo)
+        if self.ledger is not None:
+            self.ledger.record(
+                instrumentToken, transactionType, qty, price, strategy=tag
+            )
 
         return {"status": "success", "message": orderinfo}
 
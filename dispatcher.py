@@ -0,0 +1,192 @@
+import logging
+import queue
+from collections import deque
+from threading import Condition, Thread
+
+import pandas as pd
+
+from utils import logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+BLOCK = "block"
+DROP = "drop"
+COALESCE = "coalesce"
+POLICIES = (BLOCK, DROP, COALESCE)
+
+_STOP = object()
+
+
+def merge_args(old: tuple, new: tuple) -> tuple:
+    """Combine two pending calls into one.
+
+    DataFrames are concatenated, dicts of DataFrames (bars by timeframe)
+    are concatenated per key, and any other argument keeps its new value.
+    """
+    merged = []
+    for a, b in zip(old, new):
+        if isinstance(a, pd.DataFrame) and isinstance(b, pd.DataFrame):
+            merged.append(pd.concat([a, b]))
+        elif isinstance(a, dict) and isinstance(b, dict):
+            merged.append(
+                {
+                    key: (
+                        merge_args((a[key],), (b[key],))[0]
+                        if key in a and key in b
+                        else b.get(key, a.get(key))
+                    )
+                    for key in {**a, **b}
+                }
+            )
+        else:
+            merged.append(b)
+    return tuple(merged)
+
+
+class Dispatcher:
+    """Fixed worker pool with one FIFO queue per key.
+
+    Calls submitted under the same key (a token) run one at a time in
+    submission order; different keys run in parallel on ``workers``
+    threads. When a key already has ``max_pending`` calls waiting, the
+    policy decides what happens to the new one:
+
+    - ``block``: wait for room (never loses work, use for orders)
+    - ``drop``: discard the oldest pending call for that key
+    - ``coalesce``: merge it into the newest pending call with ``merge``,
+      or drop the oldest when that call is for another function
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        max_pending: int = 4,
+        policy: str = COALESCE,
+        merge=merge_args,
+        name: str = "dispatcher",
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy}, use {POLICIES}")
+        self.max_pending = max(1, max_pending)
+        self.policy = policy
+        self.merge = merge
+        self.name = name
+        self._pending = {}
+        self._busy = set()
+        self._ready = queue.Queue()
+        self._cond = Condition()
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+        self._threads = [
+            Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn, *args) -> bool:
+        """Queue ``fn(*args)`` behind earlier calls for ``key``."""
+        with self._cond:
+            if self._closed:
+                return False
+            pending = self._pending.setdefault(key, deque())
+            if len(pending) >= self.max_pending:
+                if self.policy == BLOCK:
+                    while len(pending) >= self.max_pending:
+                        self._cond.wait()
+                        if self._closed:
+                            return False
+                elif self.policy == DROP:
+                    pending.popleft()
+                    self.dropped += 1
+                elif pending[-1][0] == fn:
+                    pending[-1] = (fn, self.merge(pending[-1][1], args))
+                    self.coalesced += 1
+                    self.submitted += 1
+                    return True
+                else:
+                    # Nothing to merge with: make room as drop does
+                    pending.popleft()
+                    self.dropped += 1
+
+            pending.append((fn, args))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(pending))
+            if key not in self._busy:
+                self._busy.add(key)
+                self._ready.put(key)
+        return True
+
+    def _run(self):
+        while True:
+            key = self._ready.get()
+            if key is _STOP:
+                return
+            with self._cond:
+                fn, args = self._pending[key].popleft()
+                self._cond.notify_all()
+            try:
+                fn(*args)
+            except Exception as e:
+                self.failed += 1
+                logging.exception(f"{self.name}: {key} failed: {e}")
+            with self._cond:
+                self.completed += 1
+                if self._pending[key]:
+                    # Back of the line, so one busy key can't starve others
+                    self._ready.put(key)
+                else:
+                    self._busy.discard(key)
+                    self._cond.notify_all()
+
+    def depth(self, key=None) -> int:
+        """Calls waiting for ``key``, or for every key."""
+        with self._cond:
+            if key is not None:
+                return len(self._pending.get(key, ()))
+            return sum(len(pending) for pending in self._pending.values())
+
+    def metrics(self) -> dict:
+        with self._cond:
+            depths = {
+                key: len(pending)
+                for key, pending in self._pending.items()
+                if pending
+            }
+            return {
+                "name": self.name,
+                "workers": len(self._threads),
+                "policy": self.policy,
+                "pending": sum(depths.values()),
+                "depth": depths,
+                "max_depth": self.max_depth,
+                "busy": len(self._busy),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+            }
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait until every queued call has run; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy, timeout)
+
+    def close(self, timeout: float = None):
+        """Run what is queued, then stop the workers."""
+        self.join(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for _ in self._threads:
+            self._ready.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
@@ -1,16 +1,128 @@
 import json
+import logging
 import os
+import queue
+import time
+from threading import Event, Lock, Thread
 
 import firebase_admin
-import pandas as pd
 from dotenv import load_dotenv
 from firebase_admin import credentials, firestore, initialize_app
 
+from instruments import InstrumentMaster
 from utils import Strategy
 
 
+class FirestoreWriter:
+    """Write-behind queue of document sets committed as WriteBatches.
+
+    Producers only enqueue. A background thread commits up to
+    ``batch_size`` operations per batch (Firestore's limit is 500) once
+    that many are queued or ``flush_interval`` seconds have passed since
+    the first one. A full queue blocks producers for up to
+    ``put_timeout`` seconds before the write is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        put_timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
+        self._client = client
+        self.batch_size = min(batch_size, 500)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+        self._thread.start()
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = Firestore.db()
+        return self._client
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def set(self, path: tuple, data: dict) -> bool:
+        try:
+            self._queue.put((path, data), timeout=self.put_timeout)
+        except queue.Full:
+            self.dropped += 1
+            logging.error(f"Firestore write queue full, dropped {path}")
+            return False
+        return True
+
+    def add_ohlcv(self, documentName: str, id: str, info: dict) -> bool:
+        return self.set(("livefeed", documentName, "ohlcv", id), info)
+
+    def flush(self):
+        """Block until everything queued so far has been committed."""
+        self._queue.join()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                ops = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(ops) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if self._stop.is_set():
+                    remaining = 0
+                try:
+                    if remaining > 0:
+                        ops.append(self._queue.get(timeout=remaining))
+                    else:
+                        ops.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(ops)
+            for _ in ops:
+                self._queue.task_done()
+
+    def _commit(self, ops: list):
+        for attempt in range(self.retries + 1):
+            try:
+                batch = self.client.batch()
+                for path, data in ops:
+                    batch.set(self.client.document(*path), data)
+                batch.commit()
+                self.written += len(ops)
+                self.batches += 1
+                return
+            except Exception as e:
+                logging.error(
+                    f"Firestore batch commit failed ({attempt + 1}): {e}"
+                )
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2**attempt)
+        self.failed += len(ops)
+
+
 class Firestore:
     _instance = None
+    _writer = None
+    _writer_lock = Lock()
 
     def initialize(self):
         load_dotenv("config.env")
@@ -32,21 +144,40 @@ class Firestore:
         instance = cls.get_instance()
         return instance.db_client
 
+    @classmethod
+    def writer(cls) -> FirestoreWriter:
+        with cls._writer_lock:
+            if cls._writer is None:
+                cls._writer = FirestoreWriter()
+        return cls._writer
+
+    @classmethod
+    def close_writer(cls):
+        with cls._writer_lock:
+            writer, cls._writer = cls._writer, None
+        if writer is not None:
+            writer.close()
+
     @classmethod
     def add_strategy(cls, token: int, strategy: dict):
         db = cls.db()
-        df = pd.read_hdf(
-            "kotak_data/tokens.hdf5",
-            key="cashTokens",
-            mode="r",
-            where="index==" + str(token),
+        instrument = InstrumentMaster.get().cash_token(token)
+        if instrument is None:
+            return {"status": "error", "message": f"Unknown token {token}"}
+        documentName = (
+            instrument["exchange"] + "_" + instrument["instrumentName"]
+        )
+        strategies = (
+            db.collection("watchlist")
+            .document(documentName)
+            .collection("strategy")
         )
-        print(df)
-        documentName = (df["exchange"] + "_" + df["instrumentName"]).values[0]
-        print(documentName)
-        db.collection("watchlist").document(documentName).collection(
-            "strategy"
-        ).document().set(strategy)
+        # Overwrite the document get_strategy reads, so a token has one
+        existing = strategies.limit(1).get()
+        if existing:
+            existing[0].reference.set(strategy)
+        else:
+            strategies.document("default").set(strategy)
         return {"status": "success", "message": "Strategy added successfully."}
 
     @classmethod
@@ -56,6 +187,7 @@ class Firestore:
             db.collection("watchlist")
             .document(documentName)
             .collection("strategy")
+            .limit(1)
             .get()[0]
         )
         return strategy
@@ -69,6 +201,15 @@ class Firestore:
             "message": "Watchlist added successfully.",
         }
 
+    @classmethod
+    def delete_watchlist(cls, documentName: str):
+        db = cls.db()
+        db.collection("watchlist").document(documentName).delete()
+        return {
+            "status": "success",
+            "message": "Watchlist deleted successfully.",
+        }
+
     @classmethod
     def get_watchlist(cls):
         db = cls.db()
@@ -100,6 +241,22 @@ class Firestore:
         )
         return docs
 
+    @classmethod
+    def get_ohlcv_since(cls, documentName: str, since: str, size: int):
+        db = cls.db()
+        collection = (
+            db.collection("livefeed")
+            .document(documentName)
+            .collection("ohlcv")
+        )
+        docs = (
+            collection.where("__name__", ">", collection.document(since))
+            .order_by("__name__", direction=firestore.Query.DESCENDING)
+            .limit(size)
+            .stream()
+        )
+        return docs
+
     @classmethod
     def add_livefeed_info(cls, documentName: str, info: dict):
         db = cls.db()
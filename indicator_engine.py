@@ -0,0 +1,566 @@
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from utils import OptionType, TransactionType
+
+NAN = float("nan")
+
+
+class RollingSMA:
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._window = deque()
+        self._sum = 0.0
+
+    def update(self, value: float) -> float:
+        self._window.append(value)
+        self._sum += value
+        if len(self._window) > self.period:
+            self._sum -= self._window.popleft()
+        if len(self._window) < self.period:
+            return NAN
+        return self._sum / self.period
+
+
+class WilderMA:
+    """Streaming form of pandas_ta ``rma``.
+
+    ``ewm(alpha=1/period, min_periods=period).mean()`` kept as a running
+    weighted sum and weight total; leading NaNs are skipped as in pandas.
+    """
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self._decay = 1.0 - 1.0 / period
+        self._sum = 0.0
+        self._weight = 0.0
+        self._count = 0
+
+    def update(self, value: float) -> float:
+        if math.isnan(value):
+            if self._count == 0:
+                return NAN
+            self._sum *= self._decay
+            self._weight *= self._decay
+        else:
+            self._sum = value + self._decay * self._sum
+            self._weight = 1.0 + self._decay * self._weight
+            self._count += 1
+        if self._count < self.period:
+            return NAN
+        return self._sum / self._weight
+
+
+class WilderRSI:
+    def __init__(self, period: int) -> None:
+        self._gain = WilderMA(period)
+        self._loss = WilderMA(period)
+        self._prev_close = NAN
+
+    def update(self, close: float) -> float:
+        change = close - self._prev_close
+        self._prev_close = close
+        if change != change:
+            gain = self._gain.update(NAN)
+            loss = self._loss.update(NAN)
+        else:
+            gain = self._gain.update(max(change, 0.0))
+            loss = self._loss.update(max(-change, 0.0))
+        if gain + loss == 0:
+            return NAN
+        return 100.0 * gain / (gain + loss)
+
+
+class WilderATR:
+    def __init__(self, period: int) -> None:
+        self._rma = WilderMA(period)
+        self._prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        prev_close = self._prev_close
+        self._prev_close = close
+        if prev_close != prev_close:
+            return self._rma.update(NAN)
+        true_range = max(
+            high - low, abs(high - prev_close), abs(prev_close - low)
+        )
+        return self._rma.update(true_range)
+
+
+class StreamingSupertrend:
+    """Supertrend with bands and direction carried between bars.
+
+    2-bar midprice +/- multiplier * ATR, then the final-band recursion:
+    a band only tightens while the direction holds, and the close crossing
+    the previous bar's band flips the direction.
+    """
+
+    def __init__(self, period: int, multiplier: float) -> None:
+        self.multiplier = multiplier
+        self._atr = WilderATR(period)
+        self._prev_high = NAN
+        self._prev_low = NAN
+        self._upper = NAN
+        self._lower = NAN
+        self._count = 0
+        self.trend = NAN
+        self.direction = 1
+
+    def update(self, high: float, low: float, close: float):
+        if self._prev_high != self._prev_high:
+            mid = NAN
+        else:
+            mid = (max(high, self._prev_high) + min(low, self._prev_low)) / 2.0
+        self._prev_high = high
+        self._prev_low = low
+        matr = self.multiplier * self._atr.update(high, low, close)
+        upper = mid + matr
+        lower = mid - matr
+
+        self._count += 1
+        if self._count > 1:
+            if close > self._upper:
+                self.direction = 1
+            elif close < self._lower:
+                self.direction = -1
+            else:
+                if self.direction > 0 and lower < self._lower:
+                    lower = self._lower
+                if self.direction < 0 and upper > self._upper:
+                    upper = self._upper
+            self.trend = lower if self.direction > 0 else upper
+
+        self._upper = upper
+        self._lower = lower
+        return self.trend, self.direction
+
+
+class IndicatorEngine:
+    """Per-token SMA/RSI/Supertrend state updated once per closed bar."""
+
+    def __init__(self, strategy: dict) -> None:
+        self.strategy = strategy
+        self.window = max(strategy.values()) + 2
+        self._sma = RollingSMA(strategy["sma"])
+        self._rsi = WilderRSI(strategy["rsi"])
+        self._fast = StreamingSupertrend(
+            strategy["fast_period"], strategy["fast_multiplier"]
+        )
+        self._slow = StreamingSupertrend(
+            strategy["slow_period"], strategy["slow_multiplier"]
+        )
+        self.count = 0
+        self.values = None
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window
+
+    def update(self, high: float, low: float, close: float) -> tuple:
+        """Feed one closed bar and return the six signal inputs."""
+        self.count += 1
+        sma = self._sma.update(close)
+        rsi = self._rsi.update(close)
+        fast_trend, fast_direction = self._fast.update(high, low, close)
+        slow_trend, slow_direction = self._slow.update(high, low, close)
+        self.values = (
+            sma < close,
+            rsi >= 50,
+            fast_trend,
+            slow_trend,
+            fast_direction == 1,
+            slow_direction == 1,
+        )
+        return self.values
+
+    def update_frame(self, df: pd.DataFrame) -> tuple:
+        for high, low, close in zip(
+            df["high"].values, df["low"].values, df["close"].values
+        ):
+            self.update(high, low, close)
+        return self.values
+
+
+def signal_code(values: tuple) -> int:
+    """1 to buy a call, -1 to buy a put, 0 to exit."""
+    if all(values):
+        return 1
+    if not any(values):
+        return -1
+    return 0
+
+
+SIGNALS = {
+    1: (TransactionType.buy, OptionType.call),
+    -1: (TransactionType.buy, OptionType.put),
+    0: (TransactionType.sell,),
+}
+
+
+# Column layout of the per-token state carried by the batch kernel.
+_COUNT, _PREV_CLOSE, _SMA_SUM = 0, 1, 2
+_GAIN_SUM, _GAIN_WEIGHT, _GAIN_COUNT = 3, 4, 5
+_LOSS_SUM, _LOSS_WEIGHT, _LOSS_COUNT = 6, 7, 8
+_FAST, _SLOW = 9, 18
+_PREV_HIGH, _PREV_LOW, _ATR_SUM, _ATR_WEIGHT, _ATR_COUNT = 0, 1, 2, 3, 4
+_UPPER, _LOWER, _DIRECTION, _TREND = 5, 6, 7, 8
+_STATE_SIZE = 27
+_PARAMS = [
+    "sma",
+    "rsi",
+    "fast_period",
+    "fast_multiplier",
+    "slow_period",
+    "slow_multiplier",
+]
+
+
+@njit(cache=True)
+def _rma_nb(state, t, i_sum, i_weight, i_count, value, period):
+    decay = 1.0 - 1.0 / period
+    if np.isnan(value):
+        if state[t, i_count] == 0:
+            return np.nan
+        state[t, i_sum] *= decay
+        state[t, i_weight] *= decay
+    else:
+        state[t, i_sum] = value + decay * state[t, i_sum]
+        state[t, i_weight] = 1.0 + decay * state[t, i_weight]
+        state[t, i_count] += 1
+    if state[t, i_count] < period:
+        return np.nan
+    return state[t, i_sum] / state[t, i_weight]
+
+
+@njit(cache=True)
+def _supertrend_nb(state, t, base, high, low, close, prev_close, period, m):
+    prev_high = state[t, base + _PREV_HIGH]
+    prev_low = state[t, base + _PREV_LOW]
+    if np.isnan(prev_high):
+        mid = np.nan
+    else:
+        mid = (max(high, prev_high) + min(low, prev_low)) / 2.0
+    state[t, base + _PREV_HIGH] = high
+    state[t, base + _PREV_LOW] = low
+
+    if np.isnan(prev_close):
+        true_range = np.nan
+    else:
+        true_range = max(
+            high - low, abs(high - prev_close), abs(prev_close - low)
+        )
+    atr = _rma_nb(
+        state,
+        t,
+        base + _ATR_SUM,
+        base + _ATR_WEIGHT,
+        base + _ATR_COUNT,
+        true_range,
+        period,
+    )
+    upper = mid + m * atr
+    lower = mid - m * atr
+
+    if state[t, _COUNT] > 1:
+        direction = state[t, base + _DIRECTION]
+        if close > state[t, base + _UPPER]:
+            direction = 1.0
+        elif close < state[t, base + _LOWER]:
+            direction = -1.0
+        else:
+            if direction > 0 and lower < state[t, base + _LOWER]:
+                lower = state[t, base + _LOWER]
+            if direction < 0 and upper > state[t, base + _UPPER]:
+                upper = state[t, base + _UPPER]
+        state[t, base + _DIRECTION] = direction
+        state[t, base + _TREND] = lower if direction > 0 else upper
+
+    state[t, base + _UPPER] = upper
+    state[t, base + _LOWER] = lower
+
+
+@njit(cache=True)
+def _step_nb(state, window, params, t, high, low, c, out):
+    """Advance token ``t`` by one bar and write its six values to out[t]."""
+    prev_close = state[t, _PREV_CLOSE]
+    k = int(state[t, _COUNT])
+    state[t, _COUNT] = k + 1
+
+    sma_period = int(params[t, 0])
+    slot = k % sma_period
+    old = window[t, slot]
+    window[t, slot] = c
+    state[t, _SMA_SUM] += c
+    if k >= sma_period:
+        state[t, _SMA_SUM] -= old
+    sma = np.nan
+    if k + 1 >= sma_period:
+        sma = state[t, _SMA_SUM] / sma_period
+
+    change = c - prev_close
+    gain = np.nan
+    loss = np.nan
+    if not np.isnan(change):
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+    gain = _rma_nb(
+        state,
+        t,
+        _GAIN_SUM,
+        _GAIN_WEIGHT,
+        _GAIN_COUNT,
+        gain,
+        params[t, 1],
+    )
+    loss = _rma_nb(
+        state,
+        t,
+        _LOSS_SUM,
+        _LOSS_WEIGHT,
+        _LOSS_COUNT,
+        loss,
+        params[t, 1],
+    )
+    rsi = np.nan
+    if gain + loss != 0:
+        rsi = 100.0 * gain / (gain + loss)
+
+    _supertrend_nb(
+        state, t, _FAST, high, low, c, prev_close, params[t, 2], params[t, 3]
+    )
+    _supertrend_nb(
+        state, t, _SLOW, high, low, c, prev_close, params[t, 4], params[t, 5]
+    )
+    state[t, _PREV_CLOSE] = c
+
+    out[t, 0] = 1.0 if sma < c else 0.0
+    out[t, 1] = 1.0 if rsi >= 50 else 0.0
+    out[t, 2] = state[t, _FAST + _TREND]
+    out[t, 3] = state[t, _SLOW + _TREND]
+    out[t, 4] = 1.0 if state[t, _FAST + _DIRECTION] == 1 else 0.0
+    out[t, 5] = 1.0 if state[t, _SLOW + _DIRECTION] == 1 else 0.0
+
+
+@njit(parallel=True, cache=True)
+def _update_batch_nb(state, window, params, high, low, close, n_bars, out):
+    for t in prange(close.shape[0]):
+        for j in range(n_bars[t]):
+            _step_nb(
+                state,
+                window,
+                params,
+                t,
+                high[t, j],
+                low[t, j],
+                close[t, j],
+                out,
+            )
+
+
+@njit(parallel=True, cache=True)
+def _signal_codes_nb(
+    state, window, params, warmup, high, low, close, n_bars, out, codes
+):
+    """Signal code after every bar; 0 (flat) until a token is warmed up."""
+    for t in prange(close.shape[0]):
+        for j in range(n_bars[t]):
+            _step_nb(
+                state,
+                window,
+                params,
+                t,
+                high[t, j],
+                low[t, j],
+                close[t, j],
+                out,
+            )
+            if state[t, _COUNT] < warmup[t]:
+                codes[t, j] = 0
+                continue
+            truthy = 0
+            for i in range(6):
+                if out[t, i] != 0:
+                    truthy += 1
+            codes[t, j] = 1 if truthy == 6 else (-1 if truthy == 0 else 0)
+
+
+@njit(cache=True)
+def _new_state_nb():
+    state = np.zeros((1, _STATE_SIZE))
+    state[0, _PREV_CLOSE] = np.nan
+    for column in (_PREV_HIGH, _PREV_LOW, _UPPER, _LOWER, _TREND):
+        state[0, _FAST + column] = np.nan
+    state[0, _FAST + _DIRECTION] = 1.0
+    return state
+
+
+# Single-indicator series over one token's bars, with the same arithmetic
+# as _step_nb, for callers that combine indicators computed separately.
+@njit(cache=True)
+def _sma_below_close_nb(close, period):
+    out = np.zeros(close.shape[0], dtype=np.bool_)
+    total = 0.0
+    for k in range(close.shape[0]):
+        total += close[k]
+        if k >= period:
+            total -= close[k - period]
+        if k + 1 >= period:
+            out[k] = total / period < close[k]
+    return out
+
+
+@njit(cache=True)
+def _rsi_above_50_nb(close, period):
+    state = _new_state_nb()
+    out = np.zeros(close.shape[0], dtype=np.bool_)
+    prev_close = np.nan
+    for k in range(close.shape[0]):
+        change = close[k] - prev_close
+        prev_close = close[k]
+        gain = np.nan
+        loss = np.nan
+        if not np.isnan(change):
+            gain = max(change, 0.0)
+            loss = max(-change, 0.0)
+        gain = _rma_nb(
+            state, 0, _GAIN_SUM, _GAIN_WEIGHT, _GAIN_COUNT, gain, period
+        )
+        loss = _rma_nb(
+            state, 0, _LOSS_SUM, _LOSS_WEIGHT, _LOSS_COUNT, loss, period
+        )
+        if gain + loss != 0:
+            out[k] = 100.0 * gain / (gain + loss) >= 50
+    return out
+
+
+@njit(cache=True)
+def _supertrend_series_nb(high, low, close, period, multiplier):
+    """Supertrend line and whether its direction is up, per bar."""
+    state = _new_state_nb()
+    trend = np.empty(close.shape[0])
+    up = np.zeros(close.shape[0], dtype=np.bool_)
+    prev_close = np.nan
+    for k in range(close.shape[0]):
+        state[0, _COUNT] = k + 1
+        _supertrend_nb(
+            state,
+            0,
+            _FAST,
+            high[k],
+            low[k],
+            close[k],
+            prev_close,
+            period,
+            multiplier,
+        )
+        prev_close = close[k]
+        trend[k] = state[0, _FAST + _TREND]
+        up[k] = state[0, _FAST + _DIRECTION] == 1
+    return trend, up
+
+
+class BatchIndicatorEngine:
+    """IndicatorEngine for a whole watchlist at once.
+
+    State for every token lives in 2-D arrays and each minute-close is
+    one ``_update_batch_nb`` call over a (tokens x new bars) layout, so
+    the results are the same as running an IndicatorEngine per token.
+    """
+
+    def __init__(self, strategies: dict) -> None:
+        self.tokens = list(strategies)
+        self.position = {token: i for i, token in enumerate(self.tokens)}
+        self.params = np.array(
+            [
+                [strategies[token][key] for key in _PARAMS]
+                for token in self.tokens
+            ],
+            dtype=np.float64,
+        ).reshape(-1, len(_PARAMS))
+        self.window = np.array(
+            [max(strategies[token].values()) + 2 for token in self.tokens],
+            dtype=np.int64,
+        )
+
+        n = len(self.tokens)
+        self.state = np.zeros((n, _STATE_SIZE))
+        self.state[:, _PREV_CLOSE] = np.nan
+        for base in (_FAST, _SLOW):
+            for column in (_PREV_HIGH, _PREV_LOW, _UPPER, _LOWER, _TREND):
+                self.state[:, base + column] = np.nan
+            self.state[:, base + _DIRECTION] = 1
+        sma_size = int(self.params[:, 0].max()) if n else 1
+        self._sma_window = np.zeros((n, sma_size))
+        self.values = np.full((n, 6), np.nan)
+        self.codes = np.zeros(n, dtype=np.int8)
+
+    @property
+    def ready(self) -> np.ndarray:
+        return self.state[:, _COUNT] >= self.window
+
+    def update(self, bars: dict) -> np.ndarray:
+        """Feed ``{token: DataFrame}`` of closed bars.
+
+        Returns a mask of tokens that received bars and are warmed up;
+        their signal codes (see ``signal_code``) are in ``self.codes``.
+        """
+        n = len(self.tokens)
+        n_bars = np.zeros(n, dtype=np.int64)
+        frames = []
+        for token, df in bars.items():
+            if token in self.position and df.shape[0]:
+                n_bars[self.position[token]] = df.shape[0]
+                frames.append((self.position[token], df))
+
+        width = max(int(n_bars.max()) if n else 0, 1)
+        high = np.full((n, width), np.nan)
+        low = np.full((n, width), np.nan)
+        close = np.full((n, width), np.nan)
+        for row, df in frames:
+            columns = list(df.columns)
+            values = df.to_numpy(dtype=np.float64)
+            high[row, : values.shape[0]] = values[:, columns.index("high")]
+            low[row, : values.shape[0]] = values[:, columns.index("low")]
+            close[row, : values.shape[0]] = values[:, columns.index("close")]
+
+        _update_batch_nb(
+            self.state,
+            self._sma_window,
+            self.params,
+            high,
+            low,
+            close,
+            n_bars,
+            self.values,
+        )
+        truthy = self.values != 0
+        self.codes = np.where(
+            truthy.all(axis=1), 1, np.where(truthy.any(axis=1), 0, -1)
+        ).astype(np.int8)
+        return (n_bars > 0) & self.ready
+
+    def signal_history(self, high, low, close, n_bars) -> np.ndarray:
+        """Signal code after every bar of (tokens x bars) arrays.
+
+        Rows follow ``self.tokens`` and only the first ``n_bars[t]``
+        columns of row ``t`` are used. Codes are those the live path
+        would dispatch bar by bar, with 0 until a token is warmed up.
+        """
+        codes = np.zeros(close.shape, dtype=np.int8)
+        _signal_codes_nb(
+            self.state,
+            self._sma_window,
+            self.params,
+            self.window,
+            np.asarray(high, dtype=np.float64),
+            np.asarray(low, dtype=np.float64),
+            np.asarray(close, dtype=np.float64),
+            np.asarray(n_bars, dtype=np.int64),
+            self.values,
+            codes,
+        )
+        return codes
@@ -2,22 +2,37 @@ import datetime
 import logging
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
-from numba import njit
 
+from barstore import BarStore, to_frame
+from dispatcher import Dispatcher
 from firestore import Firestore
+from indicator_engine import (
+    SIGNALS,
+    BatchIndicatorEngine,
+    IndicatorEngine,
+    signal_code,
+)
 from observer_pattern import IEventListener, IEventManager
+from tracing import tracer
 from utils import IST, OptionType, TransactionType, logging_handler
 
 logging.basicConfig(level=logging.DEBUG, handlers=[logging_handler])
 
 
 class Indicator(IEventManager, IEventListener):
-    def __init__(self):
+    def __init__(
+        self,
+        batch: bool = False,
+        bar_store: BarStore = None,
+        dispatcher: Dispatcher = None,
+        tokens: list = None,
+    ):
         self._observers = set()
+        self.dispatcher = dispatcher
         self.strategy = defaultdict(dict)
         self.window = defaultdict(int)
         self.timeframe = defaultdict(int)
@@ -28,55 +43,94 @@ class Indicator(IEventManager, IEventListener):
         self.df_incomplete_1 = defaultdict(pd.DataFrame)
 
         self.signal = defaultdict(tuple)
+        self.engine = {}
+        self.batch_engine = None
+        self.bar_store = bar_store or BarStore()
+        history = {}
 
         docs = Firestore.get_watchlist()
-
-        for doc in docs:
-            id = doc.id
-            token = doc.get("instrumentToken")
+        if tokens is not None:
+            # Only this shard of the watchlist (see shardedfeed)
+            tokens = set(tokens)
+            docs = [
+                doc for doc in docs if doc.get("instrumentToken") in tokens
+            ]
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            loaded = list(executor.map(self.__load, docs))
+
+        for id, token, timeframe, data_dict, df in loaded:
             self.stockName[token] = id
-            try:
-                strategy = Firestore.get_strategy(id)
-
-                self.timeframe[token] = strategy.get("timeframe")
-                data_dict = strategy.to_dict()
-                data_dict.pop("timeframe")
-
-                for key in data_dict.keys():
-                    data_dict[key] = int(data_dict[key])
-                self.strategy[token] = data_dict
-                self.window[token] = max(data_dict.values()) + 2
-
-                df = []
-                size = self.window[token] * self.timeframe[token]
-                livefeed_stream = Firestore.get_ohlcv(id, size)
-
-                for livefeed in livefeed_stream:
-                    dict_data = livefeed.to_dict()
-                    dict_data["datetime"] = livefeed.id
-                    df.append(dict_data)
-                df = pd.DataFrame(df)
-                df["datetime"] = pd.to_datetime(df["datetime"])
-                df = (
-                    df.resample(f"{self.timeframe[token]}T", on="datetime")
-                    .agg(
-                        {
-                            "open": "first",
-                            "high": "max",
-                            "low": "min",
-                            "close": "last",
-                            "volume": "last",
-                            "OI": "last",
-                        }
-                    )
-                    .dropna()
-                )
-                self.df_complete[token] = df.tail(self.window[token])
-                logging.info(
-                    f"Shape of {id} - {token}: {self.df_complete[token].shape} - [{self.df_complete[token].index[0]} - {self.df_complete[token].index[-1]}]"
-                )
-            except Exception as e:
-                logging.error(f"Error in Indicator init: {e}")
+            if df is None:
+                continue
+            self.timeframe[token] = timeframe
+            self.strategy[token] = data_dict
+            self.window[token] = max(data_dict.values()) + 2
+            self.df_complete[token] = df.tail(self.window[token])
+            history[token] = df
+            if not batch:
+                self.engine[token] = IndicatorEngine(data_dict)
+                self.engine[token].update_frame(df)
+            logging.info(
+                f"Shape of {id} - {token}: {self.df_complete[token].shape} - [{self.df_complete[token].index[0]} - {self.df_complete[token].index[-1]}]"
+            )
+
+        if batch:
+            self.batch_engine = BatchIndicatorEngine(
+                {token: self.strategy[token] for token in history}
+            )
+            self.batch_engine.update(history)
+
+    def __load(self, doc):
+        id = doc.id
+        token = doc.get("instrumentToken")
+        try:
+            strategy = Firestore.get_strategy(id)
+
+            timeframe = strategy.get("timeframe")
+            data_dict = strategy.to_dict()
+            data_dict.pop("timeframe")
+
+            for key in data_dict.keys():
+                data_dict[key] = int(data_dict[key])
+
+            size = (max(data_dict.values()) + 2) * timeframe
+            df = self.__load_ohlcv(id, token, size)
+            df = df.resample(f"{timeframe}T").agg(
+                {
+                    "open": "first",
+                    "high": "max",
+                    "low": "min",
+                    "close": "last",
+                    "volume": "last",
+                    "OI": "last",
+                }
+            )
+            return id, token, timeframe, data_dict, df.dropna()
+        except Exception as e:
+            logging.error(f"Error in Indicator init: {e}")
+            return id, token, None, None, None
+
+    def __load_ohlcv(self, id, token, size: int) -> pd.DataFrame:
+        """Last ``size`` 1-minute bars; Firestore is only asked for bars
+        newer than what the local BarStore already holds."""
+        last = self.bar_store.last_timestamp(token)
+        if last is None:
+            livefeed_stream = Firestore.get_ohlcv(id, size)
+        else:
+            livefeed_stream = Firestore.get_ohlcv_since(
+                id, last.strftime("%Y-%m-%d %H:%M:%S"), size
+            )
+
+        df = []
+        for livefeed in livefeed_stream:
+            dict_data = livefeed.to_dict()
+            dict_data["datetime"] = livefeed.id
+            df.append(dict_data)
+        if df:
+            df = pd.DataFrame(df)
+            df["datetime"] = pd.to_datetime(df["datetime"])
+            self.bar_store.append(token, df.set_index("datetime"))
+        return to_frame(self.bar_store.tail(token, size))
 
     def attachObserver(self, observer: IEventListener):
         self._observers.add(observer)
@@ -87,25 +141,23 @@ class Indicator(IEventManager, IEventListener):
             self._observers.remove(observer)
         return super().detachObserver(observer)
 
-    def notifyObserver(self, token: str, transactionType: TransactionType):
-        for observer in self._observers:
-            observer.update(token, transactionType)
-        return super().notifyObserver()
-
     def notifyObserver(
         self,
         token: str,
         transactionType: TransactionType,
-        optionType: OptionType,
+        optionType: OptionType = None,
     ):
         for observer in self._observers:
-            observer.update(token, transactionType, optionType)
-        return super().notifyObserver()
+            if self.dispatcher is not None:
+                self.dispatcher.submit(
+                    token, observer.update, token, transactionType, optionType
+                )
+            else:
+                observer.update(token, transactionType, optionType)
+        return "success"
 
     def data_handler(self, token, df: pd.DataFrame):
         TIMEFRAME = self.timeframe[token]
-        STRATEGY = self.strategy[token]
-        WINDOW = self.window[token]
         df = df.resample(f"{TIMEFRAME}T").agg(
             {
                 "open": "first",
@@ -140,68 +192,41 @@ class Indicator(IEventManager, IEventListener):
         if completed_df.shape[0] == 0:
             return
 
+        self.evaluate(token, completed_df)
+        return
+
+    def evaluate(self, token, completed_df: pd.DataFrame):
+        WINDOW = self.window[token]
         self.df_complete[token] = pd.concat(
             [self.df_complete[token], completed_df]
-        )
+        ).tail(WINDOW)
 
-        if self.df_complete[token].shape[0] < WINDOW:
+        engine = self.engine.get(token)
+        if engine is None:
+            return
+        (
+            sma,
+            rsi,
+            fast_trend,
+            slow_trend,
+            fast_direction,
+            slow_direction,
+        ) = engine.update_frame(completed_df)
+        if not engine.ready:
             return
-
-        if self.df_complete[token].shape[0] == WINDOW + 1:
-            self.df_complete[token].drop(
-                self.df_complete[token].index[:1], inplace=True
-            )
-
-        sma = self.SMA(self.df_complete[token], STRATEGY["sma"]).values
-        rsi = self.RSI(self.df_complete[token], STRATEGY["rsi"]).values
-        (fast_trend, fast_direction) = self.SUPERTREND(
-            self.df_complete[token],
-            STRATEGY["fast_period"],
-            STRATEGY["fast_multiplier"],
-        )
-        (slow_trend, slow_direction) = self.SUPERTREND(
-            self.df_complete[token],
-            STRATEGY["slow_period"],
-            STRATEGY["slow_multiplier"],
-        )
 
         logging.debug(
-            f"token: {token}, sma: {sma[-1]}, rsi: {rsi[-1]}, fast_trend: {fast_trend[-1]}, slow_trend: {slow_trend[-1]}, fast_direction: {fast_direction[-1]}, slow_direction: {slow_direction[-1]}"
+            f"token: {token}, sma: {sma}, rsi: {rsi}, fast_trend: {fast_trend}, slow_trend: {slow_trend}, fast_direction: {fast_direction}, slow_direction: {slow_direction}"
         )
+        self.dispatch_signal(token, signal_code(engine.values))
+        return
 
-        if (
-            sma[-1]
-            and rsi[-1]
-            and fast_trend[-1]
-            and slow_trend[-1]
-            and fast_direction[-1]
-            and slow_direction[-1]
-        ):
-            current_signal = (token, TransactionType.buy, OptionType.call)
-            if self.signal[token] != current_signal:
-                res = self.notifyObserver(
-                    token, TransactionType.buy, OptionType.call
-                )
-
-        elif (
-            not sma[-1]
-            and not rsi[-1]
-            and not fast_trend[-1]
-            and not slow_trend[-1]
-            and not fast_direction[-1]
-            and not slow_direction[-1]
-        ):
-            current_signal = (token, TransactionType.buy, OptionType.put)
-            if self.signal[token] != current_signal:
-                res = self.notifyObserver(
-                    token, TransactionType.buy, OptionType.put
-                )
-
-        else:
-            current_signal = (token, TransactionType.sell)
-            if self.signal[token] != current_signal:
-                res = self.notifyObserver(token, TransactionType.sell)
-
+    def dispatch_signal(self, token, code: int):
+        tracer.stamp(token, "evaluate")
+        current_signal = (token, *SIGNALS[code])
+        if self.signal[token] == current_signal:
+            return
+        res = self.notifyObserver(token, *SIGNALS[code])
         if res == "success":
             self.signal[token] = current_signal
         return
@@ -210,6 +235,44 @@ class Indicator(IEventManager, IEventListener):
         self.updatedb(token, df)
         return
 
+    def update_bars(self, token, bars: dict):
+        """Consume closed bars from a BarBuilder, keyed by timeframe."""
+        if 1 in bars:
+            self.store_ohlcv(token, bars[1])
+        if self.timeframe[token] in bars:
+            self.evaluate(token, bars[self.timeframe[token]])
+        return
+
+    def update_batch(self, bars: dict):
+        """Consume one BarBuilder drain for every token at once."""
+        completed = {}
+        for token, frames in bars.items():
+            if 1 in frames:
+                self.store_ohlcv(token, frames[1])
+            if self.timeframe[token] in frames:
+                completed[token] = frames[self.timeframe[token]]
+        self.evaluate_batch(completed)
+        return
+
+    def evaluate_batch(self, completed: dict):
+        updated = self.batch_engine.update(completed)
+        for row in np.flatnonzero(updated):
+            self.dispatch_signal(
+                self.batch_engine.tokens[row],
+                int(self.batch_engine.codes[row]),
+            )
+        return
+
+    def store_ohlcv(self, token, df: pd.DataFrame):
+        self.bar_store.append(token, df)
+        for index, row in df.iterrows():
+            Firestore.writer().add_ohlcv(
+                self.stockName[token],
+                index.strftime("%Y-%m-%d %H:%M:%S"),
+                row.to_dict(),
+            )
+        return
+
     def updatedb(self, token, df):
         df = pd.concat([self.df_incomplete_1[token], df])
         df = df.groupby(df.index).agg(
@@ -232,72 +295,11 @@ class Indicator(IEventManager, IEventListener):
         ]
         if completed_df.shape[0] == 0:
             return
+        self.bar_store.append(token, completed_df)
         data = completed_df.iloc[-1].to_dict()
         token_time = completed_df.index[-1].strftime("%Y-%m-%d %H:%M:%S")
 
-        Firestore.add_ohlcv(self.stockName[token], token_time, data)
+        Firestore.writer().add_ohlcv(self.stockName[token], token_time, data)
         self.data_handler(token, completed_df)
 
         return
-
-    def SMA(self, data: pd.DataFrame, period: int = 20):
-        data = data.tail(period + 1)
-        return ta.sma(data["close"], timeperiod=period) < data["close"]
-
-    def RSI(self, data: pd.DataFrame, period: int = 14):
-        data = data.tail(period + 1)
-        return ta.rsi(data["close"], timeperiod=period) >= 50
-
-    def SUPERTREND(
-        self, data: pd.DataFrame, period: int = 7, multiplier: int = 3
-    ):
-        data = data.tail(period + 1)
-        high = data["high"]
-        low = data["low"]
-        close = data["close"]
-
-        avg_price = ta.midprice(high, low)
-        atr = ta.atr(high, low, close, period)
-        matr = multiplier * atr
-        upper = avg_price + matr
-        lower = avg_price - matr
-        trend, direction = _get_final_bands_nb(
-            close.values, upper.values, lower.values
-        )
-        return trend, direction == 1
-
-
-@njit(nopython=True)
-def _get_final_bands_nb(close, upper, lower):
-    trend = np.full(close.shape, np.nan)
-    direction = np.full(close.shape, 1)
-
-    for i in range(1, close.shape[0]):
-        if close[i] > upper[i - 1]:
-            direction[i] = 1
-        elif close[i] < lower[i - 1]:
-            direction[i] = -1
-        else:
-            direction[i] = direction[i - 1]
-            if direction[i] > 0 and lower[i] < lower[i - 1]:
-                lower[i] = lower[i - 1]
-            if direction[i] < 0 and upper[i] > upper[i - 1]:
-                upper[i] = upper[i - 1]
-
-        if direction[i] > 0:
-            trend[i] = lower[i]
-        else:
-            trend[i] = upper[i]
-
-    return trend, direction
-
-
-@njit(nopython=True)
-def calculate_sma(prices, window=14):
-    sma = np.zeros_like(prices)
-    sma[:window] = np.mean(prices[:window])
-
-    for i in range(window, len(prices)):
-        sma[i] = np.mean(prices[i - window + 1 : i + 1])
-
-    return sma
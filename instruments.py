@@ -0,0 +1,277 @@
+import logging
+import os
+from functools import lru_cache
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from scripmaster import TOKENSTORE, load_snapshot
+from utils import logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+
+class InstrumentTable:
+    """Array-backed token table with a sorted token-id index.
+
+    ``frame`` keeps the original columns (indexed by instrumentToken) and
+    ``columns`` the same data as NumPy arrays, so single-row lookups never
+    go through pandas.
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        self.columns = {
+            column: frame[column].to_numpy() for column in frame.columns
+        }
+        self.tokens = frame.index.to_numpy(dtype=np.int64)
+        self._order = np.argsort(self.tokens, kind="stable")
+        self._sorted_tokens = self.tokens[self._order]
+
+    def __len__(self) -> int:
+        return self.tokens.shape[0]
+
+    def position(self, token) -> int:
+        """Row position of ``token`` or -1 when it is unknown."""
+        i = np.searchsorted(self._sorted_tokens, int(token))
+        if i < len(self) and self._sorted_tokens[i] == int(token):
+            return int(self._order[i])
+        return -1
+
+    def record(self, position: int) -> dict:
+        record = {"instrumentToken": int(self.tokens[position])}
+        for column, values in self.columns.items():
+            record[column] = values[position]
+        return record
+
+    def get(self, token):
+        position = self.position(token)
+        return None if position < 0 else self.record(position)
+
+    def rows(self, positions) -> pd.DataFrame:
+        return self.frame.iloc[np.asarray(positions, dtype=np.int64)]
+
+    def select(self, positions=None, **conditions) -> np.ndarray:
+        """Positions (within ``positions``) whose columns equal the values."""
+        if positions is None:
+            positions = np.arange(len(self))
+        for column, value in conditions.items():
+            positions = positions[self.columns[column][positions] == value]
+        return positions
+
+
+class FnoTable(InstrumentTable):
+    """F&O tokens sorted by (instrumentName, optionType, expiry, strike).
+
+    Every (instrumentName, optionType, expiry) series is a contiguous
+    slice with ascending strikes, so strike ranges and nearest strikes are
+    two binary searches.
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        expiry = pd.to_datetime(
+            frame["expiry"], format="%d%b%y", errors="coerce"
+        ).to_numpy(dtype="datetime64[D]")
+        order = np.lexsort(
+            (
+                frame["strike"].to_numpy(),
+                expiry,
+                frame["optionType"].to_numpy(dtype=str),
+                frame["instrumentName"].to_numpy(dtype=str),
+            )
+        )
+        super().__init__(frame.iloc[order])
+        self.expiry = expiry[order]
+        self.strike = self.columns["strike"].astype(np.float64)
+
+        self._series = {}
+        self._expiries = {}
+        names = self.columns["instrumentName"]
+        types = self.columns["optionType"]
+        bounds = np.flatnonzero(
+            (names[1:] != names[:-1])
+            | (types[1:] != types[:-1])
+            | (self.expiry[1:] != self.expiry[:-1])
+        )
+        starts = np.concatenate(([0], bounds + 1))
+        ends = np.concatenate((bounds + 1, [len(self)]))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if start == end:
+                continue
+            key = (names[start], types[start])
+            self._series[key + (self.expiry[start],)] = (start, end)
+            self._expiries.setdefault(key, []).append(self.expiry[start])
+
+    def expiries(self, name: str, option_type: str) -> list:
+        """Expiry dates of a series in ascending order."""
+        return self._expiries.get((name, option_type), [])
+
+    def _slices(self, name: str, option_type: str, expiry=None):
+        if expiry is None:
+            expiries = self.expiries(name, option_type)
+        elif isinstance(expiry, (list, tuple, np.ndarray)):
+            expiries = [_to_date(value) for value in expiry]
+        else:
+            expiries = [_to_date(expiry)]
+        for value in expiries:
+            bounds = self._series.get((name, option_type, value))
+            if bounds is not None:
+                yield bounds
+
+    def strike_range(
+        self, name: str, option_type: str, low, high, expiry=None
+    ) -> np.ndarray:
+        """Positions with ``low <= strike <= high``, for one or all expiries."""
+        parts = []
+        for start, end in self._slices(name, option_type, expiry):
+            strikes = self.strike[start:end]
+            lo = start + np.searchsorted(strikes, low, side="left")
+            hi = start + np.searchsorted(strikes, high, side="right")
+            parts.append(np.arange(lo, hi))
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(parts)
+
+    def nearest_strike(
+        self, name: str, option_type: str, price: float, expiry=None
+    ) -> int:
+        """Position of the strike closest to ``price`` or -1.
+
+        Without ``expiry`` the nearest expiry on or after today is used.
+        """
+        if expiry is None:
+            today = np.datetime64("today", "D")
+            upcoming = [
+                value
+                for value in self.expiries(name, option_type)
+                if value >= today
+            ]
+            if not upcoming:
+                return -1
+            expiry = upcoming[0]
+        for start, end in self._slices(name, option_type, expiry):
+            strikes = self.strike[start:end]
+            i = np.searchsorted(strikes, price)
+            if i == strikes.shape[0] or (
+                i > 0 and price - strikes[i - 1] <= strikes[i] - price
+            ):
+                i -= 1
+            return start + int(i)
+        return -1
+
+
+class InstrumentMaster:
+    """Cash and F&O token tables loaded once from the scrip master store.
+
+    Use ``InstrumentMaster.get()`` for the shared instance; it is rebuilt
+    when the store file changes on disk or ``reload()`` is called after
+    ``Watchlist.fetch_tokens`` rewrites it.
+    """
+
+    _instance = None
+    _lock = Lock()
+
+    def __init__(
+        self, cash: pd.DataFrame, fno: pd.DataFrame, mtime: float = None
+    ) -> None:
+        self.cash = InstrumentTable(cash)
+        self.fno = FnoTable(fno)
+        self.mtime = mtime
+        self._cash_by_name = {}
+        for position, name in enumerate(self.cash.columns["instrumentName"]):
+            self._cash_by_name.setdefault(name, []).append(position)
+
+    @classmethod
+    def load(cls, path: str = TOKENSTORE):
+        mtime = os.path.getmtime(path)
+        tables = load_snapshot(path)
+        return cls(tables["cashTokens"], tables["fnoTokens"], mtime)
+
+    @classmethod
+    def get(cls, path: str = TOKENSTORE):
+        instance = cls._instance
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if instance is not None and (
+            mtime is None or instance.mtime == mtime
+        ):
+            return instance
+        return cls.reload(path)
+
+    @classmethod
+    def reload(cls, path: str = TOKENSTORE):
+        with cls._lock:
+            instance = cls.load(path)
+            cls._instance = instance
+        logging.info(
+            f"Instrument master loaded: {len(instance.cash)} cash, "
+            f"{len(instance.fno)} F&O tokens"
+        )
+        return instance
+
+    def cash_token(self, token) -> dict:
+        """Cash instrument row for ``token`` or None."""
+        return self.cash.get(token)
+
+    def find_cash(self, **conditions) -> pd.DataFrame:
+        positions = None
+        name = conditions.pop("instrumentName", None)
+        if name is not None:
+            positions = np.array(
+                self._cash_by_name.get(name, []), dtype=np.int64
+            )
+        return self.cash.rows(self.cash.select(positions, **conditions))
+
+    def find_fno(self, strikeRange: tuple = None, **conditions):
+        """F&O rows matching ``conditions``, within an inclusive strike range.
+
+        Lookups by instrumentName and optionType use the sorted series
+        index; other conditions filter the matching rows.
+        """
+        low, high = strikeRange or (-np.inf, np.inf)
+        if "strike" in conditions:
+            low = high = conditions.pop("strike")
+        name = conditions.pop("instrumentName", None)
+        option_type = conditions.pop("optionType", None)
+        if name is not None and option_type is not None:
+            positions = self.fno.strike_range(
+                name,
+                option_type,
+                float(low),
+                float(high),
+                conditions.pop("expiry", None),
+            )
+        else:
+            positions = self.fno.select(
+                **{
+                    column: value
+                    for column, value in (
+                        ("instrumentName", name),
+                        ("optionType", option_type),
+                    )
+                    if value is not None
+                }
+            )
+            strikes = self.fno.strike[positions]
+            positions = positions[
+                (strikes >= float(low)) & (strikes <= float(high))
+            ]
+        return self.fno.rows(self.fno.select(positions, **conditions))
+
+
+def _to_date(value) -> np.datetime64:
+    if isinstance(value, str):
+        return _parse_expiry(value)
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+@lru_cache(maxsize=256)
+def _parse_expiry(value: str) -> np.datetime64:
+    try:
+        date = pd.to_datetime(value, format="%d%b%y")
+    except ValueError:
+        date = pd.to_datetime(value)
+    return np.datetime64(date.date(), "D")
@@ -0,0 +1,227 @@
+import datetime
+import os
+import struct
+from threading import Lock
+
+import numpy as np
+
+from bar_builder import NS_PER_SECOND
+from replay import TIME_FORMAT, make_message
+from utils import IST
+
+JOURNAL_DIR = "kotak_data/ticks"
+RECORD_DTYPE = np.dtype(
+    [
+        ("datetime", "<i8"),
+        ("token", "<i8"),
+        ("ltp", "<f8"),
+        ("volume", "<i8"),
+        ("OI", "<i8"),
+    ]
+)
+_RECORD = struct.Struct("<qqdqq")
+_COUNT = struct.Struct("<q")
+MAGIC = b"WSTICK01"
+HEADER_SIZE = 64
+INDEX_STRIDE = 4096
+NS_PER_DAY = 86400 * NS_PER_SECOND
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def journal_path(date: datetime.date = None, directory=JOURNAL_DIR) -> str:
+    """Journal file of a trading day, today in IST by default."""
+    if date is None:
+        date = datetime.datetime.now(IST).date()
+    return os.path.join(directory, f"{date:%Y-%m-%d}.ticks")
+
+
+def tick_date(timestamp: int) -> datetime.date:
+    """IST date of a naive IST epoch-ns tick time."""
+    return _EPOCH + datetime.timedelta(days=timestamp // NS_PER_DAY)
+
+
+def _map(path: str, mode: str):
+    """Header count and record view over a journal file."""
+    mm = np.memmap(path, dtype=np.uint8, mode=mode)
+    if bytes(mm[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a tick journal")
+    count = mm[8:16].view(np.int64)
+    records = mm[HEADER_SIZE:].view(RECORD_DTYPE)
+    return mm, count, records
+
+
+class TickJournal:
+    """Append-only memory-mapped tick journal, one file per trading day.
+
+    Files under ``kotak_data/ticks/<YYYY-MM-DD>.ticks`` hold a 64 byte
+    header with the record count followed by packed RECORD_DTYPE records
+    in arrival order. The file grows ``chunk`` records at a time, and a
+    tick dated on a later IST day than the open file rotates to that
+    day's file. Reopening a day continues after its last record.
+
+    There is one writer, the feed callback thread. Once ``close`` is
+    called, later appends are ignored.
+    """
+
+    def __init__(self, directory: str = JOURNAL_DIR, chunk: int = 1 << 16):
+        self.directory = directory
+        self.chunk = chunk
+        self.path = None
+        self.date = None
+        self._day_end = None
+        self._mm = None
+        self._buffer = None
+        self._n = 0
+        self._capacity = 0
+        self._closed = False
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(
+        self, token: int, timestamp: int, ltp: float, volume: int, oi: int
+    ):
+        # Uncontended except against close() from another thread
+        with self._lock:
+            if self._closed:
+                return
+            if self._day_end is None or timestamp >= self._day_end:
+                self._rotate(tick_date(timestamp))
+            if self._n == self._capacity:
+                self._grow()
+            # struct.pack_into on the mapping is cheaper than a record
+            # assignment
+            _RECORD.pack_into(
+                self._buffer,
+                HEADER_SIZE + self._n * _RECORD.size,
+                timestamp,
+                token,
+                ltp,
+                volume,
+                oi,
+            )
+            self._n += 1
+            _COUNT.pack_into(self._buffer, 8, self._n)
+
+    def _rotate(self, date: datetime.date):
+        self._close_file()
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = journal_path(date, self.directory)
+        self.date = date
+        start = (date - _EPOCH).days * NS_PER_DAY
+        self._day_end = start + NS_PER_DAY
+        if not os.path.exists(self.path):
+            with open(self.path, "wb") as f:
+                f.write(MAGIC.ljust(HEADER_SIZE, b"\0"))
+        self._open()
+
+    def _open(self):
+        size = os.path.getsize(self.path)
+        self._capacity = (size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if self._capacity == 0:
+            self._resize(self.chunk)
+        self._mm, count, _ = _map(self.path, "r+")
+        self._buffer = memoryview(self._mm)
+        self._n = int(count[0])
+
+    def _resize(self, capacity: int):
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self._capacity = capacity
+
+    def _unmap(self):
+        if self._mm is not None:
+            self._buffer.release()
+            self._mm.flush()
+        self._mm = self._buffer = None
+
+    def _grow(self):
+        self._unmap()
+        self._resize(self._capacity + self.chunk)
+        self._open()
+
+    def flush(self):
+        if self._mm is not None:
+            self._mm.flush()
+
+    def close(self):
+        """Flush and trim the open file to its records; no more appends."""
+        with self._lock:
+            self._closed = True
+            self._close_file()
+
+    def _close_file(self):
+        if self._mm is None:
+            return
+        self._unmap()
+        self._resize(self._n)
+        self.path = self.date = self._day_end = None
+        self._n = 0
+
+
+class JournalReader:
+    """Read-only view of one day's journal.
+
+    ``records`` is a memmap view, so sequential scans page the file in
+    as they go. Lookups by time use a sparse index of every
+    INDEX_STRIDE-th record's running maximum time, then a search inside
+    one stride; they assume arrival order follows feed time, as it does
+    for a single websocket.
+    """
+
+    def __init__(self, path: str, stride: int = INDEX_STRIDE) -> None:
+        self.path = path
+        self.stride = stride
+        if os.path.getsize(path) <= HEADER_SIZE:
+            self.records = np.empty(0, dtype=RECORD_DTYPE)
+        else:
+            _, count, records = _map(path, "r")
+            self.records = records[: int(count[0])]
+        self._index = None
+
+    @classmethod
+    def open(cls, date: datetime.date = None, directory=JOURNAL_DIR):
+        return cls(journal_path(date, directory))
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    @property
+    def index(self) -> np.ndarray:
+        if self._index is None:
+            times = self.records["datetime"][:: self.stride]
+            self._index = np.maximum.accumulate(times)
+        return self._index
+
+    def position(self, timestamp: int) -> int:
+        """Position of the first record at or after ``timestamp``."""
+        block = int(np.searchsorted(self.index, timestamp, side="left"))
+        if block == 0:
+            return 0
+        start = (block - 1) * self.stride
+        end = min(start + 2 * self.stride, len(self))
+        times = self.records["datetime"][start:end]
+        return start + int(np.searchsorted(times, timestamp, side="left"))
+
+    def between(self, start: int = None, end: int = None) -> np.ndarray:
+        """Records with ``start <= datetime < end``, as a view."""
+        first = 0 if start is None else self.position(start)
+        last = len(self) if end is None else self.position(end)
+        return self.records[first:last]
+
+    def chunks(self, size: int = 1 << 16):
+        """Sequential views of ``size`` records."""
+        for start in range(0, len(self), size):
+            yield self.records[start : start + size]
+
+    def messages(self, start: int = None, end: int = None):
+        """Journaled ticks as feed messages, for TickReplay."""
+        for record in self.between(start, end).tolist():
+            timestamp, token, ltp, volume, oi = record
+            time_str = (
+                datetime.datetime(1970, 1, 1)
+                + datetime.timedelta(microseconds=timestamp // 1000)
+            ).strftime(TIME_FORMAT)
+            yield make_message(token, ltp, volume, oi, time_str)
@@ -1,12 +1,11 @@
 import datetime
-import email
 import os
-import time
-from imaplib import IMAP4_SSL
 
 from dotenv import load_dotenv
 
+from accesscode import AccessCodeMailbox
 from ks_api_client import ks_api
+from session_cache import SessionCache, derive_key
 from utils import IST
 
 
@@ -38,7 +37,6 @@ class KotakClient:
         return cls.__client
 
     def __client_login(self):
-        # Fetch access code from txt file
         user_id = os.getenv("USERID")
         password = os.getenv("PASSWORD")
 
@@ -55,58 +53,45 @@ class KotakClient:
         except Exception as e:
             exit(code="Not Connected to Internet : {}".format(e))
 
-        # Get session for user
+        # Reuse today's session if one was saved by an earlier run
+        cache = SessionCache(
+            os.getenv("SESSION_KEY")
+            or derive_key(f"{self.__secret_key}:{user_id}")
+        )
+        session_token = cache.load(user_id)
+        if session_token and self.__resume(client, session_token):
+            return client
+
+        # Emails dated before the login request carry stale codes
+        since = datetime.datetime.now(tz=IST) - datetime.timedelta(minutes=1)
         login_response = client.login(password=password)
         message = login_response["Success"]["message"]  # type: ignore
         if message == "Your access code is generated successfully.":
             print("Waiting for 2FA authentication...")
-            time.sleep(5)
 
-        # Get session for 2FA authentication if doesn't exist then fetch
-        # access code from mail and login
         access_code = None
-        while not access_code:
-            access_code = self.__fetch_access_code()
-            if access_code is None:
-                time.sleep(1)
+        with AccessCodeMailbox.from_env() as mailbox:
+            while not access_code:
+                access_code = mailbox.wait(since)
 
         try:
             client.session_2fa(access_code=access_code)
-
+            cache.save(user_id, client.session_token)
         except Exception as e:
             print("Error in Login : ", e)
 
         return client
 
     @staticmethod
-    def __fetch_access_code():
-        username = os.getenv("GMAIL_USERNAME")
-        password = os.getenv("GMAIL_PASSWORD")
-        mail = IMAP4_SSL("imap.gmail.com")
-        mail.login(username, password)  # type: ignore
-        mail.select("inbox")
-        _, messages = mail.search(
-            None, 'FROM "accesscode@kotaksecurities.com"'
-        )
-
-        for message in messages:
-            msg_id = message.split(b" ")[-1]
-
-            _, msg_info = mail.fetch(msg_id, "(RFC822)")
-            for response in msg_info:
-                if isinstance(response, tuple):
-                    msg = email.message_from_bytes(response[1])
-                    email_date = msg["Date"]
-                    email_date = datetime.datetime.strptime(
-                        email_date, "%d %b %Y %H:%M:%S %z"
-                    )
-                    if (
-                        email_date.date()
-                        == datetime.datetime.now(tz=IST).date()
-                    ):
-                        access_code = msg["Subject"].split(" ")[-1]
-                        return str(access_code)
-        return None
+    def __resume(client, session_token) -> bool:
+        """Restore ``session_token`` and check it with one cheap call."""
+        client.session_token = session_token
+        try:
+            client.order_report()
+        except Exception:
+            client.session_token = None
+            return False
+        return True
 
 
 if __name__ == "__main__":
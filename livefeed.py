@@ -3,23 +3,130 @@ import logging
 import sys
 import time
 from collections import defaultdict
-from threading import Thread
 
+import numpy as np
 import pandas as pd
 
+from bar_builder import NS_PER_MINUTE, BarBuilder, now_ns, parse_tick_time
+from dispatcher import COALESCE, Dispatcher
 from firestore import Firestore
 from kotakclient import KotakClient
+from quotecache import quote_cache
+from shardedfeed import partition
+from tracing import tracer
 from utils import IST, logging_handler
 from observer_pattern import IEventListener, IEventManager
 
 logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
 
+TICK_DTYPE = np.dtype(
+    [("datetime", "i8"), ("ltp", "f8"), ("volume", "i8"), ("OI", "i8")]
+)
+
+
+class TickBuffer:
+    """Preallocated ring buffer of ticks for a single instrument.
+
+    The feed callback writes records in place; readers get NumPy views
+    over the unread region instead of Python objects. When the writer
+    laps the reader the oldest unread ticks are overwritten.
+    """
+
+    def __init__(self, capacity: int = 1 << 12) -> None:
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self._data = np.zeros(capacity, dtype=TICK_DTYPE)
+        self._mask = capacity - 1
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def append(self, timestamp: int, ltp: float, volume: int, oi: int):
+        self._data[self._head & self._mask] = (timestamp, ltp, volume, oi)
+        self._head += 1
+        if self._head - self._tail > self._mask + 1:
+            self._tail += 1
+            self.dropped += 1
+
+    def last(self):
+        if self._head == 0:
+            return None
+        return self._data[(self._head - 1) & self._mask]
+
+    def view(self) -> np.ndarray:
+        """Unread ticks in arrival order.
+
+        Zero-copy unless the unread region wraps around the end of the
+        buffer, in which case the two halves are joined.
+        """
+        return self._slice(self._tail, self._head)
+
+    def consume(self) -> np.ndarray:
+        """Return the unread ticks and mark them as read."""
+        head = self._head
+        ticks = self._slice(self._tail, head)
+        self._tail = head
+        return ticks
+
+    def _slice(self, tail: int, head: int) -> np.ndarray:
+        if head == tail:
+            return self._data[:0]
+        start = tail & self._mask
+        end = head & self._mask
+        if start < end:
+            return self._data[start:end]
+        return np.concatenate((self._data[start:], self._data[:end]))
+
+
+def aggregate_ticks(
+    ticks: np.ndarray, interval: int = NS_PER_MINUTE
+) -> pd.DataFrame:
+    """Build OHLCV bars from a time-ordered tick view without copying it."""
+    columns = ["open", "high", "low", "close", "volume", "OI"]
+    if ticks.shape[0] == 0:
+        return pd.DataFrame(
+            columns=columns, index=pd.DatetimeIndex([], name="datetime")
+        )
+
+    ltp = ticks["ltp"]
+    bucket = ticks["datetime"] // interval
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    ends = np.append(starts[1:], bucket.shape[0]) - 1
+
+    index = pd.DatetimeIndex(
+        (bucket[starts] * interval).astype("datetime64[ns]"), name="datetime"
+    )
+    return pd.DataFrame(
+        {
+            "open": ltp[starts],
+            "high": np.maximum.reduceat(ltp, starts),
+            "low": np.minimum.reduceat(ltp, starts),
+            "close": ltp[ends],
+            "volume": ticks["volume"][ends],
+            "OI": ticks["OI"][ends],
+        },
+        index=index,
+    )
+
 
 class LiveFeed(IEventManager):
-    dataList = defaultdict(list)
-    __columns = ["datetime", "open", "high", "low", "close", "volume", "OI"]
+    tickBuffer = defaultdict(TickBuffer)
+    barBuilder: BarBuilder = None
+    pipeline = None
+    shards = None
+    journal = None
+    clock = staticmethod(now_ns)
+    batchMode = False
     __instance = None
-    Threads = []
+    # Started with the first LiveFeed, not when the module is imported
+    dispatcher: Dispatcher = None
     count = 0
     stockName = defaultdict(str)
 
@@ -32,6 +139,10 @@ class LiveFeed(IEventManager):
         return cls.__instance
 
     def __init__(self) -> None:
+        if LiveFeed.dispatcher is None:
+            LiveFeed.dispatcher = Dispatcher(
+                workers=8, policy=COALESCE, name="livefeed"
+            )
         self._observers = set()
         self.watchlist = self.__get_watchlist()
 
@@ -58,6 +169,10 @@ class LiveFeed(IEventManager):
             tokens.__str__().replace("[", "").replace("]", "").replace(" ", "")
         )
 
+    def get_shards(self, workers: int) -> list:
+        """The watchlist tokens split for ``workers`` ShardedFeed workers."""
+        return partition(self.watchlist["instrumentToken"].to_list(), workers)
+
     async def subscribe(self):
         sys.stderr = logging_handler.stream
 
@@ -77,7 +192,9 @@ class LiveFeed(IEventManager):
                 "message": "Market will open at 9:15 AM.",
             }
 
-        if time_now.hour > 15 or (time_now.hour == 15 and time_now.minute > 30):
+        if time_now.hour > 15 or (
+            time_now.hour == 15 and time_now.minute > 30
+        ):
             return {
                 "status": "error",
                 "message": "Market is Closed for Today.",
@@ -107,6 +224,7 @@ class LiveFeed(IEventManager):
         except Exception as e:
             logging.error(e)
             return {"status": "error", "message": f"{e}"}
+        quote_cache.clear_live()
         logging.info("Successfully Unsubscribed from Live feed 👍")
         return {
             "status": "success",
@@ -127,17 +245,69 @@ class LiveFeed(IEventManager):
             observer.update(token, df)
         return super().notifyObserver()
 
+    def notifyBars(self, token: str, bars: dict):
+        for observer in self._observers:
+            observer.update_bars(token, bars)
+        return
+
+    def notifyBatch(self, bars: dict):
+        for observer in self._observers:
+            observer.update_batch(bars)
+        return
+
+    def use_bar_builder(self, builder: BarBuilder, batch: bool = False):
+        LiveFeed.barBuilder = builder
+        LiveFeed.batchMode = batch
+        return
+
+    def use_pipeline(self, pipeline):
+        """Hand ticks to an AsyncPipeline instead of flushing on threads."""
+        LiveFeed.pipeline = pipeline
+        return
+
+    def use_shards(self, shards):
+        """Route ticks to a started ShardedFeed's worker processes."""
+        LiveFeed.shards = shards
+        return
+
+    def use_journal(self, journal):
+        """Record every tick to a TickJournal before it is aggregated."""
+        LiveFeed.journal = journal
+        return
+
     # Callback method to receive live feed
     @staticmethod
     def callback_method(message):
         LiveFeed.count += 1
         token = int(message[1])
+        tracer.feed(token)
+        timestamp = parse_tick_time(message[19])
         ltp = float(message[6])
-        total_qty = message[15]
-        open_Interest = message[16]
-        datetime = message[19]
-        series = (datetime, ltp, ltp, ltp, ltp, total_qty, open_Interest)
-        LiveFeed.dataList[token].append(series)
+        total_qty = int(message[15])
+        open_Interest = int(message[16])
+        quote_cache.on_tick(token, ltp)
+        if LiveFeed.journal is not None:
+            LiveFeed.journal.append(
+                token, timestamp, ltp, total_qty, open_Interest
+            )
+        if LiveFeed.shards is not None:
+            LiveFeed.shards.on_tick(
+                token, timestamp, ltp, total_qty, open_Interest
+            )
+            return
+        if LiveFeed.pipeline is not None:
+            LiveFeed.pipeline.on_tick(
+                token, timestamp, ltp, total_qty, open_Interest
+            )
+            return
+        if LiveFeed.barBuilder is not None:
+            LiveFeed.barBuilder.update(
+                token, timestamp, ltp, total_qty, open_Interest
+            )
+            return
+        LiveFeed.tickBuffer[token].append(
+            timestamp, ltp, total_qty, open_Interest
+        )
         return
 
     @staticmethod
@@ -146,32 +316,49 @@ class LiveFeed(IEventManager):
         LiveFeed.startTime = time.perf_counter()
         logging.info(f"count :  {LiveFeed.count}")
         LiveFeed.count = 0
-        for thread in LiveFeed.Threads:
-            thread.join()
-        LiveFeed.Threads.clear()
-
-        for token, data in LiveFeed.dataList.items():
-            df = pd.DataFrame(data, columns=LiveFeed.__columns)
-            df["datetime"] = pd.to_datetime(
-                df["datetime"], format="%d/%m/%Y %H:%M:%S"
-            )
-            df = df.resample("1T", on="datetime").agg(
-                {
-                    "open": "first",
-                    "high": "max",
-                    "low": "min",
-                    "close": "last",
-                    "volume": "last",
-                    "OI": "last",
-                }
+        if LiveFeed.pipeline is not None or LiveFeed.shards is not None:
+            return
+        backlog = LiveFeed.dispatcher.depth()
+        if backlog:
+            logging.warning(f"Observers behind by {backlog} flushes")
+
+        if LiveFeed.barBuilder is not None:
+            LiveFeed.__flush_bar_builder()
+            return
+
+        for token, buffer in list(LiveFeed.tickBuffer.items()):
+            if buffer.dropped:
+                logging.warning(
+                    f"Tick buffer overflow for {token}: {buffer.dropped} ticks dropped"
+                )
+                buffer.dropped = 0
+            ticks = buffer.consume()
+            if ticks.shape[0] == 0:
+                continue
+            df = aggregate_ticks(ticks)
+            tracer.stamp(token, "bar_close")
+            LiveFeed.dispatcher.submit(
+                token, LiveFeed.__instance.notifyObserver, token, df
             )
-            thread = Thread(
-                target=LiveFeed.__instance.notifyObserver, args=(token, df)
+
+        return
+
+    @staticmethod
+    def __flush_bar_builder():
+        LiveFeed.barBuilder.close_until(LiveFeed.clock())
+        drained = LiveFeed.barBuilder.drain()
+        for token in drained:
+            tracer.stamp(token, "bar_close")
+        if LiveFeed.batchMode:
+            LiveFeed.dispatcher.submit(
+                "batch", LiveFeed.__instance.notifyBatch, drained
             )
-            LiveFeed.Threads.append(thread)
-            thread.start()
-        LiveFeed.dataList.clear()
+            return
 
+        for token, bars in drained.items():
+            LiveFeed.dispatcher.submit(
+                token, LiveFeed.__instance.notifyBars, token, bars
+            )
         return
 
     @staticmethod
@@ -1,17 +1,27 @@
 __version__ = "1.0"
 __author__ = "Amit Kumar"
 
-import asyncio  
+import asyncio
 from typing import Optional
 
 import uvicorn
 from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 
+from accountstate import account_state
+from analytics import ledger
+from async_pipeline import AsyncPipeline
+from bar_builder import BarBuilder
+from dispatcher import BLOCK, Dispatcher
+from firestore import Firestore
 from indicators import Indicator
+from journal import TickJournal
 from livefeed import LiveFeed
 from utils import *
-from orderclient import OrderClient, get_quote
+from orderclient import get_quote
 from portfolio import Portfolio
+from quotecache import quote_cache
+from shardedfeed import ShardedFeed
+from tracing import tracer
 from watchlist import Watchlist
 
 # Add async to the function which are slower than others
@@ -23,13 +33,17 @@ subscribed_flag = False
 
 @app.on_event("startup")
 def startup_event():
+    account_state.start()
     return
 
 
 @app.on_event("shutdown")
-def shutdown_event():
-    if subscribed_flag:
-        livefeed.unsubscribe()
+async def shutdown_event():
+    # The /unsubscribe teardown drains queued bars and signals and closes
+    # the journal; off the loop, which an asyncio pipeline still runs on
+    await asyncio.to_thread(unsubscribe)
+    account_state.close(timeout=5)
+    Firestore.close_writer()
     return
 
 
@@ -53,24 +67,75 @@ async def get_livefeed(websocket: WebSocket):
 
 
 @app.get("/subscribe")
-async def subscribe():
+async def subscribe(
+    batch: bool = False, mode: str = "thread", workers: int = 2
+):
     global subscribed_flag
     if subscribed_flag:
         return {"status": "success", "message": "Already Subscribed"}
 
+    if mode not in ("thread", "asyncio", "process"):
+        return {"status": "error", "message": f"Unknown mode {mode}"}
+    if mode == "process" and workers < 1:
+        return {"status": "error", "message": "workers must be at least 1"}
+
     global portfolio, indicator, livefeed
     livefeed = LiveFeed()
+    portfolio = Portfolio()
+    # Every sink is installed before the broker sends the first tick;
+    # loading the indicators takes seconds
+    livefeed.use_journal(TickJournal())
+    if mode == "process":
+        # Bars and indicators run in worker processes; this one
+        # routes ticks and places the orders for their signals
+        indicator = None
+        shards = ShardedFeed(
+            batch=batch,
+            dispatcher=Dispatcher(workers=4, policy=BLOCK, name="signals"),
+        )
+        shards.attachObserver(portfolio)
+        livefeed.use_shards(shards.start(livefeed.get_shards(workers)))
+    else:
+        indicator = Indicator(batch=batch)
+        indicator.attachObserver(portfolio)
+        if mode == "asyncio":
+            pipeline = AsyncPipeline(indicator, batch=batch)
+            livefeed.use_pipeline(await pipeline.start())
+        else:
+            indicator.dispatcher = Dispatcher(
+                workers=4, policy=BLOCK, name="signals"
+            )
+            livefeed.use_bar_builder(BarBuilder(indicator.timeframe), batch)
+            livefeed.attachObserver(indicator)
 
     response = await livefeed.subscribe()
     if response["status"] == "success":
         subscribed_flag = True
-        portfolio = Portfolio()
-        indicator = Indicator()
-        indicator.attachObserver(portfolio)
-        livefeed.attachObserver(indicator)
+    else:
+        await asyncio.to_thread(close_sinks)
     return response
 
 
+def close_sinks():
+    """Stop and unhook everything /subscribe installed on LiveFeed."""
+    journal, LiveFeed.journal = LiveFeed.journal, None
+    if journal is not None:
+        journal.close()
+    if LiveFeed.shards is not None:
+        LiveFeed.shards.close(timeout=30)
+        LiveFeed.shards.dispatcher.close(timeout=30)
+        LiveFeed.shards = None
+    elif LiveFeed.pipeline is not None:
+        LiveFeed.pipeline.close(timeout=30)
+        LiveFeed.pipeline = None
+    else:
+        LiveFeed.dispatcher.join(timeout=30)
+        indicator.dispatcher.close(timeout=30)
+        LiveFeed.barBuilder = None
+        LiveFeed.batchMode = False
+    return
+
+
 @app.get("/unsubscribe")
 def unsubscribe():
     global subscribed_flag
@@ -80,6 +145,7 @@ def unsubscribe():
     global portfolio, indicator, livefeed
     response = livefeed.unsubscribe()
     subscribed_flag = False
+    close_sinks()
     try:
         del livefeed
         del indicator
@@ -91,19 +157,19 @@ def unsubscribe():
 
 @app.get("/orders")
 def get_orders():
-    response = OrderClient().get_order_report()
+    response = account_state.orders()
     return response
 
 
 @app.get("/trades")
 def get_trades():
-    response = OrderClient().get_trade_report()
+    response = account_state.trades()
     return response
 
 
 @app.get("/funds")
 def get_funds():
-    response = OrderClient().get_funds()
+    response = account_state.funds()
     return response
 
 
@@ -123,7 +189,7 @@ def get_margin(
     else:
         transactionType = TransactionType.sell
 
-    response = OrderClient().get_required_margin(
+    response = account_state.client.get_required_margin(
         transactionType, [OrderParams(token, quantity, price)]
     )
     return response
@@ -155,16 +221,42 @@ def get_Open_position(position_type: str):
         positionType = PositionType.stocks
     else:
         positionType = PositionType.today
-    response = OrderClient().get_position(positionType)
+    response = account_state.positions(positionType)
     return response
 
 
+@app.get("/pnl")
+def get_pnl():
+    return ledger.summary(prices=quote_cache.live_prices())
+
+
+@app.get("/metrics")
+def get_metrics():
+    queues = []
+    if LiveFeed.dispatcher is not None:
+        queues.append(LiveFeed.dispatcher.metrics())
+    shards = None
+    if LiveFeed.shards is not None:
+        queues.append(LiveFeed.shards.dispatcher.metrics())
+        shards = LiveFeed.shards.metrics()
+    elif LiveFeed.pipeline is not None:
+        queues.append(LiveFeed.pipeline.metrics())
+    elif subscribed_flag and indicator.dispatcher is not None:
+        queues.append(indicator.dispatcher.metrics())
+    return {
+        "latency": tracer.snapshot(),
+        "queues": queues,
+        "quotes": quote_cache.metrics(),
+        "account": account_state.metrics(),
+        "shards": shards,
+    }
+
+
 @app.get("/fetchTokens")
 def get_tokens():
     response = Watchlist().fetch_tokens()
     return response
 
 
-
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8080)
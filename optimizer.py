@@ -0,0 +1,249 @@
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import SUMMARY_COLUMNS, pnl, resample
+from demoOrder import OrderClient
+from firestore import Firestore
+from indicator_engine import (
+    _PARAMS,
+    _rsi_above_50_nb,
+    _sma_below_close_nb,
+    _supertrend_series_nb,
+)
+from utils import TransactionType, logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+FIELDS = _PARAMS + ["timeframe"]
+DEFAULT_GRID = {
+    "rsi": [7, 14, 21],
+    "sma": [10, 20, 50],
+    "fast_period": [5, 7, 10],
+    "fast_multiplier": [1, 2, 3],
+    "slow_period": [10, 14, 20],
+    "slow_multiplier": [2, 3, 4],
+    "timeframe": [1, 3, 5],
+}
+_COLUMNS = ("datetime", "high", "low", "close")
+
+# Bars of the token being swept, set once per worker process
+_bars = None
+_shm = None
+
+
+def _attach(name: str, length: int):
+    """Pool initializer: map the bars the parent put in shared memory."""
+    global _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(_COLUMNS), length), np.float64, _shm.buf)
+    _load(dict(zip(_COLUMNS, block)))
+
+
+def _load(columns: dict):
+    global _bars
+    _bars = dict(columns)
+    _bars["datetime"] = _bars["datetime"].view(np.int64)
+    _timeframe_bars.cache_clear()
+    _component.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _timeframe_bars(timeframe: int) -> dict:
+    return resample(_bars, timeframe)
+
+
+@lru_cache(maxsize=256)
+def _component(timeframe: int, kind: str, period: int, multiplier=0):
+    """One indicator's per-bar output, shared by every combination that
+    uses the same timeframe and parameters."""
+    bars = _timeframe_bars(timeframe)
+    close = np.ascontiguousarray(bars["close"])
+    if kind == "sma":
+        return _sma_below_close_nb(close, period)
+    if kind == "rsi":
+        return _rsi_above_50_nb(close, float(period))
+    trend, up = _supertrend_series_nb(
+        np.ascontiguousarray(bars["high"]),
+        np.ascontiguousarray(bars["low"]),
+        close,
+        float(period),
+        float(multiplier),
+    )
+    return trend != 0, up
+
+
+def signal_codes(params: dict) -> np.ndarray:
+    """Codes Backtest gives for ``params``, from cached components."""
+    timeframe = params["timeframe"]
+    fast_trend, fast_up = _component(
+        timeframe,
+        "supertrend",
+        params["fast_period"],
+        params["fast_multiplier"],
+    )
+    slow_trend, slow_up = _component(
+        timeframe,
+        "supertrend",
+        params["slow_period"],
+        params["slow_multiplier"],
+    )
+    truthy = (
+        _component(timeframe, "sma", params["sma"]).astype(np.int8)
+        + _component(timeframe, "rsi", params["rsi"])
+        + fast_trend
+        + slow_trend
+        + fast_up
+        + slow_up
+    )
+    codes = np.where(truthy == 6, 1, np.where(truthy == 0, -1, 0))
+    window = max(params[key] for key in _PARAMS) + 2
+    codes[: window - 1] = 0
+    return codes.astype(np.int8)
+
+
+def _evaluate(combinations: list, quantity: int) -> list:
+    buy_rate = OrderClient.charge_rate(TransactionType.buy)
+    sell_rate = OrderClient.charge_rate(TransactionType.sell)
+    results = []
+    for params in combinations:
+        close = _timeframe_bars(params["timeframe"])["close"]
+        summary = pnl(
+            close, signal_codes(params), quantity, buy_rate, sell_rate
+        )
+        results.append({**params, **dict(zip(SUMMARY_COLUMNS, summary))})
+    return results
+
+
+def grid(space: dict = None) -> list:
+    """Every combination of ``space``, ordered so that neighbours share
+    a timeframe and Supertrend settings. Fields missing from ``space``
+    take their DEFAULT_GRID values."""
+    space = {**DEFAULT_GRID, **(space or {})}
+    order = [
+        "timeframe",
+        "fast_period",
+        "fast_multiplier",
+        "slow_period",
+        "slow_multiplier",
+        "sma",
+        "rsi",
+    ]
+    return [
+        dict(zip(order, values))
+        for values in itertools.product(*(space[key] for key in order))
+    ]
+
+
+def random_search(space: dict = None, samples: int = 100, seed: int = 0):
+    """``samples`` distinct combinations drawn from ``space``."""
+    combinations = grid(space)
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(
+        len(combinations), min(samples, len(combinations)), replace=False
+    )
+    return [combinations[i] for i in np.sort(picked)]
+
+
+class Optimizer:
+    """Parameter sweep of the Indicator strategy over one token's bars.
+
+    Bars are copied once into a shared memory block that every worker
+    of the process pool maps, instead of being pickled per task.
+    Combinations are handed out in contiguous chunks of the ordered
+    grid, and each worker caches indicator outputs by timeframe and
+    parameters, so a chunk mostly recombines arrays it already has.
+    """
+
+    def __init__(
+        self, workers: int = None, chunksize: int = 64, quantity: int = 1
+    ) -> None:
+        self.workers = workers or os.cpu_count()
+        self.chunksize = chunksize
+        self.quantity = quantity
+
+    def run(self, bars, combinations: list) -> pd.DataFrame:
+        """Summary per combination, best ``net`` first.
+
+        ``bars`` are 1-minute BarStore columns or a DataFrame.
+        """
+        if isinstance(bars, pd.DataFrame):
+            bars = {
+                "datetime": bars.index.values.astype("datetime64[ns]"),
+                **{name: bars[name].values for name in _COLUMNS[1:]},
+            }
+        length = len(bars["close"])
+        chunks = [
+            combinations[i : i + self.chunksize]
+            for i in range(0, len(combinations), self.chunksize)
+        ]
+
+        if self.workers == 1:
+            _load({name: np.asarray(bars[name]) for name in _COLUMNS})
+            results = [_evaluate(chunk, self.quantity) for chunk in chunks]
+        else:
+            results = self._run_pool(bars, length, chunks)
+
+        rows = [row for chunk in results for row in chunk]
+        return (
+            pd.DataFrame(rows, columns=FIELDS + SUMMARY_COLUMNS)
+            .sort_values("net", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def _run_pool(self, bars, length: int, chunks: list) -> list:
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(len(_COLUMNS) * length * 8, 1)
+        )
+        try:
+            block = np.ndarray((len(_COLUMNS), length), np.float64, shm.buf)
+            block[0].view(np.int64)[:] = np.asarray(bars["datetime"]).view(
+                np.int64
+            )
+            for row, name in enumerate(_COLUMNS[1:], start=1):
+                block[row] = bars[name]
+            del block
+
+            # Numba's TBB worker threads do not survive a fork
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(chunks)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_attach,
+                initargs=(shm.name, length),
+            ) as executor:
+                futures = [
+                    executor.submit(_evaluate, chunk, self.quantity)
+                    for chunk in chunks
+                ]
+                return [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+def optimize(
+    token,
+    bars,
+    combinations: list = None,
+    workers: int = None,
+    save: bool = True,
+):
+    """Sweep ``combinations`` (the default grid if None) for ``token``
+    and store the best one with Firestore.add_strategy."""
+    results = Optimizer(workers).run(bars, combinations or grid())
+    if results.empty or results["bars"].max() == 0:
+        return {"status": "error", "message": "No bars to optimize on"}
+    best = {key: int(results.loc[0, key]) for key in FIELDS}
+    logging.info(f"Best strategy for {token}: {best}")
+    if save:
+        response = Firestore.add_strategy(token, best)
+        if response["status"] != "success":
+            return response
+    return {"status": "success", "message": best, "results": results}
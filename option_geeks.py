@@ -3,13 +3,12 @@ import time
 from datetime import datetime, timedelta
 
 import pandas as pd
-from py_vollib.black_scholes.greeks.analytical import *
-from py_vollib.black_scholes.implied_volatility import implied_volatility
 
-from orderclient import get_quote
+from black_scholes import greeks, implied_volatility
+from instruments import InstrumentMaster
+from orderclient import get_ltps, get_quote
 from utils import IST, OptionType, QuoteType, logging_handler
 
-DATASTORE = "kotak_data/tokens.hdf5"
 logging.basicConfig(level=logging.DEBUG, handlers=[logging_handler])
 
 
@@ -23,6 +22,7 @@ class OptionGeeks:
     ):
         self.start = time.perf_counter()
         self._interest_rate = 0.1
+        self._is_call = option_type == OptionType.call
 
         if not underlying_price:
             response = get_quote(token, QuoteType.ltp)
@@ -57,15 +57,13 @@ class OptionGeeks:
         underlying_price: float,
         strike_price: int = None,
     ):
-        token_name = pd.read_hdf(
-            DATASTORE, "cashTokens", mode="r", where=f"index=='{token}'"
-        )["instrumentName"].values[0]
+        master = InstrumentMaster.get()
+        token_name = master.cash_token(token)["instrumentName"]
         if strike_price:  # If strike price is given then find the exact strike
-            strike_token = pd.read_hdf(
-                DATASTORE,
-                "fnoTokens",
-                mode="r",
-                where=f"instrumentName == '{token_name}' & optionType=='{option_type.value}' & strike == {strike_price}",
+            strike_token = master.find_fno(
+                instrumentName=token_name,
+                optionType=option_type.value,
+                strike=strike_price,
             )
         else:  # If strike price is not given then find the strike price within 3% of underlying price
             if option_type == OptionType.call:
@@ -75,12 +73,12 @@ class OptionGeeks:
                 upper_limit = underlying_price * 1
                 lower_limit = underlying_price * 0.97
 
-            strike_token = pd.read_hdf(
-                DATASTORE,
-                "fnoTokens",
-                mode="r",
-                where=f"instrumentName == '{token_name}' & optionType=='{option_type.value}' & strike >= {lower_limit} & strike <= {upper_limit}",
+            strike_token = master.find_fno(
+                strikeRange=(lower_limit, upper_limit),
+                instrumentName=token_name,
+                optionType=option_type.value,
             )
+        strike_token = strike_token.copy()
 
         # First convert the expiry date to datetime object with tzinfo
         strike_token["expiry"] = pd.to_datetime(
@@ -97,14 +95,15 @@ class OptionGeeks:
         return strike_token
 
     def __find_option_price__(self):
-        for token in self.strike_token.index:
-            response = get_quote(token, QuoteType.ltp)
+        prices = get_ltps(self.strike_token.index)
+        for response in prices.values():
             if type(response) == dict:
                 logging.error(response)
                 raise Exception(response)
-            option_price = float(response)
-            # Add the option price to the dataframe
-            self.strike_token.loc[token, "optionPrice"] = option_price
+        # Add the option price to the dataframe
+        self.strike_token["optionPrice"] = [
+            float(prices[token]) for token in self.strike_token.index
+        ]
         return
 
     def __find_expiry__(self):
@@ -116,72 +115,33 @@ class OptionGeeks:
         return
 
     def __find_iv__(self):
-        for token, row in self.strike_token.iterrows():
-            iv = implied_volatility(
-                row["optionPrice"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["optionType"],
-            )
-            self.strike_token.loc[token, "iv"] = iv
-
+        self.strike_token["iv"] = implied_volatility(
+            self.strike_token["optionPrice"].to_numpy(),
+            self.strike_token["underlyingPrice"].to_numpy(),
+            self.strike_token["strike"].to_numpy(),
+            self.strike_token["expiry"].to_numpy(),
+            self._interest_rate,
+            self._is_call,
+        )
         return self.strike_token
 
-    def __find_delta__(self):
-        for token, row in self.strike_token.iterrows():
-            d = delta(
-                row["optionType"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["iv"],
-            )
-            self.strike_token.loc[token, "delta"] = d
+    def __greeks__(self) -> dict:
+        return greeks(
+            self._is_call,
+            self.strike_token["underlyingPrice"].to_numpy(),
+            self.strike_token["strike"].to_numpy(),
+            self.strike_token["expiry"].to_numpy(),
+            self._interest_rate,
+            self.strike_token["iv"].to_numpy(),
+        )
 
+    def __find_delta__(self):
+        self.strike_token["delta"] = self.__greeks__()["delta"]
         return self.strike_token
 
     def find_all(self):
-        for token, row in self.strike_token.iterrows():
-            r = rho(
-                row["optionType"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["iv"],
-            )
-            g = gamma(
-                row["optionType"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["iv"],
-            )
-            t = theta(
-                row["optionType"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["iv"],
-            )
-            v = vega(
-                row["optionType"],
-                row["underlyingPrice"],
-                row["strike"],
-                row["expiry"],
-                self._interest_rate,
-                row["iv"],
-            )
-            self.strike_token.loc[token, "rho"] = r
-            self.strike_token.loc[token, "gamma"] = g
-            self.strike_token.loc[token, "theta"] = t
-            self.strike_token.loc[token, "vega"] = v
-
+        for name, values in self.__greeks__().items():
+            self.strike_token[name] = values
         return self.strike_token
 
 
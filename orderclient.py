@@ -1,7 +1,19 @@
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
 
+from ks_api_client.exceptions import ApiException
+
+from accountstate import account_state
 from kotakclient import KotakClient
+from quotecache import quote_cache
+from records import decode_records, trade_book
 from utils import *
+from utils import _OrderBookParams, _TradeParams
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+_quote_executor = ThreadPoolExecutor(max_workers=16)
 
 
 class OrderClient:
@@ -16,7 +28,9 @@ class OrderClient:
             orders = self._client.order_report()
         except Exception as e:
             return {"status": "error", "message": str(e)}
-        return OrderBookResponse(**orders)
+        return OrderBookResponse(
+            decode_records(_OrderBookParams, orders["success"])
+        )
 
     # Get Trade Report
     def get_trade_report(self):
@@ -24,7 +38,17 @@ class OrderClient:
             trades = self._client.trade_report()
         except Exception as e:
             return {"status": "error", "message": str(e)}
-        return TradeBookResponse(**trades)
+        return TradeBookResponse(
+            decode_records(_TradeParams, trades["success"])
+        )
+
+    # Trade Report as a columnar Book, indexed by orderId and token
+    def get_trade_book(self):
+        try:
+            trades = self._client.trade_report()
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+        return trade_book(trades["success"])
 
     # Place All Types of Orders
     def placeOrder(
@@ -54,6 +78,7 @@ class OrderClient:
 
         except Exception as e:
             return {"status": "error", "message": str(e)}
+        account_state.invalidate()
         response = json.dumps(response, indent=4)
         return response
 
@@ -62,6 +87,7 @@ class OrderClient:
             response = self._client.cancel_order(order_id=order_id)
         except Exception as e:
             return {"status": "error", "message": str(e)}
+        account_state.invalidate()
         return response
 
     # Get Available Funds in Account
@@ -91,13 +117,15 @@ class OrderClient:
             positions = self._client.positions(position_Type.value)  # type: ignore
         except Exception as e:
             return {"status": "error", "message": str(e)}
-        positions = json.dumps(positions, indent=4)
-
-        return positions
+        return Positions(**positions)
 
 
-# Get Quote for given token ID
+# Get Quote for given token ID, from the live feed or quote cache if it can
 def get_quote(instrumentToken: str, quote_type: QuoteType):
+    return quote_cache.get(instrumentToken, quote_type, _fetch_quote)
+
+
+def _fetch_quote(instrumentToken: str, quote_type: QuoteType):
     try:
         quote = KotakClient.get_client.quote(instrumentToken, quote_type.value)["success"]  # type: ignore
     except Exception as e:
@@ -110,5 +138,41 @@ def get_quote(instrumentToken: str, quote_type: QuoteType):
         return QuoteDepthResponse(**quote)
 
 
+# Get LTP for many tokens, in a single quote call where the broker allows it
+def get_ltps(instrumentTokens: list) -> dict:
+    tokens = {str(token): token for token in instrumentTokens}
+    prices = {}
+    for token in tokens.values():
+        hit, price = quote_cache.peek(token)
+        if hit:
+            prices[token] = price
+
+    keys = [key for key, token in tokens.items() if token not in prices]
+    if keys:
+        try:
+            quotes = KotakClient.get_client.quote(",".join(keys), QuoteType.ltp.value)["success"]  # type: ignore
+            fetched = {}
+            for quote in quotes:
+                key = str(quote["instrumentToken"])
+                if key in tokens:
+                    fetched[tokens[key]] = quote["lastPrice"]
+            quote_cache.store(fetched)
+            prices.update(fetched)
+        except (ApiException, OSError, ValueError, KeyError, TypeError) as e:
+            logging.error(
+                f"Bulk quote for {len(keys)} tokens failed, "
+                f"quoting one by one: {e}"
+            )
+
+    # Fall back to concurrent single-token quotes for anything missing
+    missing = [token for token in tokens.values() if token not in prices]
+    responses = _quote_executor.map(
+        lambda token: get_quote(token, QuoteType.ltp), missing
+    )
+    for token, response in zip(missing, responses):
+        prices[token] = response
+    return prices
+
+
 if __name__ == "__main__":
     print("Order Client")
@@ -4,9 +4,13 @@ from collections import defaultdict
 
 import pandas as pd
 
+from accountstate import account_state
+from analytics import ledger
 from demoOrder import OrderClient
 from observer_pattern import IEventListener
 from option_geeks import OptionGeeks
+from orderclient import OrderClient as BrokerClient
+from tracing import tracer
 from utils import (
     OptionType,
     OrderType,
@@ -19,11 +23,22 @@ logging.basicConfig(level=logging.DEBUG, handlers=[logging_handler])
 
 
 class Portfolio(IEventListener):
-    def __init__(self, delta: float, quantity: int = 1):
+    def __init__(
+        self, delta: float = 0.5, quantity: int = 1, order_client=None
+    ):
         logging.info("Initializing Portfolio")
-        self.order_client = OrderClient()
-        self.startfund = self.order_client.get_funds()
+        # Any OrderClient-compatible client, e.g. simulator.SimOrderClient
+        self.order_client = order_client or OrderClient(ledger=ledger)
+        # The broker's account is read through the shared cache; paper
+        # clients keep theirs in memory and are read directly
+        self.account = (
+            account_state
+            if isinstance(self.order_client, BrokerClient)
+            else None
+        )
+        self.startfund = self.funds()
         self.strike_token = defaultdict(int)
+        self.strike_price = defaultdict(float)
         self.optionType = defaultdict(OptionType)
         self.df = defaultdict(pd.DataFrame)
         self.quantity = quantity
@@ -31,9 +46,7 @@ class Portfolio(IEventListener):
 
     def __del__(self):
         logging.info("Deleting Portfolio")
-        open_position = self.order_client.get_position(
-            position_Type=PositionType.open
-        )
+        open_position = self.positions(PositionType.open)
 
         for position in open_position:
             strike_token = position["instrumentToken"]
@@ -43,12 +56,28 @@ class Portfolio(IEventListener):
             idx = values.index(strike_token)
             self.update(keys[idx], TransactionType.sell)
 
-        orderbook = self.order_client.get_order_report()
-        funds = self.order_client.get_funds()
+        orderbook = self.orders()
+        funds = self.funds()
         pnl = funds - self.startfund
         logging.info(f"Open Position : {self.order_client.open_positions}")
         logging.info(f"Orderbook : {orderbook}")
         logging.info(f"PnL : {pnl}")
+        logging.info(f"Ledger : {ledger.summary()}")
+
+    def funds(self):
+        if self.account is not None:
+            return self.account.funds()
+        return self.order_client.get_funds()
+
+    def positions(self, position_type: PositionType):
+        if self.account is not None:
+            return self.account.positions(position_type)
+        return self.order_client.get_position(position_type)
+
+    def orders(self):
+        if self.account is not None:
+            return self.account.orders()
+        return self.order_client.get_order_report()
 
     """UPDATE ABOUT THE UNDERLYING PRICE OF THE ASSET"""
 
@@ -70,18 +99,18 @@ class Portfolio(IEventListener):
 
     """For Selling the Option of the Stock"""
 
-    def update(self, token: str, transactionType: TransactionType):
+    def sell(self, token: str, transactionType=TransactionType.sell):
         if self.strike_token[token] == 0:
             logging.error("No Open Position")
             return "error"
-        # ! There is problem in placeOrder for the sell order. Check and Solve it
-        qty = self.df[token]["lotSize"].values[0] * self.quantity
+        qty = int(self.df[token]["lotSize"].values[0]) * self.quantity
         response = self.order_client.placeOrder(
             orderType=OrderType.mis_order,
             instrumentToken=self.strike_token[token],
             transactionType=transactionType,
             qty=qty,
         )
+        tracer.stamp(token, "order_ack")
         logging.info(json.dumps(response, indent=4))
         if response["status"] == "success":
             self.strike_token.pop(token)
@@ -95,17 +124,29 @@ class Portfolio(IEventListener):
         self,
         token: str,
         transactionType: TransactionType,
-        optionType: OptionType,
+        optionType: OptionType = None,
         strike_price: int = None,
         underlying_price: float = None,
     ):
+        tracer.stamp(token, "portfolio")
+        # Sell signals come without an option type
+        if transactionType == TransactionType.sell:
+            return self.sell(token, transactionType)
         optionGeek = OptionGeeks(
             token, optionType, strike_price, underlying_price
         )
-
-        self.df[token] = optionGeek.strike_token
-        qty = self.df[token]["lotSize"].values[0] * self.quantity
-        # ! Solve the problem of optionPrice
+        tracer.stamp(token, "option_chain")
+
+        # The strike whose delta is closest to the target
+        chain = optionGeek.strike_token
+        deltas = chain["delta"].dropna()
+        if deltas.empty:
+            logging.error(f"No option deltas for {token}, order skipped")
+            return {"status": "error", "message": "No option deltas"}
+        optionToken = int((deltas.abs() - self.delta).abs().idxmin())
+        optionPrice = float(chain.loc[optionToken, "optionPrice"])
+        self.df[token] = chain.loc[[optionToken]]
+        qty = int(self.df[token]["lotSize"].values[0]) * self.quantity
         response = self.order_client.placeOrder(
             orderType=OrderType.mis_order,
             instrumentToken=optionToken,
@@ -113,10 +154,10 @@ class Portfolio(IEventListener):
             qty=qty,
             price=optionPrice,
         )
-        # ! Check if these are required or not
+        tracer.stamp(token, "order_ack")
         if response["status"] == "success":
-            self.strike_token[token] = optionGeek.strike_token
-            self.strike_price[token] = optionGeek.strike_price
+            self.strike_token[token] = optionToken
+            self.strike_price[token] = chain.loc[optionToken, "strike"]
             self.optionType[token] = optionType
         logging.info(json.dumps(response, indent=4))
         return
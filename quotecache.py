@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from utils import QuoteType
+
+
+def _is_error(response) -> bool:
+    return isinstance(response, dict) and response.get("status") == "error"
+
+
+class QuoteCache:
+    """Broker quotes served from memory where possible.
+
+    LTPs of tokens streaming on the live feed come straight from the
+    last tick. Anything else is cached for ``ttl`` seconds, and
+    concurrent requests for the same token and quote type share one
+    broker call. Error responses are returned but never cached.
+    """
+
+    def __init__(self, ttl: float = 1.0, clock=time.monotonic) -> None:
+        self.ttl = ttl
+        self.clock = clock
+        self._live = {}
+        self._cached = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.live_hits = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.broker_calls = 0
+        self.failed = 0
+
+    def on_tick(self, token: int, ltp: float):
+        """Latest traded price of a subscribed token, from the feed."""
+        self._live[token] = ltp
+
+    def live_prices(self) -> dict:
+        """LTP of every token on the live feed."""
+        return dict(self._live)
+
+    def clear_live(self):
+        """Forget streamed prices once the feed is unsubscribed."""
+        self._live.clear()
+
+    def clear(self):
+        with self._lock:
+            self._live.clear()
+            self._cached.clear()
+
+    def _lookup(self, key):
+        if key[1] == QuoteType.ltp:
+            try:
+                ltp = self._live.get(int(key[0]))
+            except (TypeError, ValueError):
+                ltp = None
+            if ltp is not None:
+                self.live_hits += 1
+                return True, ltp
+        cached = self._cached.get(key)
+        if cached is not None and cached[1] > self.clock():
+            self.cache_hits += 1
+            return True, cached[0]
+        return False, None
+
+    def get(self, token, quote_type: QuoteType, fetch):
+        """Quote of ``token``; ``fetch(token, quote_type)`` on a miss."""
+        key = (str(token), quote_type)
+        with self._lock:
+            self.requests += 1
+            hit, response = self._lookup(key)
+            if hit:
+                return response
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.broker_calls += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result()
+
+        try:
+            response = fetch(token, quote_type)
+        except BaseException as e:
+            with self._lock:
+                self.failed += 1
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if _is_error(response):
+                self.failed += 1
+            else:
+                self._cached[key] = (response, self.clock() + self.ttl)
+            del self._inflight[key]
+        future.set_result(response)
+        return response
+
+    def peek(self, token, quote_type: QuoteType = QuoteType.ltp):
+        """Cached quote of ``token`` without calling the broker. Misses
+        are counted when the quote is fetched, by ``get`` or ``store``."""
+        with self._lock:
+            hit, response = self._lookup((str(token), quote_type))
+            self.requests += hit
+            return hit, response
+
+    def store(self, quotes: dict, quote_type: QuoteType = QuoteType.ltp):
+        """Cache ``quotes`` by token, fetched in one broker call."""
+        with self._lock:
+            self.broker_calls += 1
+            self.requests += len(quotes)
+            expires = self.clock() + self.ttl
+            for token, response in quotes.items():
+                self._cached[(str(token), quote_type)] = (response, expires)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            served = self.live_hits + self.cache_hits
+            return {
+                "ttl": self.ttl,
+                "live": len(self._live),
+                "cached": len(self._cached),
+                "requests": self.requests,
+                "live_hits": self.live_hits,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "broker_calls": self.broker_calls,
+                "failed": self.failed,
+                "hit_rate": served / self.requests if self.requests else 0.0,
+                "saved_round_trips": served + self.coalesced,
+            }
+
+
+quote_cache = QuoteCache()
@@ -0,0 +1,142 @@
+import dataclasses
+from functools import lru_cache
+from operator import itemgetter
+
+import numpy as np
+
+from utils import _OrderBookParams, _PositionTodayParams, _TradeParams
+
+_KINDS = {int: np.int64, float: np.float64, str: np.str_}
+_MISSING = {int: 0, float: np.nan, str: ""}
+
+
+@lru_cache(maxsize=None)
+def _layout(record_type) -> tuple:
+    fields = dataclasses.fields(record_type)
+    names = tuple(field.name for field in fields)
+    types = tuple(
+        field.type if field.type in _KINDS else str for field in fields
+    )
+    defaults = tuple(
+        None if field.default is dataclasses.MISSING else field.default
+        for field in fields
+    )
+    return names, types, defaults, itemgetter(*names)
+
+
+def _values(record_type, rows: list, missing: dict = None) -> list:
+    """Field values of every row as tuples, in the record's field order.
+
+    Rows normally carry every field and go through one itemgetter call.
+    Fields a row lacks take the record's default, else ``missing`` for
+    their type, else None.
+    """
+    names, types, defaults, getter = _layout(record_type)
+    try:
+        return [getter(row) for row in rows]
+    except KeyError:
+        defaults = [
+            (missing or {}).get(kind) if default is None else default
+            for kind, default in zip(types, defaults)
+        ]
+        return [
+            tuple(
+                row.get(name, default)
+                for name, default in zip(names, defaults)
+            )
+            for row in rows
+        ]
+
+
+def decode_records(record_type, rows: list) -> list:
+    """Broker JSON rows as slotted ``record_type`` instances.
+
+    Keys the record does not declare are dropped; missing ones take
+    the field's default, or None.
+    """
+    return [record_type(*values) for values in _values(record_type, rows)]
+
+
+class Book:
+    """Broker book (orders, trades or positions) as a structured array.
+
+    Numbers are parsed once into int64/float64 columns and text into
+    fixed-width unicode, so a book costs a few hundred bytes per row
+    and scans are vectorized. Rows are indexed by orderId and
+    instrumentToken with stable argsorts, as InstrumentTable does.
+    """
+
+    INDEXES = ("orderId", "instrumentToken")
+
+    def __init__(self, record_type, array: np.ndarray) -> None:
+        self.record_type = record_type
+        self.array = array
+        self._indexes = {}
+        for name in self.INDEXES:
+            if name in array.dtype.names:
+                order = np.argsort(array[name], kind="stable")
+                self._indexes[name] = (order, array[name][order])
+
+    @classmethod
+    def from_rows(cls, record_type, rows: list):
+        names, types, _, _ = _layout(record_type)
+        values = _values(record_type, rows, _MISSING)
+        columns = zip(*values) if values else [()] * len(names)
+        arrays = [
+            np.array(column, dtype=_KINDS[kind])
+            for column, kind in zip(columns, types)
+        ]
+        array = np.empty(
+            len(values),
+            dtype=[(name, a.dtype) for name, a in zip(names, arrays)],
+        )
+        for name, column in zip(names, arrays):
+            array[name] = column
+        return cls(record_type, array)
+
+    def __len__(self) -> int:
+        return self.array.shape[0]
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.array[column]
+
+    def positions(self, **keys) -> np.ndarray:
+        """Row positions whose indexed columns equal ``keys``, in book
+        order, e.g. ``positions(orderId=42)``."""
+        positions = None
+        for name, value in keys.items():
+            order, values = self._indexes[name]
+            lo = np.searchsorted(values, value, side="left")
+            hi = np.searchsorted(values, value, side="right")
+            found = np.sort(order[lo:hi])
+            positions = (
+                found
+                if positions is None
+                else np.intersect1d(positions, found)
+            )
+        if positions is None:
+            return np.arange(len(self))
+        return positions
+
+    def by_order(self, order_id) -> np.ndarray:
+        return self.array[self.positions(orderId=int(order_id))]
+
+    def by_token(self, token) -> np.ndarray:
+        return self.array[self.positions(instrumentToken=int(token))]
+
+    def records(self, positions=None) -> list:
+        """Rows as ``record_type`` instances."""
+        rows = self.array if positions is None else self.array[positions]
+        return [self.record_type(*row.tolist()) for row in rows]
+
+
+def order_book(rows: list) -> Book:
+    return Book.from_rows(_OrderBookParams, rows)
+
+
+def trade_book(rows: list) -> Book:
+    return Book.from_rows(_TradeParams, rows)
+
+
+def position_book(rows: list) -> Book:
+    return Book.from_rows(_PositionTodayParams, rows)
@@ -0,0 +1,193 @@
+import datetime
+import json
+import time
+
+import numpy as np
+
+from bar_builder import NS_PER_SECOND, parse_tick_time
+
+# Positions LiveFeed.callback_method reads from a feed message
+TOKEN, LTP, VOLUME, OI, TIME = 1, 6, 15, 16, 19
+MESSAGE_LENGTH = 20
+TIME_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+
+def make_message(token, ltp, volume, oi, time_str: str) -> list:
+    message = [""] * MESSAGE_LENGTH
+    message[TOKEN] = str(token)
+    message[LTP] = f"{ltp:.2f}"
+    message[VOLUME] = str(volume)
+    message[OI] = str(oi)
+    message[TIME] = time_str
+    return message
+
+
+def synthetic_messages(
+    tokens,
+    minutes: int,
+    ticks_per_minute: int = 60,
+    start: datetime.datetime = datetime.datetime(2023, 10, 16, 9, 15),
+    seed: int = 0,
+) -> list:
+    """Feed messages for ``tokens`` as a random walk, in time order.
+
+    The same arguments always give the same messages.
+    """
+    rng = np.random.default_rng(seed)
+    tokens = list(tokens)
+    n = minutes * ticks_per_minute
+    seconds = np.sort(rng.integers(0, minutes * 60, n))
+    ltp = 100 + np.cumsum(rng.normal(0, 0.05, (n, len(tokens))), axis=0)
+    volume = np.cumsum(rng.integers(1, 50, (n, len(tokens))), axis=0)
+    oi = rng.integers(1000, 2000, len(tokens))
+    times = [
+        (start + datetime.timedelta(seconds=int(s))).strftime(TIME_FORMAT)
+        for s in seconds
+    ]
+
+    messages = []
+    for i in range(n):
+        for j, token in enumerate(tokens):
+            messages.append(
+                make_message(token, ltp[i, j], volume[i, j], oi[j], times[i])
+            )
+    return messages
+
+
+def write_messages(path: str, messages):
+    with open(path, "w") as f:
+        for message in messages:
+            f.write(json.dumps(message) + "\n")
+
+
+def read_messages(path: str) -> list:
+    """Messages recorded one JSON list per line."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class StubBroker:
+    """Offline stand-in for the ks_api client behind KotakClient.
+
+    ``subscribe`` keeps the callbacks instead of opening the websocket and
+    ``quote`` answers from the last replayed LTP of each token.
+    """
+
+    def __init__(self) -> None:
+        self.callback = None
+        self.disconnect_event = None
+        self.connect_event = None
+        self.error_event = None
+        self.tokens = []
+        self.ltp = {}
+        self.quotes = 0
+
+    def install(self):
+        from kotakclient import KotakClient
+
+        KotakClient._KotakClient__client = self
+        return self
+
+    def subscribe(
+        self,
+        input_tokens,
+        callback,
+        broadcast_host=None,
+        disconnect_event=None,
+        connect_event=None,
+        error_event=None,
+    ):
+        self.tokens = [int(token) for token in str(input_tokens).split(",")]
+        self.callback = callback
+        self.disconnect_event = disconnect_event
+        self.connect_event = connect_event
+        self.error_event = error_event
+
+    def unsubscribe(self):
+        self.callback = None
+
+    def quote(self, instrument_token, quote_type=None):
+        self.quotes += 1
+        return {
+            "success": [
+                {
+                    "instrumentToken": token,
+                    "lastPrice": str(self.ltp.get(int(token), 0.0)),
+                }
+                for token in str(instrument_token).split(",")
+            ]
+        }
+
+
+class TickReplay:
+    """Feeds messages to a subscribed StubBroker's callback.
+
+    ``speed`` is a multiple of market time (10 plays ten times faster
+    than recorded); None plays as fast as possible. Every
+    ``flush_every`` market seconds the broker's disconnect and connect
+    events fire, as the live websocket does when it reconnects, which is
+    when LiveFeed hands bars to its observers. ``clock`` returns the
+    current market time so bars close on replayed time, not wall time.
+    """
+
+    def __init__(
+        self,
+        messages,
+        broker: StubBroker,
+        speed: float = None,
+        flush_every: float = 1.0,
+    ) -> None:
+        self.messages = messages
+        self.broker = broker
+        self.speed = speed
+        self.flush_every = int(flush_every * NS_PER_SECOND)
+        self.now = 0
+        self.ticks = 0
+        self.flushes = 0
+
+    def clock(self) -> int:
+        return self.now
+
+    def _flush(self):
+        self.flushes += 1
+        if self.broker.disconnect_event is not None:
+            self.broker.disconnect_event()
+        if self.broker.connect_event is not None:
+            self.broker.connect_event()
+
+    def run(self) -> dict:
+        callback = self.broker.callback
+        ltp = self.broker.ltp
+        first = None
+        next_flush = None
+        start = time.perf_counter()
+        for message in self.messages:
+            timestamp = parse_tick_time(message[TIME])
+            if first is None:
+                first = timestamp
+                next_flush = timestamp + self.flush_every
+            while timestamp >= next_flush:
+                self.now = next_flush
+                self._flush()
+                next_flush += self.flush_every
+            if self.speed:
+                due = start + (timestamp - first) / NS_PER_SECOND / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            self.now = timestamp
+            ltp[int(message[TOKEN])] = float(message[LTP])
+            callback(message)
+            self.ticks += 1
+
+        # End of the session: close every bar that is still open
+        self.now = (self.now or 0) + 86400 * NS_PER_SECOND
+        self._flush()
+        elapsed = time.perf_counter() - start
+        return {
+            "ticks": self.ticks,
+            "flushes": self.flushes,
+            "seconds": elapsed,
+            "ticks_per_second": self.ticks / elapsed if elapsed else 0.0,
+        }
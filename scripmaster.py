@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+TOKENSTORE = "kotak_data/tokens.npz"
+CHUNKSIZE = 50_000
+
+# Exchanges kept from each scrip file
+EXCHANGES = {"cash": ("NSE", "BSE"), "fno": ("NSE",)}
+DROP = {
+    "cash": {"expiry", "OptionType", "optionType", "strike"},
+    "fno": {"isin"},
+}
+CATEGORIES = [
+    "instrumentName",
+    "name",
+    "exchange",
+    "segment",
+    "instrumentType",
+    "optionType",
+    "isin",
+]
+DTYPES = {
+    "instrumentToken": "int64",
+    "exchangeToken": "int64",
+    "lastPrice": "float32",
+    "tickSize": "float32",
+    "strike": "float32",
+    "lotSize": "int32",
+    "multiplier": "int32",
+    **{column: "category" for column in CATEGORIES + ["expiry"]},
+}
+INDEX_NAMES = {"NIFTY BANK": "BANKNIFTY", "NIFTY 50": "NIFTY"}
+
+
+def read_scrip(
+    source, kind: str, exchanges=None, chunksize: int = CHUNKSIZE
+) -> pd.DataFrame:
+    """Read a pipe-delimited scrip file in chunks with compact dtypes.
+
+    Only rows on ``exchanges`` are kept. Text columns become categoricals
+    and expiry is parsed to dates, so the result is a few bytes per field.
+    """
+    exchanges = EXCHANGES[kind] if exchanges is None else exchanges
+    drop = DROP[kind]
+    chunks = []
+    for chunk in pd.read_csv(
+        source,
+        sep="|",
+        usecols=lambda column: column not in drop,
+        dtype=DTYPES,
+        chunksize=chunksize,
+    ):
+        if "exchange" in chunk and exchanges:
+            chunk = chunk[chunk["exchange"].isin(exchanges)]
+        chunks.append(chunk)
+
+    # Chunks carry their own categories; unify them before concatenating
+    for column in chunks[0].columns:
+        if isinstance(chunks[0][column].dtype, pd.CategoricalDtype):
+            categories = pd.Index(
+                np.unique(
+                    np.concatenate(
+                        [
+                            chunk[column].cat.categories.to_numpy(dtype=str)
+                            for chunk in chunks
+                        ]
+                    )
+                )
+            )
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    df = pd.concat(chunks).set_index("instrumentToken")
+
+    if "expiry" in df:
+        # Few distinct expiries: parse the categories, then take by code
+        expiry = df["expiry"].cat
+        dates = pd.to_datetime(
+            expiry.categories, format="%d%b%y", errors="coerce"
+        )
+        df["expiry"] = dates.take(expiry.codes, allow_fill=True)
+    if kind == "cash":
+        df["instrumentName"] = df["instrumentName"].cat.rename_categories(
+            lambda name: INDEX_NAMES.get(name, name)
+        )
+    return df
+
+
+def save_snapshot(path: str, **tables: pd.DataFrame):
+    """Write tables as one uncompressed .npz of plain column arrays.
+
+    Categoricals are stored as codes plus categories. The file is written
+    next to ``path`` and renamed over it, so readers never see a partial
+    snapshot.
+    """
+    arrays = {}
+    for name, df in tables.items():
+        arrays[f"{name}/index"] = df.index.to_numpy()
+        for column in df.columns:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                arrays[f"{name}/{column}.codes"] = values.cat.codes.to_numpy()
+                arrays[f"{name}/{column}.categories"] = (
+                    values.cat.categories.to_numpy(dtype=str)
+                )
+            elif pd.api.types.is_string_dtype(values.dtype):
+                arrays[f"{name}/{column}"] = values.to_numpy(dtype=str)
+            else:
+                arrays[f"{name}/{column}"] = values.to_numpy()
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str) -> dict:
+    """Tables written by save_snapshot as ``{name: DataFrame}``."""
+    columns = {}
+    with np.load(path, allow_pickle=False) as data:
+        for key in data.files:
+            name, column = key.split("/", 1)
+            columns.setdefault(name, {})[column] = data[key]
+
+    tables = {}
+    for name, values in columns.items():
+        index = pd.Index(values.pop("index"), name="instrumentToken")
+        frame = {}
+        for column, array in values.items():
+            if column.endswith(".categories"):
+                continue
+            if column.endswith(".codes"):
+                column = column[: -len(".codes")]
+                array = pd.Categorical.from_codes(
+                    array, values[f"{column}.categories"]
+                )
+            frame[column] = array
+        tables[name] = pd.DataFrame(frame, index=index)
+    return tables
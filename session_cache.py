@@ -0,0 +1,75 @@
+import base64
+import datetime
+import hashlib
+import json
+import os
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from utils import IST
+
+
+def derive_key(secret: str, salt: str = "wealth-sync") -> bytes:
+    """Fernet key derived from a secret that is already in config.env."""
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", secret.encode(), salt.encode(), 200_000
+    )
+    return base64.urlsafe_b64encode(digest)
+
+
+def end_of_day(now: datetime.datetime = None) -> datetime.datetime:
+    """Broker sessions do not outlive the IST trading day."""
+    now = now or datetime.datetime.now(tz=IST)
+    today = now.astimezone(IST).date()
+    return IST.localize(
+        datetime.datetime.combine(
+            today + datetime.timedelta(days=1), datetime.time()
+        )
+    )
+
+
+class SessionCache:
+    """Encrypted on-disk copy of the broker session token.
+
+    The token is saved after a successful 2FA login and expires at the
+    end of the IST day, so restarts within the trading day skip the
+    login and access code email. The file is written atomically and is
+    only readable by the owner.
+    """
+
+    def __init__(self, key: bytes, path: str = "kotak_data/session.bin"):
+        self.path = path
+        self._fernet = Fernet(key)
+
+    def load(self, userid: str, now: datetime.datetime = None):
+        """Cached session token of ``userid``, None if missing or stale."""
+        try:
+            with open(self.path, "rb") as file:
+                payload = json.loads(self._fernet.decrypt(file.read()))
+        except (OSError, InvalidToken, ValueError):
+            return None
+        now = now or datetime.datetime.now(tz=IST)
+        if payload.get("userid") != userid:
+            return None
+        if now.timestamp() >= payload.get("expires", 0):
+            return None
+        return payload.get("session_token")
+
+    def save(self, userid: str, session_token: str, now=None) -> None:
+        payload = {
+            "userid": userid,
+            "session_token": session_token,
+            "expires": end_of_day(now).timestamp(),
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp = self.path + ".tmp"
+        fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as file:
+            file.write(self._fernet.encrypt(json.dumps(payload).encode()))
+        os.replace(temp, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,391 @@
+import logging
+import multiprocessing
+import threading
+import time
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bar_builder import NS_PER_MINUTE, BarBuilder, now_ns
+from observer_pattern import IEventListener, IEventManager
+from utils import logging_handler
+
+logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
+
+RING_DTYPE = np.dtype(
+    [
+        ("token", "i8"),
+        ("datetime", "i8"),
+        ("ltp", "f8"),
+        ("volume", "i8"),
+        ("OI", "i8"),
+    ]
+)
+# int64 counters ahead of the records: the producer's and the
+# consumer's sit on separate cache lines
+_HEAD, _CAPACITY = 0, 1
+_TAIL, _BARS, _SIGNALS = 8, 9, 10
+_HEADER = 16 * 8
+POLL_INTERVAL = 0.0005
+
+
+def partition(tokens, workers: int) -> list:
+    """Split ``tokens`` into ``workers`` shards of near equal size."""
+    tokens = list(tokens)
+    return [tokens[shard::workers] for shard in range(workers)]
+
+
+class TickRing:
+    """Single-producer, single-consumer ring of ticks in shared memory.
+
+    The producer writes a record and then publishes it by moving the
+    head; the consumer copies everything up to the head out and moves
+    the tail. Neither side takes a lock. A full ring refuses the tick.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+        self._counters = np.ndarray((_HEADER // 8,), np.int64, shm.buf)
+        capacity = int(self._counters[_CAPACITY])
+        self._data = np.ndarray(
+            (capacity,), RING_DTYPE, shm.buf, offset=_HEADER
+        )
+        self._mask = capacity - 1
+        self._head = int(self._counters[_HEAD])
+        self._tail = int(self._counters[_TAIL])
+        self._limit = self._tail + capacity
+
+    @classmethod
+    def create(cls, capacity: int = 1 << 16):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        shm = shared_memory.SharedMemory(
+            create=True, size=_HEADER + capacity * RING_DTYPE.itemsize
+        )
+        counters = np.ndarray((_HEADER // 8,), np.int64, shm.buf)
+        counters[:] = 0
+        counters[_CAPACITY] = capacity
+        del counters
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def __len__(self) -> int:
+        return int(self._counters[_HEAD] - self._counters[_TAIL])
+
+    def counter(self, index: int) -> int:
+        return int(self._counters[index])
+
+    def add(self, index: int, value: int = 1):
+        """Bump a consumer-side counter (_BARS or _SIGNALS)."""
+        self._counters[index] += value
+
+    def put(self, token: int, timestamp: int, ltp: float, volume, oi) -> bool:
+        head = self._head
+        if head >= self._limit:
+            self._limit = int(self._counters[_TAIL]) + self._mask + 1
+            if head >= self._limit:
+                return False
+        self._data[head & self._mask] = (token, timestamp, ltp, volume, oi)
+        self._head = head + 1
+        self._counters[_HEAD] = self._head
+        return True
+
+    def consume(self) -> np.ndarray:
+        """Copy of the unread ticks in arrival order, marked as read."""
+        head = int(self._counters[_HEAD])
+        tail = self._tail
+        if head == tail:
+            return self._data[:0]
+        start = tail & self._mask
+        end = head & self._mask
+        if start < end:
+            ticks = self._data[start:end].copy()
+        else:
+            ticks = np.concatenate((self._data[start:], self._data[:end]))
+        self._tail = head
+        self._counters[_TAIL] = head
+        return ticks
+
+    def close(self):
+        # Views into the buffer must go before it can be unmapped
+        del self._counters, self._data
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SignalRelay(IEventListener):
+    """Observer of a shard's Indicator that sends its signals to the
+    order-routing process."""
+
+    def __init__(self, signals, ring: TickRing) -> None:
+        self.signals = signals
+        self.ring = ring
+
+    def update(self, token, transactionType, optionType=None):
+        self.ring.add(_SIGNALS)
+        self.signals.put((token, transactionType, optionType))
+        return "success"
+
+
+def indicator_shard(tokens: list, batch: bool = False):
+    """Default shard factory: an Indicator for ``tokens`` only."""
+    from indicators import Indicator
+
+    return Indicator(batch=batch, tokens=tokens)
+
+
+def _run_shard(
+    name, tokens, factory, batch, clock, interval, signals, ready, stop
+):
+    """Worker process: ticks from the ring -> bars -> indicator."""
+    ring = TickRing.attach(name)
+    try:
+        indicator = factory(tokens)
+        indicator.attachObserver(SignalRelay(signals, ring))
+        builder = BarBuilder(indicator.timeframe)
+    except Exception as e:
+        logging.exception(f"Shard of {len(tokens)} tokens failed: {e}")
+        ring.close()
+        return
+    ready.set()
+
+    # Bars close when a later minute's tick arrives, on ``clock`` every
+    # ``interval`` seconds (as thread mode does on LiveFeed.clock), and
+    # all of them once the feed stops
+    minute = 0
+    next_close = time.monotonic() + interval
+    while True:
+        ticks = ring.consume()
+        if ticks.shape[0]:
+            for token, timestamp, ltp, volume, oi in ticks.tolist():
+                builder.update(token, timestamp, ltp, volume, oi)
+            latest = int(ticks["datetime"].max())
+            if latest // NS_PER_MINUTE > minute:
+                minute = latest // NS_PER_MINUTE
+                builder.close_until(latest)
+        elif stop.is_set() and not len(ring):
+            builder.close_until(2**62)
+            _evaluate(indicator, builder, batch, ring)
+            break
+        else:
+            time.sleep(POLL_INTERVAL)
+        if clock is not None and time.monotonic() >= next_close:
+            next_close = time.monotonic() + interval
+            builder.close_until(clock())
+        _evaluate(indicator, builder, batch, ring)
+    ring.close()
+
+
+def _evaluate(indicator, builder: BarBuilder, batch: bool, ring: TickRing):
+    if not builder.has_closed:
+        return
+    drained = builder.drain()
+    ring.add(
+        _BARS,
+        sum(len(frame) for by in drained.values() for frame in by.values()),
+    )
+    if batch:
+        try:
+            indicator.update_batch(drained)
+        except Exception as e:
+            logging.exception(f"Shard evaluation failed: {e}")
+        return
+    for token, bars in drained.items():
+        try:
+            indicator.update_bars(token, bars)
+        except Exception as e:
+            logging.exception(f"Shard evaluation of {token} failed: {e}")
+
+
+class ShardedFeed(IEventManager):
+    """Bar building and indicator evaluation spread over processes.
+
+    Each spawned worker process owns a shard of the watchlist
+    with its own BarBuilder and Indicator (built by ``factory``). The
+    feed callback only routes every tick to its shard's TickRing, and
+    the signals the shards raise come back over a queue to this
+    process, where observers (the Portfolio) place the orders. A full
+    ring drops the tick and counts it, unless ``block`` is set.
+
+    ``clock`` (a picklable function, None for market time only) closes
+    bars every ``flush_interval`` seconds when no later tick does.
+    """
+
+    def __init__(
+        self,
+        batch: bool = False,
+        factory=None,
+        capacity: int = 1 << 16,
+        block: bool = False,
+        dispatcher=None,
+        clock=now_ns,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.batch = batch
+        self.factory = factory or partial(indicator_shard, batch=batch)
+        self.capacity = capacity
+        self.block = block
+        self.dispatcher = dispatcher
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.shards = []
+        self.dropped = 0
+        self._observers = set()
+        self._rings = []
+        self._route = {}
+        self._processes = []
+        self._ready = []
+        self._collector = None
+        # Numba's TBB worker threads do not survive a fork
+        self._context = multiprocessing.get_context("spawn")
+        self._signals = None
+        self._stop = None
+        self._last = None
+
+    def start(self, shards: list):
+        """Spawn one worker per token list in ``shards``, see
+        ``partition``. Ticks can be routed right away; the rings hold
+        them while the workers load their indicators."""
+        self.shards = [list(tokens) for tokens in shards]
+        self._signals = self._context.Queue()
+        self._stop = self._context.Event()
+        for shard, tokens in enumerate(self.shards):
+            ring = TickRing.create(self.capacity)
+            ready = self._context.Event()
+            process = self._context.Process(
+                target=_run_shard,
+                args=(
+                    ring.name,
+                    tokens,
+                    self.factory,
+                    self.batch,
+                    self.clock,
+                    self.flush_interval,
+                    self._signals,
+                    ready,
+                    self._stop,
+                ),
+                name=f"shard-{shard}",
+                daemon=True,
+            )
+            process.start()
+            self._rings.append(ring)
+            self._ready.append(ready)
+            self._processes.append(process)
+            self._route.update((int(token), shard) for token in tokens)
+        self._collector = threading.Thread(
+            target=self._collect, name="shard-signals", daemon=True
+        )
+        self._collector.start()
+        return self
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Whether every worker built its indicator within ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for ready, process in zip(self._ready, self._processes):
+            while not ready.wait(0.1):
+                if not process.is_alive():
+                    return False
+                if deadline is not None and time.monotonic() > deadline:
+                    return False
+        return True
+
+    def on_tick(self, token: int, timestamp: int, ltp: float, volume, oi):
+        shard = self._route.get(token)
+        if shard is None:
+            shard = token % len(self._rings)
+        ring = self._rings[shard]
+        if ring.put(token, timestamp, ltp, volume, oi):
+            return
+        if not self.block:
+            self.dropped += 1
+            return
+        while not ring.put(token, timestamp, ltp, volume, oi):
+            time.sleep(POLL_INTERVAL)
+
+    def _collect(self):
+        while True:
+            signal = self._signals.get()
+            if signal is None:
+                return
+            try:
+                self.notifyObserver(*signal)
+            except Exception as e:
+                logging.exception(f"Signal {signal} failed: {e}")
+
+    def attachObserver(self, observer: IEventListener):
+        self._observers.add(observer)
+        return super().attachObserver(observer)
+
+    def detachObserver(self, observer: IEventListener):
+        if observer in self._observers:
+            self._observers.remove(observer)
+        return super().detachObserver(observer)
+
+    def notifyObserver(self, token, transactionType, optionType=None):
+        for observer in self._observers:
+            if self.dispatcher is not None:
+                self.dispatcher.submit(
+                    token, observer.update, token, transactionType, optionType
+                )
+            else:
+                observer.update(token, transactionType, optionType)
+        return "success"
+
+    def close(self, timeout: float = None):
+        """Let the workers finish the ticks already routed, then stop."""
+        if self._stop is None:
+            return
+        self._stop.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logging.warning(f"{process.name} did not stop, terminating")
+                process.terminate()
+                process.join()
+        self._signals.put(None)
+        self._collector.join(timeout)
+        self._last = self.metrics()
+        for ring in self._rings:
+            ring.close()
+        self._signals.close()
+        self._rings, self._processes, self._ready = [], [], []
+        self._stop = None
+
+    def metrics(self) -> dict:
+        if not self._rings:
+            # Counters of the last run once the rings are gone
+            return self._last or {"workers": 0, "dropped": 0, "shards": []}
+        shards = [
+            {
+                "tokens": len(tokens),
+                "alive": process.is_alive(),
+                "ticks": ring.counter(_HEAD),
+                "processed": ring.counter(_TAIL),
+                "backlog": len(ring),
+                "bars": ring.counter(_BARS),
+                "signals": ring.counter(_SIGNALS),
+            }
+            for tokens, ring, process in zip(
+                self.shards, self._rings, self._processes
+            )
+        ]
+        return {
+            "workers": len(shards),
+            "dropped": self.dropped,
+            "shards": shards,
+        }
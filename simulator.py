@@ -0,0 +1,488 @@
+import heapq
+import itertools
+import math
+
+from analytics import Position, charge_rates
+from bar_builder import NS_PER_SECOND, parse_tick_time
+from demoOrder import OrderClient
+from replay import LTP, TIME, TOKEN, VOLUME
+from utils import OrderType, OrderValidity, PositionType, TransactionType
+
+NS_PER_DAY = 86_400 * NS_PER_SECOND
+BUY, SELL = 1, -1
+
+# Order states in get_order_report
+OPEN = "OPEN"
+TRIGGER_PENDING = "TRIGGER_PENDING"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+CANCELLED = "CANCELLED"
+REJECTED = "REJECTED"
+_DONE = (FILLED, CANCELLED, REJECTED)
+
+
+class SimOrder:
+    __slots__ = (
+        "orderId",
+        "token",
+        "side",
+        "quantity",
+        "filled",
+        "value",
+        "price",
+        "trigger",
+        "limit",
+        "ioc",
+        "status",
+        "tag",
+        "product",
+        "placed",
+    )
+
+    def __init__(
+        self, orderId, token, side, quantity, price, trigger, ioc, tag
+    ) -> None:
+        self.orderId = orderId
+        self.token = token
+        self.side = side
+        self.quantity = quantity
+        self.filled = 0
+        self.value = 0.0
+        self.price = price
+        self.trigger = trigger
+        # Market orders cross any price
+        self.limit = price if price else math.inf * side
+        self.ioc = ioc
+        self.status = OPEN
+        self.tag = tag
+        self.product = ""
+        self.placed = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.quantity - self.filled
+
+    @property
+    def average(self) -> float:
+        return self.value / self.filled if self.filled else 0.0
+
+    def report(self) -> dict:
+        return {
+            "orderId": self.orderId,
+            "instrumentToken": self.token,
+            "transactionType": "BUY" if self.side == BUY else "SELL",
+            "orderQuantity": self.quantity,
+            "filledQuantity": self.filled,
+            "pendingQuantity": self.remaining,
+            "price": self.price,
+            "triggerPrice": self.trigger,
+            "averagePrice": self.average,
+            "validity": "IOC" if self.ioc else "GFD",
+            "status": self.status,
+            "product": self.product,
+            "tag": self.tag,
+            "orderTimestamp": self.placed,
+        }
+
+
+class _Book:
+    """Quoted depth of one instrument and the orders resting on it.
+
+    ``bids``/``asks`` are [price, quantity] levels, best first, taken
+    liquidity is subtracted until the next tick requotes them.
+    """
+
+    __slots__ = ("ltp", "bids", "asks", "buys", "sells", "stops")
+
+    def __init__(self) -> None:
+        self.ltp = 0.0
+        self.bids = []
+        self.asks = []
+        # heaps of (key, seq, order): best limit first, earliest first
+        self.buys = []
+        self.sells = []
+        self.stops = {BUY: [], SELL: []}
+
+
+def fixed_slippage(bps: float = 0.0):
+    """Slippage model moving every market fill ``bps`` against it."""
+    rate = bps * 1e-4
+
+    def slippage(order: SimOrder, price: float) -> float:
+        return price * (1 + order.side * rate)
+
+    return slippage
+
+
+class MatchingEngine:
+    """Paper exchange that matches orders against replayed market data.
+
+    Each tick requotes an instrument's book around its LTP, using the
+    offsets and sizes of the last depth snapshot (``on_depth``) or a
+    ``levels`` deep ladder of ``depth_quantity`` lots a ``tick_size``
+    apart. Orders take liquidity level by level, so large orders fill
+    partially and walk the book; what is left rests (GFD) until a later
+    tick crosses it or the day ends, or is cancelled (IOC). Trigger
+    orders wait until the LTP reaches ``trigger``, then become market
+    (price 0) or limit orders.
+
+    Orders reach the book ``latency`` ns of market time after they are
+    placed (an int or a function of the order), and ``slippage`` moves
+    market fills. Fills net into one position per instrument and move
+    ``funds`` by the traded value and OrderClient's charges.
+    """
+
+    def __init__(
+        self,
+        funds: float = 100000,
+        latency=0,
+        slippage=None,
+        tick_size: float = 0.05,
+        levels: int = 5,
+        depth_quantity: int = 1000,
+        ledger=None,
+    ) -> None:
+        self.funds = funds
+        self.latency = latency
+        self.slippage = slippage
+        self.ledger = ledger
+        self.now = 0
+        self.orders = {}
+        self.positions = {}
+        self.fills = 0
+        self._books = {}
+        self._profiles = {}
+        self._default_profile = (
+            [(-(i + 1) * tick_size, depth_quantity) for i in range(levels)],
+            [((i + 1) * tick_size, depth_quantity) for i in range(levels)],
+        )
+        self._pending = []
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._day = None
+        self._types = {
+            BUY: TransactionType.buy,
+            SELL: TransactionType.sell,
+        }
+        self._rates = {
+            side: charge_rates(kind) for side, kind in self._types.items()
+        }
+        self._rate = {side: sum(rates) for side, rates in self._rates.items()}
+
+    def _book(self, token: int) -> _Book:
+        book = self._books.get(token)
+        if book is None:
+            book = self._books[token] = _Book()
+        return book
+
+    # Market data
+
+    def on_tick(self, token, timestamp: int, ltp: float, *_):
+        """Requote ``token`` at ``ltp``; same arguments as a feed tick."""
+        day = timestamp // NS_PER_DAY
+        if day != self._day:
+            if self._day is not None:
+                self.end_of_day()
+            self._day = day
+        if self._pending:
+            self.advance(timestamp)
+        elif timestamp > self.now:
+            self.now = timestamp
+        book = self._books.get(token) or self._book(int(token))
+        book.ltp = ltp
+        bids, asks = self._profiles.get(token, self._default_profile)
+        book.bids = [[ltp + offset, size] for offset, size in bids]
+        book.asks = [[ltp + offset, size] for offset, size in asks]
+        self._match_resting(book)
+        self._trigger(book)
+
+    def on_depth(self, token, depth):
+        """Use a quote depth snapshot (QuoteDepthResponse or its JSON) as
+        the shape of ``token``'s book from now on."""
+        depth = depth["depth"] if isinstance(depth, dict) else depth.depth
+        sides = _as_dict(depth[0])
+        buy, sell = (
+            [
+                (float(level["price"]), int(level["quantity"]))
+                for level in map(_as_dict, sides[name])
+            ]
+            for name in ("buy", "sell")
+        )
+        if not buy or not sell:
+            return
+        mid = (buy[0][0] + sell[0][0]) / 2
+        self._profiles[int(token)] = (
+            [(price - mid, size) for price, size in buy],
+            [(price - mid, size) for price, size in sell],
+        )
+
+    def feed(self, messages):
+        """Replay live feed messages, as replay.TickReplay produces."""
+        for message in messages:
+            self.on_tick(
+                int(message[TOKEN]),
+                parse_tick_time(message[TIME]),
+                float(message[LTP]),
+                int(message[VOLUME]),
+            )
+
+    def advance(self, timestamp: int):
+        """Deliver orders whose latency has elapsed by ``timestamp``."""
+        self.now = max(self.now, timestamp)
+        pending = self._pending
+        while pending and pending[0][0] <= timestamp:
+            self._arrive(heapq.heappop(pending)[2])
+
+    def end_of_day(self):
+        """Cancel every order still working (GFD expiry)."""
+        for book in self._books.values():
+            for heap in (book.buys, book.sells, *book.stops.values()):
+                for *_, order in heap:
+                    if order.status not in _DONE:
+                        order.status = CANCELLED
+                heap.clear()
+        for *_, order in self._pending:
+            order.status = CANCELLED
+        self._pending.clear()
+
+    # Orders
+
+    def submit(
+        self,
+        token,
+        side: int,
+        quantity: int,
+        price: float = 0,
+        trigger: float = 0,
+        ioc: bool = False,
+        tag: str = "",
+    ) -> SimOrder:
+        """Place an order; it fills now if latency is zero."""
+        order = SimOrder(
+            next(self._ids),
+            int(token),
+            side,
+            quantity,
+            price,
+            trigger,
+            ioc,
+            tag,
+        )
+        order.placed = self.now
+        self.orders[order.orderId] = order
+        if side == BUY:
+            estimate = price or trigger or self._book(order.token).ltp
+            if quantity * estimate > self.funds:
+                order.status = REJECTED
+                return order
+        latency = self.latency
+        if callable(latency):
+            latency = latency(order)
+        if latency:
+            heapq.heappush(
+                self._pending, (self.now + latency, next(self._seq), order)
+            )
+        else:
+            self._arrive(order)
+        return order
+
+    def cancel(self, orderId) -> bool:
+        order = self.orders.get(int(orderId))
+        if order is None or order.status in _DONE:
+            return False
+        # Dropped from its heap lazily
+        order.status = CANCELLED
+        return True
+
+    def _arrive(self, order: SimOrder):
+        if order.status in _DONE:
+            return
+        book = self._book(order.token)
+        if order.trigger:
+            ltp = book.ltp
+            if not ltp or (ltp - order.trigger) * order.side < 0:
+                order.status = TRIGGER_PENDING
+                heapq.heappush(
+                    book.stops[order.side],
+                    (order.trigger * order.side, next(self._seq), order),
+                )
+                return
+        self._execute(book, order)
+
+    def _execute(self, book: _Book, order: SimOrder):
+        self._take(book, order)
+        if order.filled == order.quantity:
+            order.status = FILLED
+        elif order.ioc:
+            order.status = CANCELLED
+        else:
+            order.status = PARTIALLY_FILLED if order.filled else OPEN
+            if order.side == BUY:
+                heapq.heappush(
+                    book.buys, (-order.limit, next(self._seq), order)
+                )
+            else:
+                heapq.heappush(
+                    book.sells, (order.limit, next(self._seq), order)
+                )
+
+    def _take(self, book: _Book, order: SimOrder):
+        """Fill ``order`` against the opposite levels within its limit."""
+        levels = book.asks if order.side == BUY else book.bids
+        limit = order.limit * order.side
+        market = not order.price
+        while levels and order.filled < order.quantity:
+            level = levels[0]
+            if level[0] * order.side > limit:
+                break
+            quantity = min(level[1], order.quantity - order.filled)
+            price = level[0]
+            if market and self.slippage is not None:
+                price = self.slippage(order, price)
+            self._fill(order, quantity, price)
+            level[1] -= quantity
+            if level[1] <= 0:
+                levels.pop(0)
+
+    def _fill(self, order: SimOrder, quantity: int, price: float):
+        amount = quantity * price
+        order.filled += quantity
+        order.value += amount
+        rates = self._rates[order.side]
+        charges = (
+            amount * rates[0],
+            amount * rates[1],
+            amount * rates[2],
+            amount * rates[3],
+            amount * rates[4],
+        )
+        self.funds -= amount * (order.side + self._rate[order.side])
+        position = self.positions.get(order.token)
+        if position is None:
+            position = self.positions[order.token] = Position()
+        position.fill(order.side, quantity, price, charges)
+        self.fills += 1
+        if self.ledger is not None:
+            self.ledger.record(
+                order.token,
+                self._types[order.side],
+                quantity,
+                price,
+                order.tag,
+                self.now,
+            )
+
+    def _match_resting(self, book: _Book):
+        for heap, levels, side in (
+            (book.buys, book.asks, BUY),
+            (book.sells, book.bids, SELL),
+        ):
+            while heap and levels:
+                order = heap[0][2]
+                if order.status not in _DONE:
+                    if (levels[0][0] - order.limit) * side > 0:
+                        break
+                    self._take(book, order)
+                    if order.filled < order.quantity:
+                        if order.filled:
+                            order.status = PARTIALLY_FILLED
+                        break
+                    order.status = FILLED
+                heapq.heappop(heap)
+
+    def _trigger(self, book: _Book):
+        for side, heap in book.stops.items():
+            # Buy stops fire at or above the trigger, sell stops below
+            while heap and heap[0][0] <= book.ltp * side:
+                order = heapq.heappop(heap)[2]
+                if order.status not in _DONE:
+                    self._execute(book, order)
+
+
+def _as_dict(value) -> dict:
+    return value if isinstance(value, dict) else vars(value)
+
+
+class SimOrderClient(OrderClient):
+    """demoOrder.OrderClient backed by a MatchingEngine.
+
+    Portfolio (or anything written against OrderClient) can use it
+    unchanged; ``placeOrder`` additionally accepts ``trigger_price``
+    and ``validity``, and orders are filled by the engine's market data
+    instead of at a quoted LTP.
+    """
+
+    def __init__(self, engine: MatchingEngine = None, ledger=None):
+        self.engine = engine or MatchingEngine(ledger=ledger)
+        if ledger is not None:
+            self.engine.ledger = ledger
+
+    @property
+    def ledger(self):
+        return self.engine.ledger
+
+    @property
+    def funds(self) -> float:
+        return self.engine.funds
+
+    @property
+    def orderbook(self) -> list:
+        return self.get_order_report()
+
+    @property
+    def open_positions(self) -> list:
+        return self.get_position(PositionType.open)
+
+    def get_funds(self):
+        return self.engine.funds
+
+    def get_order_report(self):
+        return [order.report() for order in self.engine.orders.values()]
+
+    def placeOrder(
+        self,
+        orderType: OrderType,
+        instrumentToken: str,
+        transactionType: TransactionType,
+        qty: int,
+        price: float = 0,
+        variety: str = "REGULAR",
+        tag: str = "fno",
+        trigger_price: float = 0,
+        validity: OrderValidity = OrderValidity.gfd,
+    ):
+        side = BUY if transactionType == TransactionType.buy else SELL
+        order = self.engine.submit(
+            instrumentToken,
+            side,
+            qty,
+            price,
+            trigger_price,
+            validity == OrderValidity.ioc,
+            tag,
+        )
+        order.product = orderType.value
+        if order.status == REJECTED:
+            return {"status": "error", "message": "Insufficient Funds"}
+        return {"status": "success", "message": order.report()}
+
+    def cancelOrder(self, order_id):
+        if self.engine.cancel(order_id):
+            return {"status": "success", "message": str(order_id)}
+        return {"status": "error", "message": "Order is not open"}
+
+    def get_position(self, position_Type: PositionType):
+        positions = []
+        for token, position in self.engine.positions.items():
+            if position_Type == PositionType.open and not position.quantity:
+                continue
+            positions.append(
+                {
+                    "instrumentToken": token,
+                    "netTrdQtyLot": position.quantity,
+                    "averageStockPrice": position.average,
+                    "realizedPL": position.realized,
+                    "lastPrice": self.engine._book(token).ltp,
+                }
+            )
+        return positions
@@ -0,0 +1,84 @@
+import time
+
+from accountstate import AccountState
+from utils import PositionType
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+        self.funds = 1000.0
+        self.down = False
+
+    def _call(self, value):
+        self.calls += 1
+        if self.down:
+            return {"status": "error", "message": "down"}
+        return value
+
+    def get_funds(self):
+        return self._call(self.funds)
+
+    def get_order_report(self):
+        return self._call(["order"])
+
+    def get_trade_report(self):
+        return self._call(["trade"])
+
+    def get_position(self, position_type):
+        return self._call([position_type.value])
+
+
+def test_dashboard_polling_is_served_from_memory():
+    client, clock = FakeClient(), Clock()
+    account = AccountState(client, interval=30, clock=clock)
+    # Four endpoints polled every two seconds for a minute
+    for second in range(0, 60, 2):
+        clock.now = second
+        account.funds()
+        account.orders()
+        account.trades()
+        assert account.positions(PositionType.open) == ["OPEN"]
+    polled = 4 * 30
+    assert client.calls * 10 <= polled
+    assert account.metrics()["hits"] == polled - client.calls
+    account.close()
+
+
+def test_order_ack_invalidates_snapshots():
+    client = FakeClient()
+    account = AccountState(client, clock=Clock())
+    assert account.funds() == 1000.0
+    client.funds = 900.0
+    assert account.funds() == 1000.0
+    account.invalidate()
+    assert account.funds() == 900.0
+    account.close(timeout=5)
+    # One read, one background refresh and one read after the ack at most
+    assert client.calls <= 3
+
+    client.down = True
+    account.invalidate()
+    assert account.funds() == {"status": "error", "message": "down"}
+    assert account.metrics()["failed"] >= 1
+
+
+def test_timer_refreshes_sections_in_use():
+    client = FakeClient()
+    account = AccountState(client, interval=0.02)
+    account.funds()
+    account.start()
+    deadline = time.monotonic() + 5
+    while client.calls < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    account.close(timeout=5)
+    assert client.calls >= 3
+    assert account.metrics()["broker_calls"]["funds"] == client.calls
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from analytics import CHARGES, PnLLedger, charge_breakdown
+from demoOrder import OrderClient
+from utils import OrderType, TransactionType
+
+BUY, SELL = TransactionType.buy, TransactionType.sell
+
+
+def test_average_cost_netting():
+    ledger = PnLLedger()
+    ledger.record(101, BUY, 10, 100)
+    ledger.record(101, BUY, 10, 110)
+    ledger.record(101, SELL, 15, 120)
+    row = ledger.positions({101: 100.0}).iloc[0]
+    assert (row["quantity"], row["average"]) == (5, 105)
+    assert row["realized"] == pytest.approx(225)
+    assert row["unrealized"] == pytest.approx(-25)
+
+    # Selling through flat opens a short at the fill price
+    ledger.record(101, SELL, 10, 120)
+    row = ledger.positions().iloc[0]
+    assert (row["quantity"], row["average"]) == (-5, 120)
+    assert row["realized"] == pytest.approx(300)
+    assert row["unrealized"] == 0
+
+
+def test_charges_match_order_client():
+    for side in (BUY, SELL):
+        breakdown = charge_breakdown(25_000.0, side)
+        assert sum(breakdown) == pytest.approx(
+            25_000.0 * OrderClient.charge_rate(side)
+        )
+
+    ledger = PnLLedger()
+    client = OrderClient(ledger=ledger)
+    client.placeOrder(OrderType.mis_order, "101", BUY, 50, price=200)
+    client.placeOrder(OrderType.mis_order, "101", SELL, 50, price=210)
+    summary = ledger.summary()
+    assert summary["fills"] == 2
+    assert summary["realized"] == pytest.approx(500)
+    assert summary["charges"] == pytest.approx(
+        ledger.fills.view()["charges"].sum()
+    )
+    assert summary["net"] == pytest.approx(500 - summary["charges"])
+    assert summary["charges_breakdown"]["stt"] == pytest.approx(
+        50 * 210 * OrderClient.stt_charges
+    )
+    assert client.funds == pytest.approx(100_000 + summary["net"])
+
+
+def test_incremental_totals_match_cash_flows():
+    rng = np.random.default_rng(3)
+    ledger = PnLLedger()
+    n = 3000
+    tokens = rng.choice([101, 102, 103], n)
+    strategies = rng.choice(["a", "b"], n)
+    sides = rng.choice([1, -1], n)
+    quantities = rng.integers(1, 20, n)
+    prices = np.round(rng.uniform(90, 110, n), 2)
+    for token, strategy, side, quantity, price in zip(
+        tokens, strategies, sides, quantities, prices
+    ):
+        ledger.record(
+            token, BUY if side > 0 else SELL, int(quantity), price, strategy
+        )
+    assert len(ledger.fills) == n
+
+    # Gross P&L marked at the last fill is cash flow plus open value
+    fills = ledger.fills.view()
+    frame = ledger.positions()
+    for _, row in frame.iterrows():
+        mask = (fills["token"] == row["token"]) & (
+            fills["strategy"] == ledger.strategies.index(row["strategy"])
+        )
+        cash = -(fills["side"] * fills["quantity"] * fills["price"])[mask]
+        assert row["realized"] + row["unrealized"] == pytest.approx(
+            cash.sum() + row["quantity"] * row["last"]
+        )
+
+    summary = ledger.summary()
+    for by in ("symbols", "strategies"):
+        assert sum(group["net"] for group in summary[by]) == pytest.approx(
+            summary["net"]
+        )
+    assert sum(summary["charges_breakdown"].values()) == pytest.approx(
+        fills["charges"].sum()
+    )
+    assert set(summary["charges_breakdown"]) == set(CHARGES)
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict
+
+from async_pipeline import AsyncPipeline
+from bar_builder import NS_PER_MINUTE, BarBuilder
+
+
+class RecordingIndicator:
+    def __init__(self) -> None:
+        self.timeframe = defaultdict(lambda: 1)
+        self.dispatcher = None
+        self.evaluated = []
+        self.stored = []
+        self.threads = set()
+
+    def store_ohlcv(self, token, df):
+        self.threads.add(threading.current_thread().name)
+        self.stored.append((token, df.shape[0]))
+
+    def evaluate(self, token, df):
+        self.evaluated.append((token, df["close"].tolist()))
+        if df["close"].iloc[-1] > 100:
+            self.dispatcher.submit(token, time.sleep, 0.01)
+
+    def evaluate_batch(self, completed):
+        for token, df in completed.items():
+            self.evaluate(token, df)
+
+
+def test_ticks_from_another_thread_become_evaluated_bars():
+    indicator = RecordingIndicator()
+
+    async def main():
+        pipeline = AsyncPipeline(
+            indicator, BarBuilder(), flush_interval=60, clock=lambda: 0
+        )
+        await pipeline.start()
+        assert indicator.dispatcher is pipeline
+
+        def feed():
+            for minute, price in enumerate([100.0, 101.0, 102.0]):
+                for token in (1, 2):
+                    pipeline.on_tick(
+                        token, minute * NS_PER_MINUTE, price, minute, 0
+                    )
+
+        await asyncio.get_running_loop().run_in_executor(None, feed)
+        await asyncio.sleep(0.1)
+        await pipeline.stop()
+
+    asyncio.run(main())
+    closes = defaultdict(list)
+    for token, values in indicator.evaluated:
+        closes[token] += values
+    # The 102.0 bars are still open: nothing has started a later minute
+    assert closes == {1: [100.0, 101.0], 2: [100.0, 101.0]}
+    assert sum(rows for _, rows in indicator.stored) == 4
+    assert all(name.startswith("pipeline") for name in indicator.threads)
+
+
+def test_submit_runs_in_order_per_key():
+    seen = []
+
+    async def main():
+        pipeline = AsyncPipeline(RecordingIndicator(), BarBuilder())
+        await pipeline.start()
+        for i in range(20):
+            pipeline.submit(
+                i % 2,
+                lambda key, i: (time.sleep(0.001), seen.append((key, i))),
+                i % 2,
+                i,
+            )
+        await pipeline.stop()
+
+    asyncio.run(main())
+    for key in (0, 1):
+        order = [i for k, i in seen if k == key]
+        assert order == sorted(order) and len(order) == 10
+
+
+class FailingIndicator(RecordingIndicator):
+    def evaluate(self, token, df):
+        super().evaluate(token, df)
+        if len(self.evaluated) == 1:
+            raise ValueError("evaluation failed")
+
+
+def test_failed_evaluation_keeps_the_pipeline_running():
+    indicator = FailingIndicator()
+
+    async def main():
+        pipeline = AsyncPipeline(
+            indicator, BarBuilder(), flush_interval=60, clock=lambda: 0
+        )
+        await pipeline.start()
+        for minute, price in enumerate([100.0, 101.0, 102.0]):
+            pipeline.on_tick(1, minute * NS_PER_MINUTE, price, minute, 0)
+            await asyncio.sleep(0.01)
+        assert not any(task.done() for task in pipeline._tasks)
+        assert pipeline.queue.empty()
+        await pipeline.stop()
+
+    asyncio.run(main())
+    assert indicator.evaluated == [(1, [100.0]), (1, [101.0])]
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+from backtest import Backtest, resample
+from bar_builder import BarBuilder, parse_tick_time
+from demoOrder import OrderClient
+from indicator_engine import IndicatorEngine, signal_code
+from replay import TIME, synthetic_messages
+from utils import OrderType, Strategy, TransactionType
+
+STRATEGY = Strategy(
+    rsi=14,
+    sma=20,
+    fast_multiplier=3,
+    fast_period=7,
+    slow_multiplier=2,
+    slow_period=10,
+    timeframe=1,
+)
+
+
+def replayed_day(tokens) -> dict:
+    """1-minute bars per token built from a replayed session."""
+    builder = BarBuilder()
+    for message in synthetic_messages(tokens, minutes=120, seed=4):
+        builder.update(
+            int(message[1]),
+            parse_tick_time(message[TIME]),
+            float(message[6]),
+            int(message[15]),
+            int(message[16]),
+        )
+    builder.close_until(2**62)
+    return {token: bars[1] for token, bars in builder.drain().items()}
+
+
+def live_codes(strategy: dict, df: pd.DataFrame) -> list:
+    """Codes Indicator.evaluate would dispatch, one bar at a time."""
+    engine = IndicatorEngine(strategy)
+    codes = []
+    for i in range(df.shape[0]):
+        engine.update_frame(df.iloc[i : i + 1])
+        codes.append(signal_code(engine.values) if engine.ready else 0)
+    return codes
+
+
+def test_signals_match_the_live_path_bar_for_bar():
+    bars = replayed_day([11, 12, 13])
+    strategies = {11: STRATEGY, 12: STRATEGY, 13: dict(STRATEGY.__dict__)}
+    strategies[13].update(sma=5, rsi=7, timeframe=3)
+    backtest = Backtest(strategies)
+    summary = backtest.run(bars)
+
+    for token, strategy in strategies.items():
+        params = dict(getattr(strategy, "__dict__", strategy))
+        timeframe = params.pop("timeframe")
+        df = bars[token]
+        if timeframe > 1:
+            df = df.resample(f"{timeframe}min").agg(
+                {"high": "max", "low": "min", "close": "last"}
+            )
+        signals = backtest.signals[token]
+        assert signals.tolist() == live_codes(params, df)
+        assert signals.index.equals(df.index.as_unit("ns"))
+        assert summary.loc[token, "bars"] == df.shape[0]
+    assert (summary["trades"] > 0).all()
+
+
+def test_fills_pay_the_demo_order_charges():
+    close = np.array([100.0, 101.0, 103.0, 102.0, 99.0, 98.0])
+    codes = np.array([0, 1, 1, -1, -1, 0], dtype=np.int8)
+    bars, trades, gross, charges, net = Backtest({})._pnl(close, codes, 10)
+
+    client = OrderClient()
+    expected = 0.0
+    for price, side in [
+        (101.0, TransactionType.buy),  # buy the call
+        (102.0, TransactionType.sell),  # exit it
+        (102.0, TransactionType.buy),  # buy the put
+        (98.0, TransactionType.sell),  # exit at the end
+    ]:
+        if side == TransactionType.sell:
+            client.open_positions.append({})
+        response = client.placeOrder(OrderType.mis_order, 1, side, 10, price)
+        expected += response["message"]["total_charges"]
+
+    assert trades == 2
+    assert gross == 10 * ((103 - 101) + (102 - 103) - (99 - 102) - (98 - 99))
+    np.testing.assert_allclose(charges, expected)
+    assert net == gross - charges
+
+
+def test_resample_matches_pandas():
+    index = pd.date_range("2023-10-16 09:15", periods=50, freq="min")
+    close = np.arange(50.0)
+    df = pd.DataFrame(
+        {"high": close + 1, "low": close - 1, "close": close}, index=index
+    )
+    columns = {"datetime": index.as_unit("ns").asi8}
+    columns.update({name: df[name].values for name in df})
+    bars = resample(columns, 15)
+    expected = df.resample("15min").agg(
+        {"high": "max", "low": "min", "close": "last"}
+    )
+    np.testing.assert_array_equal(bars["close"], expected["close"])
+    np.testing.assert_array_equal(bars["high"], expected["high"])
+    np.testing.assert_array_equal(
+        bars["datetime"], expected.index.as_unit("ns").asi8
+    )
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from barstore import BAR_COLUMNS, BarStore, to_frame
+
+
+def bars(start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(
+        start, periods=periods, freq="min", name="datetime", unit="ns"
+    )
+    values = np.arange(periods, dtype=float)
+    return pd.DataFrame(
+        {column: values for column in BAR_COLUMNS}, index=index
+    )
+
+
+def test_range_reads_are_views_inside_a_partition(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = bars("2023-10-16 09:15", 600)
+    assert store.append(101, df) == 600
+    assert store.append(101, df.iloc[-10:]) == 0
+
+    columns = store.read(101, "2023-10-16 10:00", "2023-10-16 11:00")
+    assert columns["datetime"].shape[0] == 60
+    assert isinstance(columns["close"], np.memmap)
+
+    frame = to_frame(columns)
+    pd.testing.assert_frame_equal(
+        frame, df.loc["2023-10-16 10:00":"2023-10-16 10:59"], check_freq=False
+    )
+    assert np.shares_memory(frame["close"].values, columns["close"])
+    assert store.frame(101, start="2023-10-16 20:00").shape[0] == 0
+    assert store.tail(101, 5)["close"].tolist() == [595, 596, 597, 598, 599]
+
+
+def test_reads_join_year_partitions(tmp_path):
+    store = BarStore(str(tmp_path))
+    store.append(7, bars("2022-12-31 23:50", 20))
+    assert sorted(os.listdir(tmp_path / "7")) == ["2022", "2023"]
+
+    frame = store.frame(7, size=15)
+    assert frame.index[0] == pd.Timestamp("2022-12-31 23:55")
+    assert frame.shape[0] == 15
+    assert store.frame(7, start="2023").shape[0] == 10
+    assert store.frame(7, end="2023").shape[0] == 10
+    assert BarStore(str(tmp_path)).last_timestamp(7) == frame.index[-1]
+
+
+def test_append_after_a_partial_write_keeps_rows_aligned(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = bars("2023-10-16 09:15", 20)
+    store.append(5, df.iloc[:10])
+
+    # A crash after the first two columns of the next batch were written
+    partition = tmp_path / "5" / "2023"
+    later = df.iloc[10:15]
+    with open(partition / "datetime.bin", "ab") as f:
+        f.write(later.index.values.astype("datetime64[ns]").tobytes())
+    with open(partition / "open.bin", "ab") as f:
+        f.write(later["open"].values.tobytes())
+
+    store = BarStore(str(tmp_path))
+    assert store.last_timestamp(5) == df.index[9]
+    assert store.append(5, df.iloc[10:]) == 10
+    pd.testing.assert_frame_equal(store.frame(5), df, check_freq=False)
+    sizes = {os.path.getsize(path) for path in partition.iterdir()}
+    assert sizes == {20 * 8}
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from py_vollib.black_scholes import black_scholes
+from py_vollib.black_scholes.greeks import analytical
+from py_vollib.black_scholes.implied_volatility import (
+    implied_volatility as vollib_iv,
+)
+
+from black_scholes import greeks, implied_volatility
+
+
+@pytest.fixture
+def chain():
+    rng = np.random.default_rng(5)
+    n = 400
+    S = np.full(n, 19500.0)
+    K = 19500.0 + 50.0 * rng.integers(-20, 21, n)
+    t = rng.uniform(0.5, 30, n) / 365
+    sigma = rng.uniform(0.08, 0.6, n)
+    flag = np.where(rng.random(n) < 0.5, "c", "p")
+    price = np.array(
+        [
+            black_scholes(f, s, k, tt, 0.1, v)
+            for f, s, k, tt, v in zip(flag, S, K, t, sigma)
+        ]
+    )
+    return flag, S, K, t, sigma, price
+
+
+def test_implied_volatility_matches_py_vollib(chain):
+    flag, S, K, t, sigma, price = chain
+    # Skip contracts with almost no time value, where IV is ill-conditioned
+    keep = greeks(flag, S, K, t, 0.1, sigma)["vega"] > 0.01
+    result = implied_volatility(price, S, K, t, 0.1, flag)
+    expected = [
+        vollib_iv(p, s, k, tt, 0.1, f)
+        for p, s, k, tt, f in zip(
+            price[keep], S[keep], K[keep], t[keep], flag[keep]
+        )
+    ]
+    np.testing.assert_allclose(result[keep], expected, rtol=1e-5)
+
+
+def test_implied_volatility_outside_bounds_is_nan():
+    result = implied_volatility(
+        [0.0, 500.0, 20000.0], 19500.0, 19000.0, 7 / 365, 0.1, "c"
+    )
+    assert np.isnan(result).all()
+
+
+@pytest.mark.parametrize("name", ["delta", "gamma", "theta", "vega", "rho"])
+def test_greeks_match_py_vollib(chain, name):
+    flag, S, K, t, sigma, _ = chain
+    result = greeks(flag, S, K, t, 0.1, sigma)[name]
+    expected = [
+        getattr(analytical, name)(f, s, k, tt, 0.1, v)
+        for f, s, k, tt, v in zip(flag, S, K, t, sigma)
+    ]
+    np.testing.assert_allclose(result, expected, rtol=1e-7, atol=1e-10)
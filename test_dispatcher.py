@@ -0,0 +1,106 @@
+import time
+from threading import Event
+
+import pandas as pd
+
+from dispatcher import BLOCK, COALESCE, DROP, Dispatcher, merge_args
+
+
+def test_calls_for_one_key_run_in_order():
+    seen = []
+    dispatcher = Dispatcher(workers=4, max_pending=1000, policy=BLOCK)
+    for i in range(200):
+        dispatcher.submit(
+            i % 3, lambda key, i: seen.append((key, i)), i % 3, i
+        )
+    assert dispatcher.join(timeout=5)
+    for key in range(3):
+        order = [i for k, i in seen if k == key]
+        assert order == sorted(order) and len(order) > 60
+    assert dispatcher.metrics()["completed"] == 200
+    dispatcher.close()
+
+
+def test_slow_key_does_not_stall_others():
+    release = Event()
+    done = Event()
+    dispatcher = Dispatcher(workers=2)
+    dispatcher.submit("slow", release.wait, 5)
+    dispatcher.submit("fast", done.set)
+    assert done.wait(1)
+    assert dispatcher.depth() == 0
+    release.set()
+    dispatcher.close()
+
+
+def test_drop_policy_discards_oldest_pending():
+    release = Event()
+    seen = []
+    dispatcher = Dispatcher(workers=1, max_pending=2, policy=DROP)
+    dispatcher.submit(1, release.wait, 5)
+    time.sleep(0.05)
+    for i in range(5):
+        dispatcher.submit(1, seen.append, i)
+    assert dispatcher.depth(1) == 2
+    release.set()
+    dispatcher.join(timeout=5)
+    assert seen == [3, 4]
+    assert dispatcher.metrics()["dropped"] == 3
+    dispatcher.close()
+
+
+def test_coalesce_policy_merges_pending_bars():
+    release = Event()
+    frames = []
+
+    def handler(token, df):
+        frames.append(df)
+
+    dispatcher = Dispatcher(workers=1, max_pending=1, policy=COALESCE)
+    dispatcher.submit(1, release.wait, 5)
+    time.sleep(0.05)
+    for i in range(3):
+        dispatcher.submit(1, handler, 1, pd.DataFrame({"close": [float(i)]}))
+    release.set()
+    dispatcher.join(timeout=5)
+    assert len(frames) == 1
+    assert frames[0]["close"].tolist() == [0.0, 1.0, 2.0]
+    assert dispatcher.metrics()["coalesced"] == 2
+    dispatcher.close()
+
+
+def test_coalesce_policy_stays_bounded_across_functions():
+    release = Event()
+    seen = []
+    dispatcher = Dispatcher(workers=1, max_pending=2, policy=COALESCE)
+    dispatcher.submit(1, release.wait, 5)
+    time.sleep(0.05)
+    for i in range(6):
+        handler = seen.append if i % 2 else seen.extend
+        dispatcher.submit(1, handler, [i] if i % 2 == 0 else i)
+        assert dispatcher.depth(1) <= 2
+    release.set()
+    dispatcher.join(timeout=5)
+    assert seen == [4, 5]
+    assert dispatcher.metrics()["dropped"] == 4
+    dispatcher.close()
+
+
+def test_merge_args_concatenates_frames_per_timeframe():
+    a = {1: pd.DataFrame({"close": [1.0]}), 5: pd.DataFrame({"close": [2.0]})}
+    b = {1: pd.DataFrame({"close": [3.0]})}
+    token, bars = merge_args((101, a), (101, b))
+    assert token == 101
+    assert bars[1]["close"].tolist() == [1.0, 3.0]
+    assert bars[5]["close"].tolist() == [2.0]
+
+
+def test_failures_are_counted_and_do_not_kill_workers():
+    done = Event()
+    dispatcher = Dispatcher(workers=1)
+    dispatcher.submit(1, lambda: 1 / 0)
+    dispatcher.submit(1, done.set)
+    assert done.wait(1)
+    dispatcher.join(timeout=5)
+    assert dispatcher.metrics()["failed"] == 1
+    dispatcher.close()
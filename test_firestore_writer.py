@@ -0,0 +1,79 @@
+import math
+import time
+from threading import Lock
+
+from firestore import FirestoreWriter
+
+
+class FakeBatch:
+    def __init__(self, client) -> None:
+        self._client = client
+        self._ops = []
+
+    def set(self, reference, data):
+        self._ops.append((reference, data))
+
+    def commit(self):
+        with self._client.lock:
+            if self._client.failures:
+                self._client.failures -= 1
+                raise ConnectionError("unavailable")
+            time.sleep(self._client.latency)
+            self._client.batch_sizes.append(len(self._ops))
+            for reference, data in self._ops:
+                self._client.documents["/".join(reference)] = data
+
+
+class FakeClient:
+    def __init__(self, latency: float = 0.0, failures: int = 0) -> None:
+        self.latency = latency
+        self.failures = failures
+        self.lock = Lock()
+        self.documents = {}
+        self.batch_sizes = []
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def document(self, *path):
+        return path
+
+
+def test_writes_are_batched_and_flushed_on_close():
+    client = FakeClient()
+    writer = FirestoreWriter(client, flush_interval=0.05)
+    for minute in range(1200):
+        writer.add_ohlcv("NSE_NIFTY", f"{minute:04d}", {"close": minute})
+    writer.close()
+
+    assert len(client.documents) == 1200
+    assert client.documents["livefeed/NSE_NIFTY/ohlcv/0042"] == {"close": 42}
+    assert max(client.batch_sizes) <= 500
+    assert writer.written == 1200 and writer.failed == 0
+
+
+def test_failed_commits_are_retried():
+    client = FakeClient(failures=2)
+    writer = FirestoreWriter(client, flush_interval=0.01, backoff=0.001)
+    writer.add_ohlcv("NSE_NIFTY", "2023-10-16 09:15:00", {"close": 1.0})
+    writer.flush()
+    writer.close()
+
+    assert writer.written == 1
+    assert len(client.documents) == 1
+
+
+def test_producer_does_not_wait_on_round_trips():
+    client = FakeClient(latency=0.2)
+    writer = FirestoreWriter(client, flush_interval=0.05)
+    start = time.perf_counter()
+    for minute in range(5000):
+        writer.add_ohlcv("NSE_BANKNIFTY", str(minute), {"close": minute})
+    enqueue = time.perf_counter() - start
+    writer.flush()
+    writer.close()
+
+    assert writer.written == 5000
+    # Waiting on even one commit would take a whole round trip
+    assert enqueue < client.latency
+    assert writer.batches <= math.ceil(5000 / 500) + 2
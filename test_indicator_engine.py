@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_engine import (
+    BatchIndicatorEngine,
+    IndicatorEngine,
+    RollingSMA,
+    StreamingSupertrend,
+    WilderATR,
+    WilderRSI,
+    signal_code,
+)
+
+ta = pytest.importorskip("pandas_ta")
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(42)
+    close = 100 + np.cumsum(rng.normal(0, 1, 400))
+    return pd.DataFrame(
+        {
+            "high": close + rng.uniform(0, 1, 400),
+            "low": close - rng.uniform(0, 1, 400),
+            "close": close,
+        }
+    )
+
+
+def stream(indicator, *columns):
+    return np.array([indicator.update(*row) for row in zip(*columns)])
+
+
+@pytest.mark.parametrize("period", [5, 14, 20])
+def test_sma_matches_pandas_ta(bars, period):
+    expected = ta.sma(bars["close"], length=period)
+    result = stream(RollingSMA(period), bars["close"])
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [5, 14, 20])
+def test_rsi_matches_pandas_ta(bars, period):
+    expected = ta.rsi(bars["close"], length=period)
+    result = stream(WilderRSI(period), bars["close"])
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [5, 14, 20])
+def test_atr_matches_pandas_ta(bars, period):
+    expected = ta.atr(bars["high"], bars["low"], bars["close"], period)
+    result = stream(
+        WilderATR(period), bars["high"], bars["low"], bars["close"]
+    )
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+
+def final_bands(close, upper, lower):
+    """The band/direction recursion the bar-at-a-time Supertrend used."""
+    trend = np.full(close.shape, np.nan)
+    direction = np.full(close.shape, 1)
+    for i in range(1, close.shape[0]):
+        if close[i] > upper[i - 1]:
+            direction[i] = 1
+        elif close[i] < lower[i - 1]:
+            direction[i] = -1
+        else:
+            direction[i] = direction[i - 1]
+            if direction[i] > 0 and lower[i] < lower[i - 1]:
+                lower[i] = lower[i - 1]
+            if direction[i] < 0 and upper[i] > upper[i - 1]:
+                upper[i] = upper[i - 1]
+        trend[i] = lower[i] if direction[i] > 0 else upper[i]
+    return trend, direction
+
+
+@pytest.mark.parametrize("period,multiplier", [(7, 3), (10, 2), (14, 1)])
+def test_supertrend_matches_band_kernel(bars, period, multiplier):
+    mid = ta.midprice(bars["high"], bars["low"])
+    matr = multiplier * ta.atr(
+        bars["high"], bars["low"], bars["close"], period
+    )
+    trend, direction = final_bands(
+        bars["close"].to_numpy(),
+        (mid + matr).to_numpy(copy=True),
+        (mid - matr).to_numpy(copy=True),
+    )
+
+    supertrend = StreamingSupertrend(period, multiplier)
+    result = [
+        supertrend.update(*row)
+        for row in zip(bars["high"], bars["low"], bars["close"])
+    ]
+    np.testing.assert_allclose(
+        [row[0] for row in result], trend, equal_nan=True
+    )
+    np.testing.assert_array_equal([row[1] for row in result], direction)
+
+
+STRATEGY = {
+    "rsi": 14,
+    "sma": 20,
+    "fast_period": 7,
+    "fast_multiplier": 3,
+    "slow_period": 10,
+    "slow_multiplier": 2,
+}
+
+
+def test_engine_ready_after_window(bars):
+    engine = IndicatorEngine(STRATEGY)
+    engine.update_frame(bars.head(engine.window - 1))
+    assert not engine.ready
+    engine.update_frame(bars.iloc[engine.window - 1 : engine.window])
+    assert engine.ready
+
+
+def test_batch_engine_matches_per_token_engine(bars):
+    strategies = {
+        101: STRATEGY,
+        202: {**STRATEGY, "sma": 5, "fast_period": 3, "slow_multiplier": 1},
+        303: {**STRATEGY, "rsi": 7},
+    }
+    engines = {token: IndicatorEngine(s) for token, s in strategies.items()}
+    batch = BatchIndicatorEngine(strategies)
+
+    for start in range(0, bars.shape[0], 3):
+        chunk = {
+            101: bars.iloc[start : start + 3],
+            202: bars.iloc[start : start + 1],
+            303: bars.iloc[start : start + 2],
+        }
+        updated = batch.update(chunk)
+        for token, df in chunk.items():
+            values = engines[token].update_frame(df)
+            row = batch.position[token]
+            np.testing.assert_allclose(
+                batch.values[row],
+                np.array(values, dtype=float),
+                equal_nan=True,
+            )
+            assert batch.codes[row] == signal_code(values)
+            assert updated[row] == engines[token].ready
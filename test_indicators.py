@@ -0,0 +1,29 @@
+from barstore import BarStore
+from firestore import Firestore
+from indicators import Indicator
+from utils import OptionType, TransactionType
+
+
+class RecordingPortfolio:
+    def __init__(self) -> None:
+        self.signals = []
+
+    def update(self, token, transactionType, optionType=None):
+        self.signals.append((token, transactionType, optionType))
+
+
+def test_dispatch_signal_notifies_once_per_change(monkeypatch, tmp_path):
+    monkeypatch.setattr(Firestore, "get_watchlist", lambda: [])
+    indicator = Indicator(bar_store=BarStore(str(tmp_path)))
+    portfolio = RecordingPortfolio()
+    indicator.attachObserver(portfolio)
+
+    for token, code in [(1, 1), (2, -1), (1, 1), (2, -1), (1, 0)]:
+        indicator.dispatch_signal(token, code)
+
+    assert portfolio.signals == [
+        (1, TransactionType.buy, OptionType.call),
+        (2, TransactionType.buy, OptionType.put),
+        (1, TransactionType.sell, None),
+    ]
+    assert indicator.signal[1] == (1, TransactionType.sell)
@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from instruments import InstrumentMaster
+
+
+def make_tokens(seed=0):
+    rng = np.random.default_rng(seed)
+    cash = pd.DataFrame(
+        {
+            "instrumentName": ["NIFTY", "BANKNIFTY", "INFY", "INFY"],
+            "exchange": ["NSE", "NSE", "NSE", "BSE"],
+            "lotSize": [1, 1, 1, 1],
+        },
+        index=pd.Index([11717, 11721, 1594, 500209], name="instrumentToken"),
+    )
+    rows = []
+    for name, step in (("NIFTY", 50), ("BANKNIFTY", 100)):
+        for expiry in ("05OCT23", "12OCT23", "26OCT23"):
+            for option_type in ("CE", "PE"):
+                for strike in range(18000, 21000, step):
+                    rows.append((name, expiry, option_type, strike))
+    fno = pd.DataFrame(
+        rows, columns=["instrumentName", "expiry", "optionType", "strike"]
+    )
+    fno["lotSize"] = 50
+    fno.index = pd.Index(
+        rng.permutation(np.arange(40000, 40000 + len(fno))),
+        name="instrumentToken",
+    )
+    return cash, fno.sample(frac=1, random_state=seed)
+
+
+@pytest.fixture
+def master():
+    return InstrumentMaster(*make_tokens())
+
+
+def test_cash_token_lookup(master):
+    assert master.cash_token(11721)["instrumentName"] == "BANKNIFTY"
+    assert master.cash_token(500209)["exchange"] == "BSE"
+    assert master.cash_token(1) is None
+    rows = master.find_cash(instrumentName="INFY", exchange="NSE")
+    assert rows.index.tolist() == [1594]
+
+
+@pytest.mark.parametrize("expiry", [None, "12OCT23"])
+def test_strike_range_matches_frame_query(master, expiry):
+    fno = master.fno.frame
+    mask = (
+        (fno["instrumentName"] == "NIFTY")
+        & (fno["optionType"] == "CE")
+        & (fno["strike"] >= 19480.5)
+        & (fno["strike"] <= 20000)
+    )
+    if expiry:
+        mask &= fno["expiry"] == expiry
+    rows = master.find_fno(
+        strikeRange=(19480.5, 20000),
+        instrumentName="NIFTY",
+        optionType="CE",
+        expiry=expiry,
+    )
+    assert sorted(rows.index) == sorted(fno[mask].index)
+    assert rows["strike"].between(19480.5, 20000).all()
+
+
+def test_exact_strike_and_nearest(master):
+    rows = master.find_fno(
+        instrumentName="BANKNIFTY", optionType="PE", strike=19500
+    )
+    assert len(rows) == 3
+    assert (rows["strike"] == 19500).all()
+
+    table = master.fno
+    position = table.nearest_strike("NIFTY", "CE", 19524, "05OCT23")
+    assert table.strike[position] == 19500
+    position = table.nearest_strike("NIFTY", "CE", 19526, "05OCT23")
+    assert table.strike[position] == 19550
+    position = table.nearest_strike("NIFTY", "CE", 25000, "05OCT23")
+    assert table.strike[position] == 20950
+    assert table.nearest_strike("NIFTY", "XX", 19500, "05OCT23") == -1
+
+
+def test_get_reloads_when_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "tokens.npz"
+    path.write_bytes(b"")
+    loads = []
+
+    def load(cls, path):
+        loads.append(path)
+        return cls(*make_tokens(len(loads)), os.path.getmtime(path))
+
+    monkeypatch.setattr(InstrumentMaster, "_instance", None)
+    monkeypatch.setattr(InstrumentMaster, "load", classmethod(load))
+
+    first = InstrumentMaster.get(str(path))
+    assert InstrumentMaster.get(str(path)) is first
+    os.utime(path, (0, first.mtime + 10))
+    assert InstrumentMaster.get(str(path)) is not first
+    assert len(loads) == 2
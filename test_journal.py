@@ -0,0 +1,87 @@
+import datetime
+
+import numpy as np
+
+from bar_builder import NS_PER_SECOND, parse_tick_time
+from journal import JournalReader, TickJournal, journal_path
+from replay import TIME, synthetic_messages
+
+
+def write(journal, messages):
+    for message in messages:
+        journal.append(
+            int(message[1]),
+            parse_tick_time(message[TIME]),
+            float(message[6]),
+            int(message[15]),
+            int(message[16]),
+        )
+
+
+def test_journal_round_trips_messages_and_resumes(tmp_path):
+    messages = synthetic_messages([1, 2, 3], minutes=4, ticks_per_minute=50)
+    journal = TickJournal(str(tmp_path), chunk=64)
+    write(journal, messages[:300])
+    journal.close()
+
+    # Reopening the same day continues after the last record
+    journal = TickJournal(str(tmp_path), chunk=64)
+    write(journal, messages[300:])
+    journal.flush()
+    path = journal_path(datetime.date(2023, 10, 16), str(tmp_path))
+    assert journal.path == path
+    assert len(JournalReader(path)) == len(messages)
+    journal.close()
+
+    reader = JournalReader(path, stride=16)
+    assert list(reader.messages()) == messages
+    assert sum(chunk.shape[0] for chunk in reader.chunks(100)) == 600
+    assert isinstance(reader.records, np.memmap)
+
+
+def test_lookup_by_time_uses_the_sparse_index(tmp_path):
+    messages = synthetic_messages([5], minutes=10, ticks_per_minute=40)
+    journal = TickJournal(str(tmp_path))
+    write(journal, messages)
+    reader = JournalReader(journal.path, stride=16)
+    journal.close()
+
+    times = reader.records["datetime"]
+    for minute in range(1, 10):
+        start = times[0] + minute * 60 * NS_PER_SECOND
+        end = start + 30 * NS_PER_SECOND
+        rows = reader.between(start, end)
+        expected = times[(times >= start) & (times < end)]
+        np.testing.assert_array_equal(rows["datetime"], expected)
+    assert reader.position(times[-1] + 1) == len(reader)
+    assert reader.position(times[0] - 1) == 0
+
+
+def test_journal_rotates_on_the_ist_date(tmp_path):
+    first = synthetic_messages([1], minutes=1, ticks_per_minute=10)
+    second = synthetic_messages(
+        [1], 1, 10, start=datetime.datetime(2023, 10, 17, 9, 15)
+    )
+    journal = TickJournal(str(tmp_path))
+    write(journal, first + second)
+    journal.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "2023-10-16.ticks",
+        "2023-10-17.ticks",
+    ]
+    for date, messages in ((16, first), (17, second)):
+        reader = JournalReader.open(datetime.date(2023, 10, date), tmp_path)
+        assert list(reader.messages()) == messages
+
+
+def test_appends_after_close_are_ignored(tmp_path):
+    messages = synthetic_messages([1], minutes=1, ticks_per_minute=10)
+    journal = TickJournal(str(tmp_path), chunk=64)
+    write(journal, messages[:5])
+    path = journal.path
+    journal.close()
+
+    # A tick still in flight on the feed thread
+    write(journal, messages[5:])
+    assert journal.path is None
+    assert len(JournalReader(path)) == 5
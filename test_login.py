@@ -0,0 +1,193 @@
+import datetime
+import re
+import socketserver
+import threading
+import time
+from email.utils import format_datetime
+from imaplib import IMAP4
+
+import pytest
+
+from accesscode import SENDER, AccessCodeMailbox
+from utils import IST
+
+
+class StubImapServer(socketserver.ThreadingTCPServer):
+    """Just enough IMAP4rev1 for AccessCodeMailbox, over plain TCP."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubImapHandler)
+        self.messages = []  # (uid, sender, date, subject)
+        self.connections = 0
+        self.fetched = []
+
+    def deliver(self, sender, date, subject):
+        self.messages.append((len(self.messages) + 1, sender, date, subject))
+
+
+class StubImapHandler(socketserver.StreamRequestHandler):
+    def send(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.send("* OK stub ready")
+        for line in self.rfile:
+            tag, command = line.decode().rstrip("\r\n").split(" ", 1)
+            verb = command.split(" ")[0].upper()
+            if verb == "CAPABILITY":
+                self.send("* CAPABILITY IMAP4rev1")
+            elif verb == "SELECT":
+                self.send(f"* {len(server.messages)} EXISTS")
+            elif verb == "UID" and " SEARCH " in command.upper():
+                first = int(re.search(r"UID (\d+):\*", command).group(1))
+                # "n:*" matches the newest message even when n is past it
+                newest = server.messages[-1][0] if server.messages else 0
+                found = [
+                    uid
+                    for uid, sender, *_ in server.messages
+                    if sender == SENDER and (uid >= first or uid == newest)
+                ]
+                self.send("* SEARCH " + " ".join(map(str, found)))
+            elif verb == "UID" and " FETCH " in command.upper():
+                uid = int(command.split(" ")[2])
+                server.fetched.append(uid)
+                _, _, date, subject = server.messages[uid - 1]
+                header = f"Date: {format_datetime(date)}\r\n"
+                header += f"Subject: {subject}\r\n\r\n"
+                self.send(
+                    f"* {uid} FETCH (UID {uid} "
+                    f"BODY[HEADER.FIELDS (DATE SUBJECT)] {{{len(header)}}}"
+                )
+                self.wfile.write(header.encode())
+                self.send(")")
+            elif verb == "LOGOUT":
+                self.send("* BYE")
+                self.send(f"{tag} OK LOGOUT completed")
+                return
+            self.send(f"{tag} OK {verb} completed")
+
+
+@pytest.fixture
+def imap():
+    server = StubImapServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def mailbox(server):
+    host, port = server.server_address
+    return AccessCodeMailbox("user", "password", host, port, IMAP4)
+
+
+def test_access_code_is_polled_on_one_connection(imap):
+    now = datetime.datetime.now(tz=IST).replace(microsecond=0)
+    imap.deliver(SENDER, now - datetime.timedelta(hours=2), "Code 111111")
+    imap.deliver("someone@example.com", now, "Code 999999")
+    threading.Timer(
+        0.3, imap.deliver, (SENDER, now, "Your access code is 222222")
+    ).start()
+
+    start = time.perf_counter()
+    with mailbox(imap) as box:
+        access_code = box.wait(now, timeout=5, interval=0.05)
+    elapsed = time.perf_counter() - start
+
+    assert access_code == "222222"
+    assert imap.connections == 1
+    assert box.searches > 1
+    # Each message header is fetched at most once across polls
+    assert len(imap.fetched) == len(set(imap.fetched))
+    assert elapsed < 2
+
+
+class FakeBroker:
+    logins = 0
+    session = "token-1"
+
+    def __init__(self, **kwargs):
+        self.session_token = None
+
+    def login(self, password):
+        FakeBroker.logins += 1
+        return {"Success": {"message": "access code generated"}}
+
+    def session_2fa(self, access_code):
+        assert access_code == "333333"
+        self.session_token = FakeBroker.session
+
+    def order_report(self):
+        if self.session_token != FakeBroker.session:
+            raise Exception("Invalid session")
+        return {"success": []}
+
+
+@pytest.fixture
+def kotak(monkeypatch):
+    """kotakclient with its singleton and client reset after the test."""
+    pytest.importorskip("cryptography")
+    import kotakclient
+
+    monkeypatch.setattr(
+        kotakclient.KotakClient, "_KotakClient__instance", None
+    )
+    monkeypatch.setattr(kotakclient.KotakClient, "_KotakClient__client", None)
+    return kotakclient
+
+
+def test_restart_reuses_cached_session(imap, kotak, tmp_path, monkeypatch):
+    kotakclient = kotak
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(FakeBroker, "logins", 0)
+    monkeypatch.setattr(FakeBroker, "session", "token-1")
+    monkeypatch.setenv("USERID", "user")
+    monkeypatch.setenv("SECRET_KEY", "secret")
+    monkeypatch.setattr(
+        kotakclient.ks_api, "KSTradeApi", FakeBroker, raising=False
+    )
+    monkeypatch.setattr(
+        kotakclient.AccessCodeMailbox, "from_env", lambda: mailbox(imap)
+    )
+    now = datetime.datetime.now(tz=IST).replace(microsecond=0)
+    imap.deliver(SENDER, now, "Your access code is 333333")
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        client = kotakclient.KotakClient()._KotakClient__client
+        timings.append(time.perf_counter() - start)
+        assert client.session_token == FakeBroker.session
+    # The restart skips the login and the mailbox round trips
+    assert timings[1] < timings[0]
+    assert FakeBroker.logins == 1
+    assert imap.connections == 1
+
+    # A session the broker no longer accepts falls back to 2FA
+    monkeypatch.setattr(FakeBroker, "session", "token-2")
+    imap.deliver(SENDER, now, "Your access code is 333333")
+    kotakclient.KotakClient()
+    assert FakeBroker.logins == 2
+
+
+def test_session_cache_expires_with_the_trading_day(tmp_path):
+    pytest.importorskip("cryptography")
+    from session_cache import SessionCache, derive_key
+
+    cache = SessionCache(derive_key("secret"), str(tmp_path / "session.bin"))
+    evening = IST.localize(datetime.datetime(2023, 10, 16, 21, 0))
+    cache.save("user", "token", now=evening)
+    assert cache.load("user", now=evening) == "token"
+    assert cache.load("other", now=evening) is None
+    assert (
+        cache.load("user", now=evening + datetime.timedelta(hours=3)) is None
+    )
+    assert SessionCache(derive_key("other"), cache.path).load("user") is None
+    assert b"token" not in (tmp_path / "session.bin").read_bytes()
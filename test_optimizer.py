@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+import firestore
+import optimizer
+from backtest import Backtest
+from optimizer import FIELDS, Optimizer, grid, random_search
+
+SPACE = {"timeframe": [1, 3], "rsi": [14], "sma": [20, 50], "fast_period": [7]}
+
+
+def random_bars(n: int = 6000) -> dict:
+    rng = np.random.default_rng(8)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    spread = rng.uniform(0, 0.2, n)
+    start = pd.Timestamp("2023-01-02 09:15").value
+    return {
+        "datetime": start + np.arange(n, dtype=np.int64) * 60_000_000_000,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+    }
+
+
+def test_sweep_matches_backtest_and_pool_matches_inline():
+    bars = random_bars()
+    combinations = grid(SPACE)
+    assert len(combinations) == 2 * 2 * 3 * 3 * 3
+    inline = Optimizer(workers=1).run(bars, combinations)
+    pooled = Optimizer(workers=2, chunksize=16).run(bars, combinations)
+    pd.testing.assert_frame_equal(inline, pooled)
+    assert inline["net"].is_monotonic_decreasing
+
+    for row in (0, 57, len(inline) - 1):
+        strategy = {key: int(inline.loc[row, key]) for key in FIELDS}
+        expected = Backtest({1: strategy}).run({1: bars}).loc[1]
+        for column in expected.index:
+            assert inline.loc[row, column] == expected[column]
+
+
+def test_optimize_saves_the_best_strategy(monkeypatch):
+    saved = []
+    monkeypatch.setattr(
+        optimizer.Firestore,
+        "add_strategy",
+        lambda token, strategy: saved.append((token, strategy))
+        or {"status": "success", "message": ""},
+        raising=False,
+    )
+    combinations = random_search(SPACE, samples=20, seed=1)
+    assert len({tuple(c.values()) for c in combinations}) == 20
+
+    response = optimizer.optimize(101, random_bars(), combinations, workers=1)
+    best = response["results"].iloc[0]
+    assert response["status"] == "success"
+    assert saved == [(101, {key: int(best[key]) for key in FIELDS})]
+
+
+class FakeDocument:
+    def __init__(self, collection, id) -> None:
+        self.collection_ref = collection
+        self.id = id
+        self.reference = self
+        self.children = {}
+
+    def collection(self, name):
+        return self.children.setdefault(name, FakeCollection())
+
+    def set(self, data):
+        self.collection_ref.data[self.id] = data
+
+    def to_dict(self):
+        return self.collection_ref.data[self.id]
+
+
+class FakeCollection:
+    """Documents come back ordered by ID, as Firestore returns them."""
+
+    def __init__(self) -> None:
+        self.documents = {}
+        self.data = {}
+        self._limit = None
+
+    def document(self, id="auto"):
+        if id not in self.documents:
+            self.documents[id] = FakeDocument(self, id)
+        return self.documents[id]
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def get(self):
+        ids = sorted(self.data)[: self._limit]
+        self._limit = None
+        return [self.documents[id] for id in ids]
+
+
+class FakeDatabase:
+    def __init__(self) -> None:
+        self.collections = {}
+
+    def collection(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def test_live_strategy_is_the_one_optimize_saved(monkeypatch):
+    db = FakeDatabase()
+    strategies = (
+        db.collection("watchlist").document("NSE_ACME").collection("strategy")
+    )
+    strategies.document("Kq3hand").set({"rsi": 21, "timeframe": 5})
+    monkeypatch.setattr(
+        optimizer.Firestore, "db", classmethod(lambda cls: db), raising=False
+    )
+
+    class Master:
+        def cash_token(self, token):
+            return {"exchange": "NSE", "instrumentName": "ACME"}
+
+    monkeypatch.setattr(
+        firestore.InstrumentMaster, "get", lambda *args: Master()
+    )
+
+    response = optimizer.optimize(101, random_bars(), grid(SPACE), workers=1)
+    assert response["status"] == "success"
+    saved = optimizer.Firestore.get_strategy("NSE_ACME")
+    assert saved.to_dict() == response["message"]
+    assert len(strategies.get()) == 1
+
+    # A token without a strategy yet gets one document too
+    strategies.data.clear()
+    optimizer.optimize(101, random_bars(), grid(SPACE), workers=1)
+    assert optimizer.Firestore.get_strategy("NSE_ACME").id == "default"
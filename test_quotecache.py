@@ -0,0 +1,103 @@
+import threading
+
+from quotecache import QuoteCache
+from utils import QuoteType
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_live_ticks():
+    clock = Clock()
+    cache = QuoteCache(ttl=1.0, clock=clock)
+    calls = []
+
+    def fetch(token, quote_type):
+        calls.append(token)
+        return f"{len(calls)}.0"
+
+    assert cache.get("101", QuoteType.ltp, fetch) == "1.0"
+    clock.now = 0.5
+    assert cache.get(101, QuoteType.ltp, fetch) == "1.0"
+    clock.now = 1.5
+    assert cache.get("101", QuoteType.ltp, fetch) == "2.0"
+
+    cache.on_tick(101, 99.5)
+    assert cache.get("101", QuoteType.ltp, fetch) == 99.5
+    assert cache.peek(101) == (True, 99.5)
+    # Ticks only carry the LTP
+    assert cache.get("101", QuoteType.ohlc, fetch) == "3.0"
+    cache.clear_live()
+    assert cache.get("101", QuoteType.ltp, fetch) == "2.0"
+
+    error = {"status": "error", "message": "down"}
+    assert cache.get("102", QuoteType.ltp, lambda *_: error) is error
+    assert cache.get("102", QuoteType.ltp, fetch) == "4.0"
+
+    metrics = cache.metrics()
+    assert metrics["requests"] == 9
+    assert metrics["live_hits"] == 2
+    assert metrics["cache_hits"] == 2
+    assert metrics["broker_calls"] == 5
+    assert metrics["failed"] == 1
+    assert metrics["saved_round_trips"] == 4
+
+
+def test_concurrent_requests_share_one_call():
+    cache = QuoteCache()
+    release = threading.Event()
+    calls = []
+
+    def fetch(token, quote_type):
+        calls.append(token)
+        release.wait(5)
+        return "101.5"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                cache.get("101", QuoteType.ltp, fetch)
+            )
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.metrics()["coalesced"] < 7:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["101"]
+    assert results == ["101.5"] * 8
+    assert cache.metrics()["saved_round_trips"] == 7
+
+
+def test_failed_bulk_quote_is_logged_and_retried_per_token(caplog):
+    import orderclient
+    from kotakclient import KotakClient
+    from quotecache import quote_cache
+
+    class SingleTokenBroker:
+        def quote(self, instrument_token, quote_type=None):
+            if "," in str(instrument_token):
+                raise ValueError("Invalid instrument token")
+            return {"success": [{"lastPrice": "10.5"}]}
+
+    KotakClient._KotakClient__client = SingleTokenBroker()
+    quote_cache.clear()
+    try:
+        with caplog.at_level("ERROR"):
+            prices = orderclient.get_ltps([101, 102])
+    finally:
+        KotakClient._KotakClient__client = None
+        quote_cache.clear()
+    assert prices == {101: "10.5", 102: "10.5"}
+    assert "Invalid instrument token" in caplog.text
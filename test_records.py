@@ -0,0 +1,70 @@
+import dataclasses
+
+import numpy as np
+
+from records import decode_records, order_book, trade_book
+from utils import _OrderBookParams, _TradeParams
+
+TRADE = {
+    "exchange": "NSE",
+    "exchangeTradeId": "T1",
+    "expiryDate": "26OCT23",
+    "instrumentName": "NIFTY",
+    "instrumentToken": 101,
+    "instrumentType": "OPTIDX",
+    "isFNO": "Y",
+    "marketExchange": "NSE",
+    "marketLot": 50,
+    "multiplier": 1,
+    "optionType": "CE",
+    "orderId": 7,
+    "orderTimestamp": "Oct 16 2023 09:15:01:000AM",
+    "price": "101.5",
+    "product": "MIS",
+    "quantity": 50,
+    "statusInfo": "",
+    "statusMessage": "",
+    "strikePrice": 19500,
+    "tradeId": 1,
+    "tradeTimestamp": "Oct 16 2023 09:15:01:000AM",
+    "transactionType": "BUY",
+    "extraKey": "dropped",
+}
+
+
+def trades():
+    rows = []
+    for i, (order_id, token) in enumerate([(7, 101), (9, 102), (7, 101)]):
+        rows.append({**TRADE, "orderId": order_id, "instrumentToken": token})
+        rows[-1]["tradeId"] = i
+    return rows
+
+
+def test_decode_records_are_slotted():
+    records = decode_records(_TradeParams, trades())
+    assert len(records) == 3
+    assert not hasattr(records[0], "__dict__")
+    assert records[1].orderId == 9 and records[1].price == "101.5"
+
+    order = {f.name: 1 for f in dataclasses.fields(_OrderBookParams)[:15]}
+    (decoded,) = decode_records(_OrderBookParams, [order])
+    assert decoded.orderId == 0 and decoded.tag == ""
+
+
+def test_trade_book_is_columnar_and_indexed():
+    book = trade_book(trades())
+    assert len(book) == 3
+    assert book["price"].dtype == np.float64
+    assert book["price"][0] == 101.5
+    assert book.by_order(7)["tradeId"].tolist() == [0, 2]
+    assert book.by_token("102")["orderId"].tolist() == [9]
+    assert book.positions(orderId=7, instrumentToken=102).size == 0
+    assert book.by_order(8).size == 0
+    (record,) = book.records([1])
+    assert isinstance(record, _TradeParams)
+    assert record.orderId == 9 and record.price == 101.5
+
+    orders = order_book([{"orderId": 3, "price": 1.0}])
+    assert orders["orderId"].tolist() == [3]
+    assert np.isnan(orders["triggerPrice"][0])
+    assert len(order_book([])) == 0
@@ -0,0 +1,61 @@
+from bar_builder import NS_PER_SECOND, parse_tick_time
+from replay import (
+    LTP,
+    TIME,
+    TOKEN,
+    StubBroker,
+    TickReplay,
+    make_message,
+    read_messages,
+    synthetic_messages,
+    write_messages,
+)
+
+
+def test_message_layout_matches_the_feed_callback():
+    message = make_message(101, 99.5, 1200, 340, "16/10/2023 09:15:07")
+    assert int(message[1]) == 101
+    assert float(message[6]) == 99.5
+    assert int(message[15]) == 1200
+    assert int(message[16]) == 340
+    assert parse_tick_time(message[19]) % (60 * NS_PER_SECOND) == (
+        7 * NS_PER_SECOND
+    )
+
+
+def test_synthetic_messages_are_deterministic(tmp_path):
+    messages = synthetic_messages([1, 2], minutes=2, ticks_per_minute=30)
+    assert messages == synthetic_messages([1, 2], 2, 30)
+    assert messages != synthetic_messages([1, 2], 2, 30, seed=1)
+    assert len(messages) == 2 * 2 * 30
+    times = [parse_tick_time(message[TIME]) for message in messages]
+    assert times == sorted(times)
+
+    path = tmp_path / "ticks.jsonl"
+    write_messages(path, messages)
+    assert read_messages(path) == messages
+
+
+def test_replay_flushes_on_market_time_and_answers_quotes():
+    messages = synthetic_messages([7], minutes=3, ticks_per_minute=20)
+    broker = StubBroker()
+    received, flushed = [], []
+    replay = TickReplay(messages, broker, flush_every=60)
+    broker.subscribe(
+        "7",
+        received.append,
+        disconnect_event=lambda: flushed.append(replay.clock()),
+    )
+    result = replay.run()
+
+    assert received == messages
+    assert result["ticks"] == len(messages)
+    # One flush per market minute boundary, then the end of the session
+    assert result["flushes"] == len(flushed) == 3
+    first = parse_tick_time(messages[0][TIME])
+    assert flushed[1] - flushed[0] == 60 * NS_PER_SECOND
+    assert flushed[0] == first + 60 * NS_PER_SECOND
+
+    quote = broker.quote("7")["success"][0]
+    assert float(quote["lastPrice"]) == float(messages[-1][LTP])
+    assert int(quote["instrumentToken"]) == int(messages[-1][TOKEN])
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from instruments import InstrumentMaster
+from scripmaster import load_snapshot, read_scrip, save_snapshot
+
+HEADER = (
+    "instrumentToken|instrumentName|name|lastPrice|expiry|strike|tickSize|"
+    "lotSize|instrumentType|segment|exchange|isin|multiplier|"
+    "exchangeToken|optionType"
+)
+
+
+@pytest.fixture
+def scrip_files(tmp_path):
+    cash = tmp_path / "cash.txt"
+    cash.write_text(
+        "\n".join(
+            [
+                HEADER,
+                "11717|NIFTY 50|NIFTY 50|0|||0.05|1|IN|CASH|NSE||1|26000|",
+                "11721|NIFTY BANK|NIFTY BANK|0|||0.05|1|IN|CASH|NSE||1|26009|",
+                "1594|INFY|INFOSYS|1450.5|||0.05|1|EQ|CASH|NSE|INE009A01021|1|1594|",
+                "500209|INFY|INFOSYS|1450.1|||0.05|1|EQ|CASH|BSE|INE009A01021|1|500209|",
+                "900001|GOLD|GOLD|0|||1|1|CO|COM|MCX||1|900001|",
+            ]
+        )
+    )
+    rows = [HEADER]
+    token = 40000
+    for expiry in ("05OCT23", "12OCT23"):
+        for option_type in ("CE", "PE"):
+            for strike in (19400, 19450, 19500, 1012.5):
+                rows.append(
+                    f"{token}|NIFTY|NIFTY|12.5|{expiry}|{strike}|0.05|50|"
+                    f"OI|FO|NSE||1|{token}|{option_type}"
+                )
+                token += 1
+    rows.append(
+        "50000|SENSEX|SENSEX|10|06OCT23|65000|0.05|10|OI|FO|BSE||1|1|CE"
+    )
+    fno = tmp_path / "fno.txt"
+    fno.write_text("\n".join(rows))
+    return str(cash), str(fno)
+
+
+def test_read_scrip_compact_and_filtered(scrip_files):
+    cash = read_scrip(scrip_files[0], "cash", chunksize=2)
+    fno = read_scrip(scrip_files[1], "fno", chunksize=3)
+
+    assert sorted(cash.index) == [1594, 11717, 11721, 500209]
+    assert cash.loc[11721, "instrumentName"] == "BANKNIFTY"
+    assert cash.loc[11717, "instrumentName"] == "NIFTY"
+    assert "strike" not in cash and "optionType" not in cash
+
+    assert len(fno) == 16 and "isin" not in fno
+    assert isinstance(fno["instrumentName"].dtype, pd.CategoricalDtype)
+    assert isinstance(fno["optionType"].dtype, pd.CategoricalDtype)
+    assert fno["strike"].dtype == "float32"
+    assert fno["lotSize"].dtype == "int32"
+    assert fno.loc[40000, "expiry"] == pd.Timestamp("2023-10-05")
+    assert fno["strike"].isin([1012.5]).sum() == 4
+
+
+def test_snapshot_round_trip(scrip_files, tmp_path):
+    cash = read_scrip(scrip_files[0], "cash")
+    fno = read_scrip(scrip_files[1], "fno")
+    path = str(tmp_path / "tokens.npz")
+    save_snapshot(path, cashTokens=cash, fnoTokens=fno)
+
+    tables = load_snapshot(path)
+    pd.testing.assert_frame_equal(tables["cashTokens"], cash)
+    pd.testing.assert_frame_equal(tables["fnoTokens"], fno)
+
+    master = InstrumentMaster.load(path)
+    rows = master.find_fno(
+        strikeRange=(19400, 19450),
+        instrumentName="NIFTY",
+        optionType="PE",
+        expiry="12OCT23",
+    )
+    assert rows["strike"].tolist() == [19400, 19450]
@@ -0,0 +1,164 @@
+import time
+from collections import defaultdict
+
+import pytest
+
+from bar_builder import NS_PER_MINUTE
+from shardedfeed import ShardedFeed, TickRing, partition
+from utils import OptionType, TransactionType
+
+
+class ThresholdIndicator:
+    """Signals a buy for every closed 1-minute bar above 100."""
+
+    def __init__(self, tokens) -> None:
+        self.timeframe = defaultdict(lambda: 1)
+        self._observers = set()
+
+    def attachObserver(self, observer):
+        self._observers.add(observer)
+
+    def update_bars(self, token, bars):
+        for close in bars[1]["close"]:
+            if close > 100:
+                for observer in self._observers:
+                    observer.update(
+                        token, TransactionType.buy, OptionType.call
+                    )
+
+
+class FailingIndicator(ThresholdIndicator):
+    """ThresholdIndicator whose evaluation of token 1 always raises."""
+
+    def update_bars(self, token, bars):
+        if token == 1:
+            raise ValueError("evaluation failed")
+        super().update_bars(token, bars)
+
+
+class RecordingPortfolio:
+    def __init__(self) -> None:
+        self.signals = []
+
+    def update(self, token, transactionType, optionType):
+        self.signals.append((token, transactionType, optionType))
+
+
+def test_partition_is_balanced_and_complete():
+    shards = partition(range(10), 3)
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+    assert sorted(sum(shards, [])) == list(range(10))
+
+
+def test_ring_wraps_refuses_when_full_and_attaches_by_name():
+    ring = TickRing.create(4)
+    reader = TickRing.attach(ring.name)
+    try:
+        for i in range(4):
+            assert ring.put(1, i, 100.0 + i, i, 0)
+        assert not ring.put(1, 4, 104.0, 4, 0)
+        assert reader.consume()["datetime"].tolist() == [0, 1, 2, 3]
+
+        for i in range(4, 7):
+            assert ring.put(2, i, 100.0 + i, i, 0)
+        ticks = reader.consume()
+        assert ticks["datetime"].tolist() == [4, 5, 6]
+        assert ticks["token"].tolist() == [2, 2, 2]
+        assert len(reader) == 0 and reader.consume().shape[0] == 0
+    finally:
+        reader.close()
+        ring.close()
+
+    with pytest.raises(ValueError):
+        TickRing.create(6)
+
+
+def test_workers_build_bars_and_send_signals_back():
+    portfolio = RecordingPortfolio()
+    feed = ShardedFeed(
+        factory=ThresholdIndicator, capacity=8, block=True, clock=None
+    )
+    feed.attachObserver(portfolio)
+    feed.start(partition([1, 2, 3, 4], 2))
+    try:
+        assert feed.wait_ready(timeout=60)
+        # Token 2 and 4 close above 100; the ring of 8 has to wrap
+        for minute in range(3):
+            for token in (1, 2, 3, 4):
+                price = 99.0 if token % 2 else 101.0
+                for second in (0, 30):
+                    feed.on_tick(
+                        token,
+                        minute * NS_PER_MINUTE + second * 10**9,
+                        price,
+                        minute,
+                        0,
+                    )
+    finally:
+        feed.close(timeout=60)
+
+    metrics = feed.metrics()
+    assert metrics["workers"] == 2 and metrics["dropped"] == 0
+    assert [shard["processed"] for shard in metrics["shards"]] == [12, 12]
+    # Stopping closes the third minute's bars too
+    assert sum(shard["bars"] for shard in metrics["shards"]) == 12
+    assert sum(shard["signals"] for shard in metrics["shards"]) == 6
+    assert sorted(portfolio.signals) == [
+        (token, TransactionType.buy, OptionType.call)
+        for token in (2, 2, 2, 4, 4, 4)
+    ]
+
+
+def test_a_failing_token_does_not_stop_the_rest_of_the_shard():
+    portfolio = RecordingPortfolio()
+    feed = ShardedFeed(factory=FailingIndicator, block=True, clock=None)
+    feed.attachObserver(portfolio)
+    feed.start([[1, 2, 3]])
+    try:
+        assert feed.wait_ready(timeout=60)
+        for minute in range(2):
+            for token in (1, 2, 3):
+                feed.on_tick(token, minute * NS_PER_MINUTE, 101.0, minute, 0)
+    finally:
+        feed.close(timeout=60)
+
+    assert sorted(portfolio.signals) == [
+        (token, TransactionType.buy, OptionType.call)
+        for token in (2, 2, 3, 3)
+    ]
+
+
+def five_minutes_in() -> int:
+    return 5 * NS_PER_MINUTE
+
+
+def test_bars_close_on_the_clock_without_later_ticks():
+    portfolio = RecordingPortfolio()
+    feed = ShardedFeed(
+        factory=ThresholdIndicator, clock=five_minutes_in, flush_interval=0.01
+    )
+    feed.attachObserver(portfolio)
+    feed.start([[2]])
+    try:
+        assert feed.wait_ready(timeout=60)
+        feed.on_tick(2, 10**9, 101.0, 1, 0)
+        deadline = time.monotonic() + 30
+        while not portfolio.signals and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert feed.metrics()["shards"][0]["bars"] == 1
+    finally:
+        feed.close(timeout=60)
+    assert portfolio.signals == [(2, TransactionType.buy, OptionType.call)]
+
+
+def test_full_ring_drops_unless_blocking():
+    feed = ShardedFeed(factory=ThresholdIndicator, capacity=2, clock=None)
+    feed.start([[1]])
+    try:
+        # The worker is still starting up, so the ring stays full
+        for second in range(5):
+            feed.on_tick(1, second * 10**9, 100.0, second, 0)
+        assert feed.dropped >= 3
+    finally:
+        feed.close(timeout=60)
+    assert feed.metrics()["shards"][0]["processed"] == 5 - feed.dropped
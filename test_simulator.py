@@ -0,0 +1,211 @@
+from types import SimpleNamespace
+
+import pytest
+
+from replay import synthetic_messages
+from simulator import (
+    BUY,
+    CANCELLED,
+    FILLED,
+    OPEN,
+    PARTIALLY_FILLED,
+    SELL,
+    TRIGGER_PENDING,
+    MatchingEngine,
+    SimOrderClient,
+    fixed_slippage,
+)
+from utils import OrderType, OrderValidity, PositionType, TransactionType
+
+T0 = 1_697_447_700_000_000_000  # 16 Oct 2023 09:15
+SECOND = 1_000_000_000
+
+
+def engine(**kwargs) -> MatchingEngine:
+    kwargs = {
+        "funds": 10_000_000,
+        "levels": 3,
+        "depth_quantity": 100,
+        **kwargs,
+    }
+    engine = MatchingEngine(**kwargs)
+    engine.on_tick(101, T0, 100.0)
+    return engine
+
+
+def test_market_orders_walk_the_book():
+    sim = engine()
+    order = sim.submit(101, BUY, 250)
+    assert order.status == FILLED
+    assert order.average == pytest.approx(
+        (100.05 + 100.10 + 0.5 * 100.15) / 2.5
+    )
+
+    ioc = sim.submit(101, BUY, 100, ioc=True)
+    assert (ioc.status, ioc.filled) == (CANCELLED, 50)
+    rest = sim.submit(101, BUY, 100)
+    assert (rest.status, rest.filled) == (OPEN, 0)
+    sim.on_tick(101, T0 + SECOND, 101.0)
+    assert rest.status == FILLED and rest.average == pytest.approx(101.05)
+
+    position = sim.positions[101]
+    assert position.quantity == 400
+
+
+def test_limits_partial_fills_and_netting():
+    sim = engine()
+    start = sim.funds
+    buy = sim.submit(101, BUY, 150, price=99.0)
+    assert buy.status == OPEN
+    sim.on_tick(101, T0 + SECOND, 99.0)  # asks 99.05 and up
+    assert buy.status == OPEN
+    sim.on_tick(101, T0 + 2 * SECOND, 98.95)  # asks 99.00, 99.05, ...
+    assert (buy.status, buy.filled) == (PARTIALLY_FILLED, 100)
+    sim.on_tick(101, T0 + 3 * SECOND, 98.9)
+    assert buy.status == FILLED and buy.average == pytest.approx(
+        (100 * 99.0 + 50 * 98.95) / 150
+    )
+
+    # Bids 98.85 and 98.80: closes the long, then opens a short
+    sell = sim.submit(101, SELL, 200, price=98.0)
+    assert sell.status == FILLED
+    position = sim.positions[101]
+    assert (position.quantity, position.average) == (-50, pytest.approx(98.8))
+    assert position.realized == pytest.approx(
+        100 * (98.85 - buy.average) + 50 * (98.8 - buy.average)
+    )
+    assert sim.funds < start + buy.value  # charges were paid
+
+
+def test_triggers_latency_and_slippage():
+    sim = engine(latency=2 * SECOND, slippage=fixed_slippage(10))
+    stop = sim.submit(101, SELL, 50, trigger=99.5)
+    assert stop.status == OPEN  # still on its way to the exchange
+    sim.on_tick(101, T0 + SECOND, 99.8)
+    assert stop.status == OPEN
+    sim.on_tick(101, T0 + 3 * SECOND, 99.9)
+    assert stop.status == TRIGGER_PENDING
+    sim.on_tick(101, T0 + 4 * SECOND, 99.4)
+    assert stop.status == FILLED
+    assert stop.average == pytest.approx(99.35 * (1 - 10e-4))
+
+    gfd = sim.submit(101, BUY, 10, price=90.0)
+    sim.on_tick(101, T0 + 10 * SECOND, 99.0)
+    assert gfd.status == OPEN
+    sim.on_tick(101, T0 + 86_400 * SECOND, 99.0)
+    assert gfd.status == CANCELLED
+
+
+def test_depth_snapshot_shapes_the_book():
+    sim = engine()
+    sim.on_depth(
+        101,
+        {
+            "depth": [
+                {
+                    "buy": [
+                        {"price": "99.9", "quantity": "10", "orders": "1"}
+                    ],
+                    "sell": [
+                        {"price": "100.1", "quantity": "5", "orders": "1"},
+                        {"price": "100.3", "quantity": "5", "orders": "2"},
+                    ],
+                }
+            ]
+        },
+    )
+    sim.on_tick(101, T0 + SECOND, 200.0)
+    order = sim.submit(101, BUY, 20)
+    assert (order.filled, order.status) == (10, PARTIALLY_FILLED)
+    assert order.average == pytest.approx(200.2)
+
+
+def test_client_matches_order_client_interface():
+    client = SimOrderClient(engine(funds=100_000))
+    response = client.placeOrder(
+        OrderType.mis_order, "101", TransactionType.buy, 50
+    )
+    assert response["status"] == "success"
+    assert response["message"]["status"] == FILLED
+    assert client.get_funds() < 100_000
+    (position,) = client.get_position(PositionType.open)
+    assert position["instrumentToken"] == 101
+    assert client.open_positions == [position]
+
+    response = client.placeOrder(
+        OrderType.mis_order,
+        "101",
+        TransactionType.sell,
+        50,
+        price=120,
+        validity=OrderValidity.gfd,
+    )
+    order_id = response["message"]["orderId"]
+    assert client.cancelOrder(order_id)["status"] == "success"
+    assert client.get_order_report()[-1]["status"] == CANCELLED
+    rejected = client.placeOrder(
+        OrderType.mis_order, "101", TransactionType.buy, 10_000
+    )
+    assert rejected["status"] == "error"
+    assert client.charge_rate(TransactionType.buy) > 0
+
+
+def test_replayed_ticks_drive_resting_orders():
+    sim = MatchingEngine(funds=1e9)
+    messages = synthetic_messages([101, 102], minutes=5, seed=4)
+    sim.feed(messages[:10])
+    buy = sim.submit(102, BUY, 10, price=sim._book(102).ltp - 0.3)
+    sim.feed(messages[10:])
+    ltps = [float(m[6]) for m in messages[10:] if m[1] == "102"]
+    assert (buy.status == FILLED) == (min(ltps) <= buy.price - 0.05 + 1e-9)
+
+
+def test_portfolio_buys_and_sells_on_replayed_ticks(monkeypatch):
+    import pandas as pd
+
+    import portfolio
+    from utils import OptionType
+
+    sim = MatchingEngine(funds=1_000_000)
+    messages = synthetic_messages([43101, 43102], minutes=5, seed=2)
+    sim.feed(messages[:20])
+
+    def option_chain(*args):
+        # Quoted a little above the LTP so the limit buy crosses
+        quotes = [sim._book(token).ltp + 0.5 for token in (43101, 43102)]
+        chain = pd.DataFrame(
+            {
+                "strike": [19500, 19600],
+                "optionPrice": quotes,
+                "delta": [0.62, 0.48],
+                "lotSize": [50, 50],
+            },
+            index=[43101, 43102],
+        )
+        return SimpleNamespace(strike_token=chain)
+
+    monkeypatch.setattr(portfolio, "OptionGeeks", option_chain)
+    client = SimOrderClient(sim)
+    owner = portfolio.Portfolio(0.5, quantity=2, order_client=client)
+    assert owner.startfund == 1_000_000
+
+    owner.update(11717, TransactionType.buy, OptionType.call)
+    assert owner.strike_token[11717] == 43102
+    assert client.open_positions[0]["netTrdQtyLot"] == 100
+
+    sim.feed(messages[20:])
+    assert owner.update(11717, TransactionType.sell) == "success"
+    assert 11717 not in owner.strike_token
+    assert owner.positions(PositionType.open) == []
+
+    buy, sell = client.get_order_report()
+    assert buy["status"] == sell["status"] == FILLED
+    assert (
+        buy["transactionType"] == "BUY" and sell["transactionType"] == "SELL"
+    )
+    position = sim.positions[43102]
+    assert position.quantity == 0
+    assert position.realized == pytest.approx(
+        100 * (sell["averagePrice"] - buy["averagePrice"])
+    )
+    owner.__del__()
@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from tracing import LatencyHistogram, Tracer
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    rng = np.random.default_rng(3)
+    values = rng.lognormal(mean=12, sigma=1.5, size=20000).astype(np.int64)
+    histogram = LatencyHistogram()
+    for value in values.tolist():
+        histogram.record(value)
+
+    result = histogram.percentiles((50, 90, 99))
+    for q, value in result.items():
+        expected = np.percentile(values, q)
+        assert abs(value - expected) / expected < 0.04
+    assert histogram.max == values.max()
+    assert histogram.count == values.shape[0]
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(64):
+        histogram.record(value)
+    assert histogram.percentiles((50,))[50] == 31
+
+
+def test_tracer_records_each_stage_and_total():
+    tracer = Tracer()
+    tracer.stamp(7, "evaluate")  # no chain yet: ignored
+    tracer.feed(7)
+    for stage in tracer.stages[1:]:
+        tracer.stamp(7, stage)
+    snapshot = tracer.snapshot()
+    for stage in tracer.stages[1:]:
+        assert snapshot[stage]["count"] == 1
+    assert snapshot["total"]["count"] == 1
+
+    # The chain ends at the order ack, later stamps need a new bar close
+    tracer.stamp(7, "portfolio")
+    assert tracer.snapshot()["portfolio"]["count"] == 1
+
+
+def test_portfolio_order_is_the_last_stage(monkeypatch):
+    import portfolio
+    from simulator import MatchingEngine, SimOrderClient
+    from tracing import tracer
+    from utils import OptionType, TransactionType
+
+    chain = pd.DataFrame(
+        {
+            "strike": [19500, 19600],
+            "optionPrice": [120.0, 80.0],
+            "delta": [0.62, 0.48],
+            "lotSize": [50, 50],
+        },
+        index=[43101, 43102],
+    )
+    monkeypatch.setattr(
+        portfolio,
+        "OptionGeeks",
+        lambda *args: SimpleNamespace(strike_token=chain),
+    )
+    engine = MatchingEngine(funds=1_000_000)
+    engine.on_tick(43102, 0, 79.0)
+    client = SimOrderClient(engine)
+    tracer.reset()
+    tracer.feed(11717)
+    tracer.stamp(11717, "bar_close")
+    tracer.stamp(11717, "evaluate")
+
+    owner = portfolio.Portfolio(0.5, order_client=client)
+    owner.update(11717, TransactionType.buy, OptionType.call)
+
+    snapshot = tracer.snapshot()
+    assert snapshot["order_ack"]["count"] == 1
+    assert snapshot["total"]["count"] == 1
+    # The 0.48 delta strike, bought at its quoted price
+    assert owner.strike_token[11717] == 43102
+    assert client.open_positions[0]["instrumentToken"] == 43102
+    assert client.get_order_report()[0]["price"] == 80.0
+
+
+def test_portfolio_skips_a_chain_without_deltas(monkeypatch):
+    import portfolio
+    from simulator import MatchingEngine, SimOrderClient
+    from utils import OptionType, TransactionType
+
+    chain = pd.DataFrame(
+        {
+            "strike": [19500, 19600],
+            "optionPrice": [120.0, 80.0],
+            "delta": [float("nan"), float("nan")],
+            "lotSize": [50, 50],
+        },
+        index=[43101, 43102],
+    )
+    monkeypatch.setattr(
+        portfolio,
+        "OptionGeeks",
+        lambda *args: SimpleNamespace(strike_token=chain),
+    )
+    client = SimOrderClient(MatchingEngine(funds=1_000_000))
+    owner = portfolio.Portfolio(0.5, order_client=client)
+
+    response = owner.update(11717, TransactionType.buy, OptionType.call)
+    assert response["status"] == "error"
+    assert 11717 not in owner.strike_token
+    assert client.get_order_report() == []
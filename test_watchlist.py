@@ -0,0 +1,30 @@
+from firestore import Firestore
+from watchlist import Watchlist
+
+
+class FakeDoc:
+    def __init__(self, id, info) -> None:
+        self.id = id
+        self._info = info
+
+    def to_dict(self):
+        return dict(self._info)
+
+
+def test_remove_from_watchlist_deletes_the_firestore_document(monkeypatch):
+    docs = [
+        FakeDoc("NSE_SBIN", {"instrumentToken": 3045}),
+        FakeDoc("NSE_INFY", {"instrumentToken": 1594}),
+    ]
+    deleted = []
+    monkeypatch.setattr(Firestore, "get_watchlist", lambda: iter(docs))
+    monkeypatch.setattr(Firestore, "delete_watchlist", deleted.append)
+    monkeypatch.setattr("builtins.input", lambda prompt: "1594")
+
+    response = Watchlist().remove_from_watchlist()
+    assert response["status"] == "success"
+    assert deleted == ["NSE_INFY"]
+
+    monkeypatch.setattr("builtins.input", lambda prompt: "1")
+    assert Watchlist().remove_from_watchlist()["status"] == "error"
+    assert deleted == ["NSE_INFY"]
@@ -0,0 +1,139 @@
+from time import perf_counter_ns
+
+import numpy as np
+
+# Pipeline stages in order; each histogram measures time since the stage
+# before it for the same token, "total" measures feed -> order ack.
+STAGES = (
+    "feed",
+    "bar_close",
+    "evaluate",
+    "portfolio",
+    "option_chain",
+    "order_ack",
+)
+
+_SUB_BITS = 6
+_HALF = 1 << (_SUB_BITS - 1)
+_MAX_BITS = 48  # ~78 hours in ns
+
+
+def _index(value: int) -> int:
+    bits = value.bit_length()
+    if bits <= _SUB_BITS:
+        return value
+    shift = bits - _SUB_BITS
+    return shift * _HALF + (value >> shift)
+
+
+def _lower_bound(index: np.ndarray) -> np.ndarray:
+    shift = np.maximum(index // _HALF - 1, 0)
+    top = np.where(index < 2 * _HALF, index, index - shift * _HALF)
+    return top << shift
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in nanoseconds, HDR style.
+
+    Values below 64 ns are exact; above that each power of two is split
+    into 32 buckets, so reported percentiles are within ~3%.
+    """
+
+    def __init__(self) -> None:
+        self.counts = [0] * ((_MAX_BITS - _SUB_BITS + 2) * _HALF)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        if value < 0:
+            return
+        i = _index(value)
+        if i >= len(self.counts):
+            i = len(self.counts) - 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentiles(self, quantiles=(50, 90, 99, 99.9)) -> dict:
+        counts = np.asarray(self.counts)
+        if self.count == 0:
+            return {q: 0 for q in quantiles}
+        cumulative = np.cumsum(counts)
+        ranks = np.ceil(np.asarray(quantiles) / 100 * self.count)
+        index = np.searchsorted(cumulative, np.maximum(ranks, 1))
+        values = np.minimum(_lower_bound(index), self.max)
+        return dict(zip(quantiles, values.tolist()))
+
+    def summary(self) -> dict:
+        """Count, mean, percentiles and max in microseconds."""
+        us = {
+            f"p{q:g}": round(value / 1e3, 1)
+            for q, value in self.percentiles().items()
+        }
+        mean = self.total / self.count / 1e3 if self.count else 0
+        return {
+            "count": self.count,
+            "mean_us": round(mean, 1),
+            **{f"{name}_us": value for name, value in us.items()},
+            "max_us": round(self.max / 1e3, 1),
+        }
+
+
+class Tracer:
+    """Per-token monotonic stamps turned into per-stage histograms.
+
+    ``feed`` runs for every tick and only stores a timestamp. Each later
+    ``stamp`` records the time since the previous stage of the same
+    token; a bar closing starts a new chain from the last tick received.
+    """
+
+    def __init__(self, stages=STAGES) -> None:
+        self.enabled = True
+        self.stages = stages
+        self.histograms = {stage: LatencyHistogram() for stage in stages[1:]}
+        self.histograms["total"] = LatencyHistogram()
+        self._feed = {}
+        self._chain = {}
+
+    def feed(self, token):
+        self._feed[token] = perf_counter_ns()
+
+    def stamp(self, token, stage: str):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        if stage == self.stages[1]:
+            start = self._feed.get(token)
+            if start is None:
+                return
+            self._chain[token] = (start, now)
+            self.histograms[stage].record(now - start)
+            return
+        chain = self._chain.get(token)
+        if chain is None:
+            return
+        start, last = chain
+        self.histograms[stage].record(now - last)
+        if stage == self.stages[-1]:
+            self.histograms["total"].record(now - start)
+            del self._chain[token]
+        else:
+            self._chain[token] = (start, now)
+
+    def snapshot(self) -> dict:
+        return {
+            stage: histogram.summary()
+            for stage, histogram in self.histograms.items()
+        }
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.__init__()
+        self._feed.clear()
+        self._chain.clear()
+
+
+tracer = Tracer()
@@ -114,7 +114,7 @@ class PlaceOrderResponse:
     tag: str
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class _OrderBookParams:
     activityTimestamp: str
     disclosedQuantity: int
@@ -131,9 +131,16 @@ class _OrderBookParams:
     triggerPrice: float
     validity: str
     version: int
+    orderId: int = field(default=0)
+    instrumentToken: int = field(default=0)
+    instrumentName: str = field(default="")
+    transactionType: str = field(default="")
+    product: str = field(default="")
+    orderTimestamp: str = field(default="")
+    tag: str = field(default="")
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class OrderBookResponse:
     success: list[_OrderBookParams]
 
@@ -186,7 +193,7 @@ class QuoteDepthResponse:
     depth: list[_Depth]
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class _TradeParams:
     exchange: str
     exchangeTradeId: str
@@ -212,12 +219,12 @@ class _TradeParams:
     transactionType: str
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class TradeBookResponse:
     success: list[_TradeParams]
 
 
-@dataclass
+@dataclass(slots=True)
 class _PositionTodayParams:
     actualNetTrdValue: float
     averageStockPrice: float
@@ -286,7 +293,7 @@ class FundsResponse:
     totalMargin: float
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, order=True, slots=True)
 class Positions:
     Success: list[_PositionTodayParams]
 
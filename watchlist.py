@@ -6,8 +6,8 @@ import requests
 from dotenv import load_dotenv
 
 from firestore import Firestore
-
-DATASTORE = "kotak_data/tokens.hdf5"
+from instruments import InstrumentMaster
+from scripmaster import TOKENSTORE, read_scrip, save_snapshot
 from utils import logging_handler
 
 logging.basicConfig(level=logging.INFO, handlers=[logging_handler])
@@ -33,59 +33,14 @@ class Watchlist:
             return res.status_code
         res = res.json()
 
-        # Read and save Cash token IDs
+        # Stream both scrip files into compact frames and snapshot them
         try:
-            cash_token = pd.read_csv(
-                res["Success"]["cash"], sep="|", index_col="instrumentToken"
-            )
-            cash_token.drop(
-                ["expiry", "OptionType", "strike"], axis=1, inplace=True
-            )
-
-            bank_nifty = (
-                cash_token["instrumentName"]
-                .where(cash_token["instrumentName"] == "NIFTY BANK")
-                .dropna()
-                .index
-            )
-            cash_token.loc[bank_nifty, ["instrumentName"]] = "BANKNIFTY"
-
-            nifty = (
-                cash_token["instrumentName"]
-                .where(cash_token["instrumentName"] == "NIFTY 50")
-                .dropna()
-                .index
-            )
-            cash_token.loc[nifty, ["instrumentName"]] = "NIFTY"
-
-            cash_token.to_hdf(
-                DATASTORE,
-                "/cashTokens",
-                mode="w",
-                append=False,
-                index=True,
-                complevel=9,
-                format="table",
-                complib="blosc:lz4",
-                data_columns=True,
-            )
-
-            # Read and save FNO token IDs
-            fno_token = pd.read_csv(
-                res["Success"]["fno"], sep="|", index_col="instrumentToken"
-            )
-            fno_token.drop(["isin"], axis=1, inplace=True)
-            fno_token.to_hdf(
-                DATASTORE,
-                "/fnoTokens",
-                mode="a",
-                append=False,
-                index=True,
-                complevel=9,
-                format="table",
-                complib="blosc:lz4",
-                data_columns=True,
+            cash_token = read_scrip(res["Success"]["cash"], "cash")
+            fno_token = read_scrip(res["Success"]["fno"], "fno")
+            save_snapshot(
+                TOKENSTORE, cashTokens=cash_token, fnoTokens=fno_token
             )
+            InstrumentMaster.reload(TOKENSTORE)
         except Exception as e:
             logging.error("Tokens Not Found : " + str(e))
             return {"status": "error", "message": str(e)}
@@ -93,40 +48,11 @@ class Watchlist:
         return {"status": "success", "message": "Token IDs fetched and saved"}
 
     def add_to_watchlist(self, is_fno=False, **kwargs):
-        dataStore = DATASTORE
+        master = InstrumentMaster.get()
         if is_fno:
-            key = "/fnoTokens"
-            try:
-                strikeRange = kwargs.pop("strikeRange")
-                keys = list(kwargs.keys())
-                values = tuple(kwargs.values())
-                token_list = pd.read_hdf(
-                    dataStore,
-                    key,
-                    mode="r",
-                    where=f"{keys[0]}=='{values[0]}' & {keys[1]}=='{values[1]}' & strike>='{strikeRange[0]}' & strike<='{strikeRange[1]}'",
-                )
-
-            except Exception as e:
-                print(e)
-                keys = list(kwargs.keys())
-                values = tuple(kwargs.values())
-                token_list = pd.read_hdf(
-                    dataStore,
-                    key,
-                    mode="r",
-                    where=f"{keys[0]}=='{values[0]}' & {keys[1]}=='{values[1]}' & {keys[2]}=='{values[2]}'",
-                )
+            token_list = master.find_fno(**kwargs)
         else:
-            key = "/cashTokens"
-            keys = list(kwargs.keys())
-            values = tuple(kwargs.values())
-            token_list = pd.read_hdf(
-                dataStore,
-                key,
-                mode="r",
-                where=f"{keys[0]}=='{values[0]}' & {keys[1]}=='{values[1]}'",
-            )
+            token_list = master.find_cash(**kwargs)
         token_list = token_list.reset_index()
         print(token_list)
         ans = input("Update Watchlist (y/n) : ")
@@ -147,24 +73,17 @@ class Watchlist:
     # Delete Token from Watchlist
 
     def remove_from_watchlist(self):
-        df = pd.read_hdf(DATASTORE, "/watchlist", mode="r")
+        watchlist = {}
+        for doc in Firestore.get_watchlist():
+            watchlist[doc.id] = doc.to_dict()
+        df = pd.DataFrame.from_dict(watchlist, orient="index")
         print(df)
         tokenID = int(input("Enter Token ID to delete : "))
-        if tokenID not in df["instrumentToken"].values:
+        if df.empty or tokenID not in df["instrumentToken"].values:
             print("Token ID not in Watchlist")
             return {"status": "error", "message": "Token ID not in Watchlist"}
-        df = df.drop(df[df["instrumentToken"] == tokenID].index)
-        df.to_hdf(
-            DATASTORE,
-            "/watchlist",
-            mode="a",
-            append=False,
-            format="table",
-            data_columns=["instrumentToken"],
-            index=False,
-            complevel=9,
-            complib="blosc:lz4",
-        )
+        for stockName in df.index[df["instrumentToken"] == tokenID]:
+            Firestore.delete_watchlist(stockName)
         return {
             "status": "success",
             "message": "Token ID deleted from Watchlist",